@@ -1,18 +1,45 @@
-import streamlit as st
-import requests
 import os
-import json
 
-# -------------------------
-# CONFIG
-# -------------------------
-ENDPOINT_URL = "https://dbc-b6951fe2-dfb1.cloud.databricks.com/serving-endpoints/tem-project_rana/invocations"
-DATABRICKS_TOKEN = os.environ.get("DATABRICKS_TOKEN")
+import streamlit as st
+
+# pandas and altair are imported inside the batch / grid / admin code that uses them, so the
+# Single Game page (and a fresh session) never loads them; configuration is read once per
+# process in app_config.py / service.py rather than on every rerun of this script
+from app_config import (
+    ADMIN_METRICS,
+    ASSET_MANIFEST_PATH,
+    FALLBACK_FONTS_URL,
+    FALLBACK_IMAGE_URL,
+    GRID_BATCH_SIZE,
+    METRICS_EXPORT_INTERVAL,
+    METRICS_JSONL_PATH,
+    METRICS_PORT,
+    METRICS_PROM_PATH,
+    SCHEDULE_PATH,
+    STATIC_URL,
+)
+from metrics import FileExporter, metrics, serve_metrics
+from scoring import (
+    LOCATIONS,
+    TEAMS,
+    ScoringError,
+    grid_records,
+    read_games,
+    validate_games,
+)
+from service import (
+    BATCH_SIZE,
+    DATABRICKS_TOKEN,
+    PREDICTION_CACHE_TTL,
+    SCORER_BACKEND,
+    SCORING_ERRORS,
+    ScoringService,
+)
 
 st.set_page_config(page_title="Suns' Game Predictor", layout="centered")
 
-# Early check for token
-if not DATABRICKS_TOKEN:
+# Early check for token (the local backend doesn't need one)
+if SCORER_BACKEND != "local" and not DATABRICKS_TOKEN:
     st.error("DATABRICKS_TOKEN environment variable not set. Set it in your hosting environment and restart the app.")
     st.stop()
 
@@ -20,9 +47,7 @@ if not DATABRICKS_TOKEN:
 # -------------------------
 # ORIGINAL GLOBAL CSS (Background, Fonts, Inputs, Button Fixes)
 # -------------------------
-st.markdown("""
-<link href="https://fonts.googleapis.com/css2?family=Anton&family=Bebas+Neue&display=swap" rel="stylesheet">
-
+GLOBAL_CSS = """
 <style>
 
 /* True black background everywhere */
@@ -106,7 +131,7 @@ div[data-testid="column"] > div {
 }
 
 /* BUTTON CONTAINER FIX */
-div.stButton {
+div.stButton, div.stFormSubmitButton {
     display: flex;
     justify-content: center;
     width: 100% !important;
@@ -114,8 +139,7 @@ div.stButton {
 }
 
 /* VALLEY THEMED BUTTON — NOW SCALES CORRECTLY */
-div.stButton > button {
-    background-image: url('https://raw.githubusercontent.com/rbarans/508-term-project/refs/heads/main/valley.jpg');
+div.stButton > button, div.stFormSubmitButton > button {
     background-size: cover;
     background-position: center 38%;
     background-repeat: no-repeat;
@@ -138,196 +162,634 @@ div.stButton > button {
     text-shadow: 2px 2px 5px #000;
 }
 
-div.stButton > button:hover {
+div.stButton > button:hover, div.stFormSubmitButton > button:hover {
     transform: scale(1.05);
     transition: 0.15s ease-in-out;
 }
 
 </style>
-""", unsafe_allow_html=True)
+"""
 
 
 # -------------------------
-# HEADER SECTION
+# STATIC ASSETS (fonts + valley images)
 # -------------------------
-st.markdown("""
+@st.cache_resource
+def load_asset_manifest():
+    import json
+
+    try:
+        with open(ASSET_MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# st.button (batch / grid modes) and the single-game form's PREDICT button
+BUTTON_SELECTOR = "div.stButton > button, div.stFormSubmitButton > button"
+
+
+def _srcset(variants):
+    return ", ".join(f"{STATIC_URL}/{v['file']} {v['width']}w" for v in variants)
+
+
+@st.cache_resource
+def build_page_markup():
+    """
+    Page CSS (global rules, then fonts + button background) and the header
+    markup, built once per process. Falls back to the hotlinked image /
+    Google Fonts if static/ hasn't been built.
+    """
+    manifest = load_asset_manifest()
+    images = manifest.get("images", {})
+    fonts = manifest.get("fonts", {})
+
+    css = []
+    if {"anton", "bebas-neue"} <= fonts.keys():
+        for family, key in (("Anton", "anton"), ("Bebas Neue", "bebas-neue")):
+            css.append(
+                f"@font-face {{ font-family: '{family}'; font-display: swap; "
+                f"src: url('{STATIC_URL}/{fonts[key]}') format('woff2'); }}"
+            )
+        font_link = ""
+    else:
+        font_link = f'<link href="{FALLBACK_FONTS_URL}" rel="stylesheet">'
+
+    button = images.get("button")
+    if button:
+        webp = {v["scale"]: f"{STATIC_URL}/{v['file']}" for v in button["webp"]}
+        rules = [
+            f"background-image: url('{webp[1]}');",
+            f"background-image: image-set(url('{webp[1]}') 1x, url('{webp[2]}') 2x);",
+        ]
+        if "avif" in button:
+            avif = {v["scale"]: f"{STATIC_URL}/{v['file']}" for v in button["avif"]}
+            rules.append(
+                "background-image: image-set("
+                f"url('{avif[1]}') type('image/avif') 1x, url('{avif[2]}') type('image/avif') 2x, "
+                f"url('{webp[1]}') type('image/webp') 1x, url('{webp[2]}') type('image/webp') 2x);"
+            )
+        # the pre-cropped image already matches the old "center 38%" framing
+        css.append(f"{BUTTON_SELECTOR} {{ " + " ".join(rules) + " background-position: center; }")
+    else:
+        css.append(f"{BUTTON_SELECTOR} {{ background-image: url('{FALLBACK_IMAGE_URL}'); }}")
+
+    header = images.get("header")
+    if header:
+        sources = "".join(
+            f'<source type="image/{fmt}" srcset="{_srcset(header[fmt])}" sizes="(max-width: 736px) 100vw, 704px">'
+            for fmt in ("avif", "webp") if fmt in header
+        )
+        # <img> fallback: the variant closest to 960 px wide, whatever widths the build produced
+        default = min(header["webp"], key=lambda v: (abs(v["width"] - 960), -v["width"]))
+        header_img = (
+            f'<picture>{sources}<img class="header-img" src="{STATIC_URL}/{default["file"]}" '
+            f'width="704" height="380" alt="" fetchpriority="high"></picture>'
+        )
+    else:
+        header_img = f'<img class="header-img" src="{FALLBACK_IMAGE_URL}">'
+
+    # asset rules go after GLOBAL_CSS so the pre-cropped button image's positioning wins
+    page_css = GLOBAL_CSS + font_link + "<style>\n" + "\n".join(css) + "\n</style>"
+    header_html = f"""
 <div style="position: relative; text-align: center;">
-    <img class="header-img" src="https://raw.githubusercontent.com/rbarans/508-term-project/refs/heads/main/valley.jpg">
+    {header_img}
     <div class="header-title">PHOENIX SUNS</div>
 </div>
-""", unsafe_allow_html=True)
+"""
+    return page_css, header_html
+
+
+PAGE_CSS, HEADER_HTML = build_page_markup()
 
 
 # -------------------------
-# EXPLANATION LOGIC (same as your original)
+# PAGE CSS + HEADER (markup built once per process, sent on every rerun)
 # -------------------------
-def generate_explanation(features, prob):
-    opp = features["opponent"]
-    loc = features["location"]
-    ss = features["suns_streak"]
-    os_ = features["opp_streak"]
-    sr = features["suns_rest"]
-    orr = features["opp_rest"]
-
-    explanation = []
-    explanation.append("The model predicts a WIN primarily because:" if prob >= 0.5
-                       else "The model predicts a LOSS because:")
-
-    if os_ >= 3:
-        explanation.append(f"Opponent on a strong winning streak (+{os_}), historically lowering Suns chances.")
-    elif os_ == 2:
-        explanation.append("Opponent has a +2 streak, slightly reducing Suns probability.")
-    elif os_ == 1:
-        explanation.append("Opponent holds mild momentum (+1).")
-    elif os_ <= -2:
-        explanation.append(f"Opponent is struggling (streak {os_}), increasing Suns probability.")
-    elif os_ == -1:
-        explanation.append("Opponent has a small losing streak.")
-
-    if ss >= 2:
-        explanation.append(f"Suns on a +{ss} streak, boosting the prediction.")
-    elif ss == 1:
-        explanation.append("Suns enter with mild momentum (+1).")
-    elif ss <= -1:
-        explanation.append(f"Suns losing streak ({ss}) lowers probability.")
-
-    rest_diff = sr - orr
-    if sr >= 3:
-        explanation.append(f"{sr} rest days — long rest historically correlates with lower win probability.")
-    elif rest_diff > 0:
-        explanation.append(f"Suns have more rest ({sr} vs {orr}).")
-    elif rest_diff == 0:
-        explanation.append("Both teams have equal rest.")
-    else:
-        explanation.append(f"Opponent has more rest ({orr} vs {sr}).")
+st.markdown(PAGE_CSS, unsafe_allow_html=True)
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
+
+
+# -------------------------
+# SHARED SCORING SERVICE
+# -------------------------
+@st.cache_resource
+def get_service():
+    # st.cache_resource gives one instance per process, shared by every session:
+    # prediction cache, pooled endpoint client, hedger / breaker, the persistent store
+    # and the endpoint warm-keeper thread
+    return ScoringService.from_env().start_background()
 
-    if loc == "Home":
-        explanation.append("Home court provides a small advantage.")
-    else:
-        explanation.append("Away games slightly reduce probability.")
-
-    # WIN filter
-    if prob >= 0.5:
-        cleaned = [explanation[0]]
-        for line in explanation[1:]:
-            if not any(w in line.lower() for w in ["loss", "lower", "reduces"]):
-                cleaned.append(line)
-        if len(cleaned) == 1:
-            cleaned.append("Several factors modestly support a Suns win.")
-        return cleaned
-
-    # LOSS filter
-    else:
-        cleaned = [explanation[0]]
-        for line in explanation[1:]:
-            if any(w in line.lower() for w in ["loss", "lower", "reduces"]):
-                cleaned.append(line)
-        if len(cleaned) == 1:
-            cleaned.append("Several factors tilt the model toward a loss.")
-        return cleaned
+
+@st.cache_resource
+def start_metrics_exporters():
+    # started once per process; the registry itself lives in metrics.py
+    if METRICS_PROM_PATH or METRICS_JSONL_PATH:
+        FileExporter(metrics, METRICS_PROM_PATH, METRICS_JSONL_PATH, METRICS_EXPORT_INTERVAL).start()
+    if METRICS_PORT:
+        serve_metrics(metrics, METRICS_PORT)
+    return True
+
+
+start_metrics_exporters()
+
+
+@st.cache_resource
+def get_schedule_index():
+    # loaded once per process and shared; later results are picked up by refresh()
+    from schedule_index import ScheduleIndex
+
+    if not os.path.exists(SCHEDULE_PATH):
+        return None
+    try:
+        return ScheduleIndex(SCHEDULE_PATH)
+    except (OSError, ValueError) as e:
+        st.warning(f"Couldn't load the schedule file ({e}); enter streaks and rest days by hand.")
+        return None
+
+
+def show_scoring_error(e):
+    if not isinstance(e, ScoringError):  # requests.RequestException
+        st.error("Network error while contacting the model (retries exhausted).")
+        st.exception(e)
+        return
+    st.error(f"{e} See logs for details.")
+    if e.headers:
+        st.write("Response headers:", e.headers)
+    if e.body is not None:
+        # print a trimmed response body to help debugging
+        st.write("Response body (truncated):")
+        st.code(e.body[:2000])
+
+
+def show_backend(backend, what="scored"):
+    if SCORER_BACKEND == "local":
+        st.caption(f"{what.capitalize()} by the local model.")
+    elif backend == "local":
+        st.caption(f"Endpoint unavailable or slow: {what} by the local model.")
 
 
 # -------------------------
-# INPUT FORM
+# FOOTER MARKUP
 # -------------------------
-st.markdown("<div class='main-card'>", unsafe_allow_html=True)
-st.subheader("Game Inputs")
+FOOTER_HTML = """
+<hr style="border:1px solid #333; margin-top:50px;">
 
-col1, col2 = st.columns(2)
+<div style="
+    text-align:center;
+    color:#AAAAAA;
+    font-family: Arial, sans-serif;
+    font-size:14px;
+    line-height:1.6;
+">
+    <strong style="font-size:16px; color:#F0B940;">Rana Baranski</strong><br>
+    CIS 508 – Fall 2025<br><br>
 
-# LEFT COLUMN
-with col1:
-    location = st.selectbox("Location", ["Home", "Away"])
+    <em>
+    This project is an academic demonstration created for educational purposes only.
+    It is not affiliated with, endorsed by, or sponsored by the Phoenix Suns, the NBA,
+    or any related organizations. Team names, logos, and images are used solely for
+    illustrative purposes and are not intended to infringe upon any copyrighted material.
+    </em>
+</div>
+"""
 
-    suns_streak_raw = st.text_input("Suns' Streak", value="", placeholder="e.g., -2 or 3")
-    st.markdown('<div class="sublabel">Losses represented with (-)</div>', unsafe_allow_html=True)
 
-    suns_rest = st.number_input("Suns’ Rest Days", min_value=1, step=1, value=1)
+# -------------------------
+# BATCH SLATE MODE
+# -------------------------
+def render_batch_slate():
+    st.subheader("Batch Slate")
+    st.markdown(
+        '<div class="sublabel">CSV or Parquet with columns: '
+        'opponent, location, suns_streak, opp_streak, suns_rest, opp_rest</div>',
+        unsafe_allow_html=True,
+    )
 
-# RIGHT COLUMN
-with col2:
-    opponent = st.selectbox("Opponent", [
-        "ATL","BOS","BRK","CHI","CHO","CLE","DAL","DEN","DET","GSW",
-        "HOU","IND","LAC","LAL","MEM","MIA","MIL","MIN","NOP","NYK",
-        "OKC","ORL","PHI","POR","SAC","SAS","TOR","UTA","WAS"
-    ])
+    uploaded = st.file_uploader("Games File", type=["csv", "parquet"])
+    batch_size = st.number_input("Rows Per Request", min_value=1, step=1, value=BATCH_SIZE)
 
-    opp_streak_raw = st.text_input("Opponent Streak", value="", placeholder="e.g., -1 or 4")
-    st.markdown('<div class="sublabel">Losses represented with (-)</div>', unsafe_allow_html=True)
+    if uploaded is None:
+        st.session_state.pop("slate_results", None)
+        return
+
+    try:
+        games = read_games(uploaded)
+        valid, invalid = validate_games(games)
+    except ValueError as e:
+        st.error(f"Couldn't use this file: {e}")
+        return
+
+    if len(invalid):
+        st.warning(f"{len(invalid)} row(s) failed validation and will be skipped.")
+        st.dataframe(invalid, width="stretch")
+    if valid.empty:
+        st.error("No valid game rows to score.")
+        return
+
+    if st.button("SCORE SLATE"):
+        with st.spinner(f"Scoring {len(valid)} games…"):
+            try:
+                results = get_service().score_frame(valid, batch_size=int(batch_size))
+            except SCORING_ERRORS as e:
+                show_scoring_error(e)
+                return
+
+        results["explanation"] = results["explanation"].str.join(" ")
+        # kept in session state so the download click (a rerun) doesn't drop the table
+        st.session_state["slate_results"] = results
+        st.session_state["slate_backend"] = get_service().last_backend
+
+    results = st.session_state.get("slate_results")
+    if results is not None:
+        wins = int((results["prediction"] == "WIN").sum())
+        st.markdown(f"<div style='color:white; font-family:Bebas Neue; font-size:24px;'>"
+                    f"Projected record: {wins}-{len(results) - wins}</div>", unsafe_allow_html=True)
+        show_backend(st.session_state.get("slate_backend"))
+        st.dataframe(results, width="stretch")
+        st.download_button(
+            "DOWNLOAD RESULTS",
+            results.to_csv(index=False),
+            file_name="slate_predictions.csv",
+            mime="text/csv",
+        )
 
-    opp_rest = st.number_input("Opponent Rest Days", min_value=1, step=1, value=1)
 
-predict_pressed = st.button("PREDICT")
-st.markdown("</div>", unsafe_allow_html=True)
+# -------------------------
+# WHAT-IF GRID MODE
+# -------------------------
+FIELD_LABELS = {
+    "suns_streak": "Suns' Streak",
+    "opp_streak": "Opponent Streak",
+    "suns_rest": "Suns' Rest Days",
+    "opp_rest": "Opponent Rest Days",
+}
+
+
+@st.cache_data(ttl=PREDICTION_CACHE_TTL, show_spinner=False)
+def score_grid(base, row_field, row_values, col_field, col_values):
+    # cached on the grid definition only, so display tweaks never rescore
+    import pandas as pd
+
+    records = grid_records(base, row_field, row_values, col_field, col_values)
+    probs = get_service().score(records, batch_size=GRID_BATCH_SIZE)
+    grid = pd.DataFrame(records)
+    grid["win_probability"] = probs
+    return grid
+
+
+def render_heatmap(grid, row_field, col_field, show_values, scheme):
+    import altair as alt
+
+    base = alt.Chart(grid).encode(
+        x=alt.X(f"{col_field}:O", title=FIELD_LABELS[col_field]),
+        y=alt.Y(f"{row_field}:O", title=FIELD_LABELS[row_field], sort="descending"),
+    )
+    chart = base.mark_rect().encode(
+        color=alt.Color("win_probability:Q", title="Win Prob",
+                        scale=alt.Scale(scheme=scheme, domain=[0, 1])),
+        tooltip=[row_field, col_field, alt.Tooltip("win_probability:Q", format=".3f")],
+    )
+    if show_values:
+        chart += base.mark_text(fontSize=11).encode(
+            text=alt.Text("win_probability:Q", format=".2f"),
+            color=alt.value("black"),
+        )
+    st.altair_chart(chart, width="stretch")
+
+
+def render_what_if():
+    st.subheader("What-If Grid")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        location = st.selectbox("Location", LOCATIONS)
+        suns_rest = st.number_input("Suns’ Rest Days", min_value=1, step=1, value=1)
+    with col2:
+        opponent = st.selectbox("Opponent", TEAMS)
+        opp_rest = st.number_input("Opponent Rest Days", min_value=1, step=1, value=1)
+
+    streak_lo, streak_hi = st.slider("Streak Range", min_value=-10, max_value=10, value=(-5, 5))
+    vary_rest = st.checkbox("Also vary rest days (at the streaks below)")
+    if vary_rest:
+        col1, col2 = st.columns(2)
+        with col1:
+            suns_streak = st.number_input("Suns' Streak", step=1, value=0)
+        with col2:
+            opp_streak = st.number_input("Opponent Streak", step=1, value=0)
+        rest_hi = st.slider("Max Rest Days", min_value=1, max_value=10, value=4)
+
+    # display-only options: not part of score_grid's cache key
+    show_values = st.checkbox("Show cell values", value=True)
+    scheme = st.selectbox("Color Scheme", ["redyellowgreen", "goldred", "viridis", "blues"])
+
+    streaks = tuple(range(streak_lo, streak_hi + 1))
+    grids = [(
+        {"opponent": opponent, "location": location, "suns_rest": int(suns_rest), "opp_rest": int(opp_rest)},
+        "suns_streak", streaks, "opp_streak", streaks,
+    )]
+    if vary_rest:
+        rests = tuple(range(1, rest_hi + 1))
+        grids.append((
+            {"opponent": opponent, "location": location,
+             "suns_streak": int(suns_streak), "opp_streak": int(opp_streak)},
+            "suns_rest", rests, "opp_rest", rests,
+        ))
+
+    for base, row_field, row_values, col_field, col_values in grids:
+        with st.spinner(f"Scoring {len(row_values) * len(col_values)} scenarios…"):
+            try:
+                grid = score_grid(base, row_field, row_values, col_field, col_values)
+            except SCORING_ERRORS as e:
+                show_scoring_error(e)
+                return
+        st.markdown(f"**{FIELD_LABELS[row_field]} × {FIELD_LABELS[col_field]}** vs {opponent} ({location})")
+        render_heatmap(grid, row_field, col_field, show_values, scheme)
 
 
 # -------------------------
-# HELPER: EXTRACT PROBABILITY FROM RESPONSE
+# BACKTEST MODE
 # -------------------------
-def extract_prob_from_resp(resp):
-    """
-    Try several heuristics to find a probability value in the response JSON.
-    Returns float(prob) or None if not found.
-    """
-    # Common candidate keys
-    candidate_keys = ["predictions", "results", "outputs", "data", "prediction"]
-    for k in candidate_keys:
-        if k in resp:
-            val = resp[k]
-            # handle nested lists e.g. [[0.7]] or [0.7]
-            if isinstance(val, list):
-                if len(val) > 0:
-                    first = val[0]
-                    if isinstance(first, list) and len(first) > 0:
-                        cand = first[0]
-                    else:
-                        cand = first
-                else:
-                    continue
-            else:
-                cand = val
-            # if dict with score key
-            if isinstance(cand, dict):
-                for subk in ("score", "probability", "prob", "score_value", "value"):
-                    if subk in cand:
-                        try:
-                            return float(cand[subk])
-                        except Exception:
-                            pass
-            # if directly numeric-ish
+def render_backtest_metrics(snap):
+    cols = st.columns(5)
+    cols[0].metric("Games", f"{snap['games']:,}")
+    for col, (label, key, fmt) in zip(cols[1:], (
+        ("Accuracy", "accuracy", "{:.1%}"),
+        ("Log-Loss", "log_loss", "{:.4f}"),
+        ("Brier", "brier", "{:.4f}"),
+        ("ECE", "ece", "{:.4f}"),
+    )):
+        col.metric(label, "—" if snap[key] is None else fmt.format(snap[key]))
+    if snap["skipped"]:
+        st.caption(f"{snap['skipped']} row(s) skipped (failed validation or no readable result).")
+    local = snap["backends"].get("local", 0)
+    if SCORER_BACKEND == "local":
+        show_backend("local")
+    elif local:
+        st.caption(f"Endpoint unavailable or slow: {local:,} of {snap['games']:,} games scored by the local model.")
+
+
+def render_calibration(snap):
+    import altair as alt
+
+    if not snap["calibration"]:
+        return
+    points = alt.Chart(alt.Data(values=snap["calibration"])).encode(
+        x=alt.X("mean_prob:Q", title="Predicted Win Probability", scale=alt.Scale(domain=[0, 1])),
+        y=alt.Y("win_rate:Q", title="Observed Win Rate", scale=alt.Scale(domain=[0, 1])),
+        tooltip=["bin:N", "count:Q", alt.Tooltip("mean_prob:Q", format=".3f"), alt.Tooltip("win_rate:Q", format=".3f")],
+    )
+    diagonal = alt.Chart(alt.Data(values=[{"p": 0}, {"p": 1}])).mark_line(
+        color="gray", strokeDash=[4, 4]
+    ).encode(x="p:Q", y="p:Q")
+    chart = diagonal + points.mark_line(color="#E56020") + points.mark_circle(color="#E56020", size=80)
+    st.altair_chart(chart, width="stretch")
+
+
+def render_backtest():
+    # backtest pulls in pandas / numpy; only pay for them when this mode is opened
+    from backtest import OUTCOME_FIELD, iter_game_log, run_backtest
+
+    st.subheader("Backtest")
+    st.markdown(
+        '<div class="sublabel">CSV or JSONL game log with columns: '
+        f'opponent, location, suns_streak, opp_streak, suns_rest, opp_rest, {OUTCOME_FIELD} (W/L or 1/0)</div>',
+        unsafe_allow_html=True,
+    )
+
+    uploaded = st.file_uploader("Game Log", type=["csv", "jsonl", "ndjson"])
+    chunk_size = st.number_input("Rows Per Chunk", min_value=100, step=100, value=1000)
+
+    if uploaded is None:
+        st.session_state.pop("backtest_results", None)
+        return
+
+    if st.button("RUN BACKTEST"):
+        st.session_state.pop("backtest_results", None)
+        progress = st.progress(0.0)
+        summary, chart = st.empty(), st.empty()
+        snap = None
+        try:
+            uploaded.seek(0)
+            chunks = iter_game_log(uploaded, int(chunk_size), name=uploaded.name)
+            # each snapshot redraws the placeholders, so the numbers fill in as the log streams through
+            for snap in run_backtest(get_service(), chunks, batch_size=BATCH_SIZE):
+                progress.progress(min(uploaded.tell() / max(uploaded.size, 1), 1.0),
+                                  text=f"{snap['games']:,} games scored")
+                with summary.container():
+                    render_backtest_metrics(snap)
+                with chart.container():
+                    render_calibration(snap)
+        except ValueError as e:
+            st.error(f"Couldn't use this file: {e}")
+            return
+        except SCORING_ERRORS as e:
+            show_scoring_error(e)
+            return
+        progress.empty()
+        # kept in session state so other widget changes (reruns) don't drop the results
+        st.session_state["backtest_results"] = snap
+        return
+
+    snap = st.session_state.get("backtest_results")
+    if snap is not None:
+        render_backtest_metrics(snap)
+        render_calibration(snap)
+
+
+# -------------------------
+# SEASON OUTLOOK MODE
+# -------------------------
+def render_win_totals(result):
+    import altair as alt
+
+    rows = [{"wins": wins, "share": share, "playoffs": wins >= result["playoff_wins"]}
+            for wins, share in result["win_totals"].items()]
+    chart = alt.Chart(alt.Data(values=rows)).mark_bar().encode(
+        x=alt.X("wins:O", title="Final Win Total"),
+        y=alt.Y("share:Q", title="Share of Simulations", axis=alt.Axis(format="%")),
+        color=alt.Color("playoffs:N", scale=alt.Scale(domain=[False, True], range=["#7D344F", "#E56020"]),
+                        legend=None),
+        tooltip=["wins:O", alt.Tooltip("share:Q", format=".1%")],
+    )
+    st.altair_chart(chart, width="stretch")
+
+
+def render_season_outlook():
+    # season_sim pulls in numpy; only pay for it when this mode is opened
+    from season_sim import DEFAULT_PLAYOFF_WINS, simulate_season
+
+    st.subheader("Season Outlook")
+    index = get_schedule_index()
+    if index is None:
+        st.info(f"Needs a schedule / results file at {SCHEDULE_PATH} (set SCHEDULE_PATH).")
+        return
+    index.refresh()
+    season = index.remaining_schedule()
+    if not season["games"]:
+        st.info("No unplayed Suns games in the schedule file.")
+        return
+    st.markdown(
+        f'<div class="sublabel">Record {season["wins"]}-{season["losses"]}, streak {season["streak"]:+d}, '
+        f'{len(season["games"])} games left</div>',
+        unsafe_allow_html=True,
+    )
+
+    paths = st.select_slider("Simulated Seasons", options=[1000, 5000, 10000, 20000, 50000, 100000], value=20000)
+    playoff_wins = st.number_input("Playoff Win Line", min_value=1, max_value=82, step=1, value=DEFAULT_PLAYOFF_WINS)
+
+    if st.button("SIMULATE"):
+        with st.spinner(f"Simulating {paths:,} seasons…"):
             try:
-                return float(cand)
-            except Exception:
-                pass
-
-    # Fallback: search the whole JSON for first float between 0 and 1
-    def find_float(obj):
-        if isinstance(obj, dict):
-            for v in obj.values():
-                res = find_float(v)
-                if res is not None:
-                    return res
-        elif isinstance(obj, list):
-            for v in obj:
-                res = find_float(v)
-                if res is not None:
-                    return res
+                result = simulate_season(get_service(), season, paths=paths, playoff_wins=int(playoff_wins),
+                                         batch_size=GRID_BATCH_SIZE)
+            except SCORING_ERRORS as e:
+                show_scoring_error(e)
+                return
+        # kept in session state so later reruns don't drop the results
+        st.session_state["season_results"] = result
+
+    result = st.session_state.get("season_results")
+    if result is not None:
+        cols = st.columns(4)
+        cols[0].metric("Projected Wins", f"{result['mean_wins']:.1f}")
+        cols[1].metric("90% Range", f"{result['p5_wins']}–{result['p95_wins']}")
+        cols[2].metric("Median", result["p50_wins"])
+        cols[3].metric(f"{result['playoff_wins']}+ Wins", f"{result['playoff_odds']:.1%}")
+        show_backend(result["backend"], "probabilities scored")
+        render_win_totals(result)
+        st.dataframe(result["games"], hide_index=True, width="stretch",
+                     column_config={"win_rate": st.column_config.ProgressColumn("Win Rate", min_value=0, max_value=1)})
+
+
+# -------------------------
+# ADMIN METRICS PANEL + FOOTER
+# -------------------------
+def render_admin_panel():
+    if not (ADMIN_METRICS or st.query_params.get("admin") == "1"):
+        return
+    snap = metrics.snapshot()
+    with st.sidebar.expander("Latency (ms)", expanded=True):
+        rows = [
+            {"stage": stage, "count": s["count"],
+             **{q: round(s[q] * 1000, 2) for q in ("p50", "p95", "p99") if s[q] is not None}}
+            for stage, s in snap["stages"].items()
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True, width="stretch")
         else:
-            try:
-                f = float(obj)
-                if 0.0 <= f <= 1.0:
-                    return f
-            except Exception:
-                pass
-        return None
+            st.caption("No samples yet.")
+        counters = dict(snap["counters"])
+        counters.update(get_service().stats())
+        st.json(counters, expanded=False)
+        st.download_button("Prometheus text", metrics.to_prometheus(), file_name="metrics.prom")
+        st.download_button("JSONL snapshot", metrics.to_jsonl(), file_name="metrics.jsonl")
+
+
+def render_footer():
+    render_admin_panel()
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+
+
+# -------------------------
+# MODE SELECTION
+# -------------------------
+MODES = {
+    "Batch Slate": render_batch_slate,
+    "What-If Grid": render_what_if,
+    "Backtest": render_backtest,
+    "Season Outlook": render_season_outlook,
+}
+
+mode = st.sidebar.radio("Mode", ["Single Game", *MODES])
 
-    return find_float(resp)
+if mode in MODES:
+    MODES[mode]()
+    render_footer()
+    st.stop()
 
 
 # -------------------------
-# ON PREDICT CLICK
+# SINGLE GAME MODE
 # -------------------------
-if predict_pressed:
+# The inputs live in a form (typing / picking doesn't rerun anything) inside a
+# fragment (PREDICT reruns only this function), so the CSS, header, sidebar and
+# footer aren't re-emitted on every interaction.
+SINGLE_GAME_DEFAULTS = {"suns_streak_raw": "", "opp_streak_raw": "", "suns_rest": 1, "opp_rest": 1}
+
+
+def fill_from_schedule():
+    # on_change of the opponent / game date pickers: the form fields below take the looked-up values
+    index = get_schedule_index()
+    features = index.features(st.session_state["opponent"], st.session_state["game_date"])
+    st.session_state["suns_streak_raw"] = str(features["suns_streak"])
+    st.session_state["opp_streak_raw"] = str(features["opp_streak"])
+    st.session_state["suns_rest"] = features["suns_rest"]
+    st.session_state["opp_rest"] = features["opp_rest"]
+
+
+@st.fragment
+def render_single_game():
+    with metrics.span("single_game_fragment"):
+        fresh = "suns_streak_raw" not in st.session_state
+        for key, value in SINGLE_GAME_DEFAULTS.items():
+            st.session_state.setdefault(key, value)
+
+        # -------------------------
+        # SCHEDULE PICKER (only with a results file)
+        # -------------------------
+        # outside the form, so picking an opponent or a date reruns this fragment and
+        # fills the streak / rest fields (still editable) from the schedule index
+        index = get_schedule_index()
+        if index is not None:
+            new_results = index.refresh()
+            col1, col2 = st.columns(2)
+            with col1:
+                opponent = st.selectbox("Opponent", TEAMS, key="opponent", on_change=fill_from_schedule)
+            with col2:
+                st.date_input("Game Date", key="game_date", on_change=fill_from_schedule)
+            if fresh or new_results:
+                fill_from_schedule()
+
+        # -------------------------
+        # INPUT FORM
+        # -------------------------
+        with st.form("game_inputs", border=False):
+            st.markdown("<div class='main-card'>", unsafe_allow_html=True)
+            st.subheader("Game Inputs")
+
+            col1, col2 = st.columns(2)
+
+            # LEFT COLUMN
+            with col1:
+                location = st.selectbox("Location", LOCATIONS)
+
+                suns_streak_raw = st.text_input("Suns' Streak", key="suns_streak_raw", placeholder="e.g., -2 or 3")
+                st.markdown('<div class="sublabel">Losses represented with (-)</div>', unsafe_allow_html=True)
+
+                suns_rest = st.number_input("Suns’ Rest Days", min_value=1, step=1, key="suns_rest")
+
+            # RIGHT COLUMN
+            with col2:
+                if index is None:
+                    opponent = st.selectbox("Opponent", TEAMS)
+
+                opp_streak_raw = st.text_input("Opponent Streak", key="opp_streak_raw", placeholder="e.g., -1 or 4")
+                st.markdown('<div class="sublabel">Losses represented with (-)</div>', unsafe_allow_html=True)
+
+                opp_rest = st.number_input("Opponent Rest Days", min_value=1, step=1, key="opp_rest")
+
+            predict_pressed = st.form_submit_button("PREDICT")
+            st.markdown("</div>", unsafe_allow_html=True)
+
+        # -------------------------
+        # ON PREDICT CLICK
+        # -------------------------
+        if predict_pressed:
+            render_prediction(location, opponent, suns_streak_raw, opp_streak_raw, suns_rest, opp_rest)
+
+
+def render_prediction(location, opponent, suns_streak_raw, opp_streak_raw, suns_rest, opp_rest):
 
     # Convert streak strings → integers
     try:
@@ -335,110 +797,66 @@ if predict_pressed:
         opp_streak = int(opp_streak_raw)
     except:
         st.error("Please enter valid streak values (e.g., -2, 0, 3).")
-        st.stop()
-
-    payload = {
-        "dataframe_records": [{
-            "opponent": opponent,
-            "location": location,
-            "suns_streak": suns_streak,
-            "opp_streak": opp_streak,
-            "suns_rest": int(suns_rest),
-            "opp_rest": int(opp_rest),
-        }]
+        return
+
+    record = {
+        "opponent": opponent,
+        "location": location,
+        "suns_streak": suns_streak,
+        "opp_streak": opp_streak,
+        "suns_rest": int(suns_rest),
+        "opp_rest": int(opp_rest),
     }
 
     # -------------------------
     # SAFE REQUEST + PARSING
     # -------------------------
+    # Repeated inputs are answered from the shared cache without touching the endpoint
+    service = get_service()
     with st.spinner("Contacting model…"):
         try:
-            r = requests.post(
-                ENDPOINT_URL,
-                headers={
-                    "Authorization": f"Bearer {DATABRICKS_TOKEN}",
-                    "Content-Type": "application/json",
-                },
-                json=payload,
-                timeout=30,  # good to have a timeout
-            )
-        except requests.RequestException as e:
-            st.error("Network error while contacting the model.")
-            st.exception(e)
-            st.stop()
-
-        # Show HTTP-level problems
-        try:
-            r.raise_for_status()
-        except requests.HTTPError:
-            st.error(f"Model endpoint returned HTTP {r.status_code}. See logs for details.")
-            st.write("Response headers:", dict(r.headers))
-            # print a trimmed response body to help debugging
-            text = r.text or ""
-            st.write("Response body (truncated):")
-            st.code(text[:2000])
-            st.stop()
-
-        # Try to parse JSON safely
-        try:
-            resp = r.json()
-        except ValueError:
-            st.error("Response from model is not valid JSON. See raw response below.")
-            st.code(r.text[:4000])
-            st.stop()
-
-        # Attempt to extract a probability
-        prob = extract_prob_from_resp(resp)
-
-        if prob is None:
-            st.error("Couldn't find a numeric probability in the model response.")
-            st.subheader("Model response (for debugging)")
-            st.json(resp)
-            st.stop()
+            prediction = service.predict(record)
+        except SCORING_ERRORS as e:
+            show_scoring_error(e)
+            return
 
     # -------------------------
     # DISPLAY RESULTS
     # -------------------------
-    result = "WIN" if prob >= 0.5 else "LOSS"
-    color = "#f3d221" if result == "WIN" else "#e0357f"
-
-    st.markdown(f"""
-        <h2 style='color:{color}; font-family:Anton; text-shadow:2px 2px 5px #000;'>
-            Suns {result}!
-        </h2>
-        <div style='color:white; font-family:Bebas Neue; font-size:24px;'>
-            Win Probability: {prob:.3f}
-        </div>
-    """, unsafe_allow_html=True)
+    prob = prediction["win_probability"]
+    explanation = prediction["explanation"]
+
+    # server-side cost of emitting the result elements (browser paint isn't visible here)
+    with metrics.span("render"):
+        result = "WIN" if prob >= 0.5 else "LOSS"
+        color = "#f3d221" if result == "WIN" else "#e0357f"
+
+        st.markdown(f"""
+            <h2 style='color:{color}; font-family:Anton; text-shadow:2px 2px 5px #000;'>
+                Suns {result}!
+            </h2>
+            <div style='color:white; font-family:Bebas Neue; font-size:24px;'>
+                Win Probability: {prob:.3f}
+            </div>
+        """, unsafe_allow_html=True)
+
+        st.subheader("Why This Prediction?")
+        for line in explanation:
+            st.markdown(f"- {line}")
+
+        show_backend(prediction["backend"])
+        if service.cache is not None:
+            stats = service.cache.stats()
+            st.caption(
+                f"Prediction cache: {stats['hits']} hits / {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate, {stats['size']} entries)"
+            )
 
-    explanation = generate_explanation(payload["dataframe_records"][0], prob)
 
-    st.subheader("Why This Prediction?")
-    for line in explanation:
-        st.markdown(f"- {line}")
+render_single_game()
 
 
 # -------------------------
 # FOOTER
 # -------------------------
-st.markdown("""
-<hr style="border:1px solid #333; margin-top:50px;">
-
-<div style="
-    text-align:center;
-    color:#AAAAAA;
-    font-family: Arial, sans-serif;
-    font-size:14px;
-    line-height:1.6;
-">
-    <strong style="font-size:16px; color:#F0B940;">Rana Baranski</strong><br>
-    CIS 508 – Fall 2025<br><br>
-
-    <em>
-    This project is an academic demonstration created for educational purposes only.
-    It is not affiliated with, endorsed by, or sponsored by the Phoenix Suns, the NBA,
-    or any related organizations. Team names, logos, and images are used solely for
-    illustrative purposes and are not intended to infringe upon any copyrighted material.
-    </em>
-</div>
-""", unsafe_allow_html=True)
+render_footer()
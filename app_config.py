@@ -0,0 +1,29 @@
+"""
+Settings of the Streamlit app itself. app.py is re-executed on every rerun,
+so these are read here, once per process. The endpoint, scorer backend,
+batching, caching, hedging / breaker, warm-keeper and prediction store are
+configured through the environment variables documented in service.py.
+"""
+import os
+
+# What-if grids: rows per endpoint call (a default 11x11 streak grid fits in one call)
+GRID_BATCH_SIZE = int(os.environ.get("GRID_BATCH_SIZE", "500"))
+
+# Latency metrics: admin sidebar (or ?admin=1), periodic file export and an optional /metrics port
+ADMIN_METRICS = os.environ.get("ADMIN_METRICS", "0") == "1"
+METRICS_PROM_PATH = os.environ.get("METRICS_PROM_PATH")
+METRICS_JSONL_PATH = os.environ.get("METRICS_JSONL_PATH")
+METRICS_EXPORT_INTERVAL = float(os.environ.get("METRICS_EXPORT_INTERVAL", "15"))
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+
+# Self-hosted assets (built by tools/build_assets.py, served from static/ at app/static/)
+STATIC_URL = "app/static"
+ASSET_MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "assets.json")
+# used only when the static assets haven't been built
+FALLBACK_IMAGE_URL = "https://raw.githubusercontent.com/rbarans/508-term-project/refs/heads/main/valley.jpg"
+FALLBACK_FONTS_URL = "https://fonts.googleapis.com/css2?family=Anton&family=Bebas+Neue&display=swap"
+
+# Results file for filling streaks / rest days from a game date (see schedule_index.py); no file, no picker
+SCHEDULE_PATH = os.environ.get(
+    "SCHEDULE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedule.csv")
+)
@@ -0,0 +1,47 @@
+"""
+ASGI entry point: app.py plus long-lived cache headers for the self-hosted
+assets. Streamlit serves static/ at app/static/ with an ETag but no
+max-age, so every page load revalidates every image and font. The files
+tools/build_assets.py writes carry a content hash in their names (a new
+build means new URLs), so they can be cached as immutable.
+
+    streamlit run asgi.py          (same flags / config as `streamlit run app.py`)
+    uvicorn asgi:app --port 8501
+
+`streamlit run app.py` still works; it just sends no cache headers.
+"""
+import re
+
+import streamlit as st
+from starlette.middleware import Middleware
+
+from app_config import STATIC_URL
+
+# static/<dir>/<stem>.<10 hex digits>.<ext>, as named by tools/build_assets.py
+HASHED_ASSET = re.compile(rf"/{re.escape(STATIC_URL)}/.+\.[0-9a-f]{{10}}\.\w+$")
+IMMUTABLE = b"public, max-age=31536000, immutable"
+
+
+class HashedAssetCacheHeaders:
+    """
+    Adds Cache-Control: immutable to successful responses for hashed asset
+    paths; everything else passes through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not HASHED_ASSET.search(scope["path"]):
+            return await self.app(scope, receive, send)
+
+        async def send_with_cache_headers(message):
+            if message["type"] == "http.response.start" and message["status"] in (200, 304):
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+                message = {**message, "headers": [*headers, (b"cache-control", IMMUTABLE)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_headers)
+
+
+app = st.App("app.py", middleware=[Middleware(HashedAssetCacheHeaders)])
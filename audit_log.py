@@ -0,0 +1,194 @@
+"""
+Audit log of every scoring call (ScoringService.score): the rows asked
+for, the probabilities returned, latency, the backend that answered
+("http", "local", or "cache" when no row had to be scored) and, for a
+failed call, the error.
+
+record() is all the scoring path pays: it puts a tuple of references (no
+copying, no serialization) on a bounded queue without waiting. When the
+queue is full the record is dropped and counted (audit_dropped), so a slow
+or full disk costs audit lines, never prediction latency; so is a record
+that can't be serialized. A background
+writer thread, started by the first record, serializes the records and
+appends them to gzip-compressed JSONL files in `directory`
+
+    audit-20250114-183012-4242-0000.jsonl.gz    (start time, process id, file number)
+
+flushing after every batch so a file is readable while it is written
+(`zcat` / gzip.open). A file is closed and a new one started once it
+reaches max_bytes or is rotate_s old; only the newest `keep` files are
+kept. Pending records are written out at interpreter exit.
+"""
+import atexit
+import glob
+import gzip
+import os
+import queue
+import threading
+import time
+
+from endpoint_client import dumps
+from metrics import metrics
+
+_STOP = object()
+
+
+class AuditLog:
+    """
+    Bounded-queue, background-written audit log (see module docstring).
+    """
+
+    def __init__(self, directory, queue_size=10000, max_bytes=50 * 2**20, rotate_s=86400.0, keep=20,
+                 batch_size=256, flush_interval=1.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rotate_s = rotate_s
+        self.keep = keep
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._file = None
+        self._gzip = None
+        self._opened_at = None
+        self.path = None
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.files = 0
+
+    def record(self, records, probs, latency, backend=None, error=None):
+        """
+        Queue one scoring call for the log; never blocks.
+        """
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((time.time(), backend, latency, records, probs, error))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            metrics.incr("audit_dropped")
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    # -------------------------
+    # WRITER THREAD
+    # -------------------------
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            batch = [item for item in batch if item is not _STOP]
+            try:
+                if batch:
+                    self._write(batch)
+                if self._gzip is not None and (stop or self._due_for_rotation()):
+                    self._close_file()
+            except Exception:
+                # a full / read-only disk (or anything else) must never stop the writer; the batch is lost
+                with self._lock:
+                    self.write_errors += 1
+                metrics.incr("audit_write_errors")
+                self._close_file()
+            if stop:
+                return
+
+    def _write(self, batch):
+        lines = []
+        for item in batch:
+            try:
+                lines.append(self._serialize(*item) + b"\n")
+            except Exception:
+                # one unserializable record (a stray numpy scalar, a set, ...) is dropped, not the batch
+                with self._lock:
+                    self.dropped += 1
+                metrics.incr("audit_dropped")
+        if not lines:
+            return
+        if self._gzip is None:
+            self._open_file()
+        self._gzip.write(b"".join(lines))
+        self._gzip.flush()  # sync flush: everything so far decompresses
+        with self._lock:
+            self.written += len(lines)
+        metrics.incr("audit_written", len(lines))
+
+    @staticmethod
+    def _serialize(ts, backend, latency, records, probs, error):
+        return dumps({"ts": ts, "backend": backend, "latency_ms": round(latency * 1000, 2),
+                      "rows": len(records), "probs": probs, "error": error, "records": records})
+
+    def _due_for_rotation(self):
+        return (self._file.tell() >= self.max_bytes
+                or time.monotonic() - self._opened_at >= self.rotate_s)
+
+    def _open_file(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            number = self.files
+            self.files += 1
+        name = f"audit-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{number:04d}.jsonl.gz"
+        self.path = os.path.join(self.directory, name)
+        self._file = open(self.path, "ab")
+        self._gzip = gzip.GzipFile(fileobj=self._file, mode="ab", compresslevel=6)
+        self._opened_at = time.monotonic()
+        self._prune()
+
+    def _close_file(self):
+        try:
+            if self._gzip is not None:
+                self._gzip.close()
+            if self._file is not None:
+                self._file.close()
+        except OSError:
+            pass
+        self._gzip = self._file = None
+
+    def _prune(self):
+        if not self.keep:
+            return
+        try:
+            # names start with the start time, so they sort oldest first
+            paths = sorted(glob.glob(os.path.join(self.directory, "audit-*.jsonl.gz")))
+            for old in paths[:-self.keep]:
+                os.remove(old)
+        except OSError:
+            pass  # another process pruned it first
+
+    def close(self, timeout=5.0):
+        """
+        Write out what is queued and close the current file.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "queued": self._queue.qsize(),
+                "write_errors": self.write_errors,
+                "files": self.files,
+            }
@@ -0,0 +1,179 @@
+"""
+Historical backtest: replay a game log through the scorer and grade it.
+
+A game log is a CSV or JSONL file with the six feature columns the form
+collects plus the result, OUTCOME_FIELD (1/0, W/L, win/loss or true/false).
+It is read in chunks and every chunk goes
+read -> validate -> score (the normal scorer stack, cache included) -> grade
+before the next one is read, so memory stays flat however many seasons the
+file holds. run_backtest() yields a metrics snapshot after each chunk, so
+callers can show the numbers filling in as the file streams through.
+
+    python service.py backtest games.csv --chunk-size 2000
+"""
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from scoring import FEATURE_FIELDS, validate_games
+
+OUTCOME_FIELD = "suns_win"
+LOG_FIELDS = [*FEATURE_FIELDS, OUTCOME_FIELD]
+WIN_VALUES = {"1", "1.0", "w", "win", "true", "t", "yes", "y"}
+LOSS_VALUES = {"0", "0.0", "l", "loss", "false", "f", "no", "n"}
+
+# clipping for log-loss, so a confident miss costs a lot but not infinity
+EPS = 1e-15
+
+
+# -------------------------
+# READING
+# -------------------------
+def iter_game_log(source, chunk_size=1000, name=None):
+    """
+    DataFrames of at most `chunk_size` rows from a CSV or JSONL game log
+    (path or file-like object, text or binary). Only one chunk is in memory
+    at a time.
+    """
+    name = (name or getattr(source, "name", None) or str(source)).lower()
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        yield from _iter_jsonl(source, chunk_size)
+    else:
+        # dtype=str: validation does the type checks, as for uploaded slates
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype=str, skipinitialspace=True)
+
+
+def _iter_jsonl(source, chunk_size):
+    if isinstance(source, str):
+        f = open(source, encoding="utf-8")
+    elif isinstance(source, (io.BufferedIOBase, io.RawIOBase)) or "b" in getattr(source, "mode", ""):
+        f = io.TextIOWrapper(source, encoding="utf-8")
+    else:
+        f = source
+    try:
+        rows = []
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            rows.append(row if isinstance(row, dict) else {})  # fails validation downstream
+            if len(rows) >= chunk_size:
+                yield pd.DataFrame(rows, columns=LOG_FIELDS)
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows, columns=LOG_FIELDS)
+    finally:
+        if isinstance(source, str):
+            f.close()
+        elif f is not source:
+            f.detach()  # leave the caller's file open
+
+
+def parse_outcomes(values):
+    """
+    1.0 for a Suns win, 0.0 for a loss, NaN when unreadable.
+    """
+    text = values.astype(str).str.strip().str.lower()
+    return pd.Series(np.where(text.isin(WIN_VALUES), 1.0, np.where(text.isin(LOSS_VALUES), 0.0, np.nan)),
+                     index=values.index)
+
+
+# -------------------------
+# GRADING
+# -------------------------
+class BacktestMetrics:
+    """
+    Running accuracy, log-loss, Brier score and calibration bins. Only sums
+    are kept (O(bins) memory), updated one chunk at a time. `backends`
+    counts the games each backend answered, so a failover to the local
+    model shows up next to the numbers it affects.
+    """
+
+    def __init__(self, bins=10):
+        self.bins = bins
+        self.games = 0
+        self.skipped = 0
+        self.correct = 0
+        self.log_loss_sum = 0.0
+        self.brier_sum = 0.0
+        self.wins = 0.0
+        self.bin_count = np.zeros(bins, dtype=np.int64)
+        self.bin_prob = np.zeros(bins)
+        self.bin_wins = np.zeros(bins)
+        self.backends = {}
+
+    def update(self, probs, outcomes):
+        p = np.asarray(probs, dtype=float)
+        y = np.asarray(outcomes, dtype=float)
+        clipped = np.clip(p, EPS, 1 - EPS)
+        self.games += len(p)
+        self.correct += int(((p >= 0.5) == (y == 1.0)).sum())
+        self.log_loss_sum += float(-(y * np.log(clipped) + (1 - y) * np.log(1 - clipped)).sum())
+        self.brier_sum += float(((p - y) ** 2).sum())
+        self.wins += float(y.sum())
+        idx = np.minimum((p * self.bins).astype(np.int64), self.bins - 1)
+        self.bin_count += np.bincount(idx, minlength=self.bins)
+        self.bin_prob += np.bincount(idx, weights=p, minlength=self.bins)
+        self.bin_wins += np.bincount(idx, weights=y, minlength=self.bins)
+
+    def snapshot(self):
+        n = self.games
+        calibration = []
+        ece = 0.0
+        for i in range(self.bins):
+            count = int(self.bin_count[i])
+            if not count:
+                continue
+            mean_prob = self.bin_prob[i] / count
+            win_rate = self.bin_wins[i] / count
+            ece += count * abs(mean_prob - win_rate)
+            calibration.append({
+                "bin": f"{i / self.bins:.1f}-{(i + 1) / self.bins:.1f}",
+                "count": count,
+                "mean_prob": float(mean_prob),
+                "win_rate": float(win_rate),
+            })
+        return {
+            "games": n,
+            "skipped": self.skipped,
+            "accuracy": self.correct / n if n else None,
+            "log_loss": self.log_loss_sum / n if n else None,
+            "brier": self.brier_sum / n if n else None,
+            "base_rate": self.wins / n if n else None,
+            # expected calibration error: count-weighted gap between predicted and observed win rate
+            "ece": float(ece / n) if n else None,
+            "calibration": calibration,
+            "backends": dict(self.backends),
+        }
+
+
+def run_backtest(service, chunks, batch_size=None, bins=10):
+    """
+    Score and grade each chunk from `chunks` (e.g. iter_game_log()),
+    yielding the running metrics snapshot after every chunk. Rows that fail
+    validation or have no readable outcome are counted as skipped.
+    """
+    metrics = BacktestMetrics(bins)
+    for chunk in chunks:
+        if OUTCOME_FIELD not in chunk.columns:
+            raise ValueError(f"Missing required column: {OUTCOME_FIELD}")
+        chunk = chunk.reset_index(drop=True)
+        outcomes = parse_outcomes(chunk[OUTCOME_FIELD])
+        valid, invalid = validate_games(chunk)
+        # valid comes back renumbered 0..k-1; the chunk rows it holds are the ones not in invalid
+        outcomes = outcomes[chunk.index.difference(invalid.index)].reset_index(drop=True)
+        graded = outcomes.notna()
+        valid, outcomes = valid[graded], outcomes[graded]
+        metrics.skipped += len(chunk) - len(valid)
+        if len(valid):
+            probs = service.score(valid.to_dict("records"), batch_size=batch_size)
+            metrics.update(probs, outcomes)
+            backend = getattr(service, "last_backend", None)
+            if backend is not None:
+                metrics.backends[backend] = metrics.backends.get(backend, 0) + len(valid)
+        yield metrics.snapshot()
@@ -0,0 +1,243 @@
+"""
+Multi-session load test of the Single Game page.
+
+Each simulated session opens the real app.py with AppTest, then repeatedly
+fills in the game form (location, opponent, streaks, rest days) and clicks
+PREDICT against the local stub endpoint, optionally pausing between clicks.
+The session count is stepped up (--sessions 1,2,4,8,...) and each level
+reports
+
+  rerun latency   p50 / p95 / p99 of PREDICT reruns across all sessions
+  throughput      reruns per second for the whole level
+  cpu per session CPU time a session's reruns used (and per rerun)
+  rss per session memory a session adds on top of the app's imported modules
+  utilization     CPU used / (wall time x server cores)
+
+and the run reports the saturation point: the first level whose p95 exceeds
+--slo-ms or whose throughput grows less than --min-gain over the previous
+level. The level before it is what one server process can carry.
+
+AppTest isn't thread-safe (every run swaps in a process-global mock runtime),
+so each session is its own process. To model one `streamlit run` process,
+where every session's script shares one GIL, all session processes are
+pinned to --cores CPU cores (default 1); endpoint waits still overlap, as
+they do between session threads. Pinning needs Linux; elsewhere the sessions
+get every core and the numbers describe the host rather than one process.
+
+    python -m bench.load_test --sessions 1,2,4,8,16 --actions 20 --latency-ms 50
+    python -m bench.load_test --sessions 4,8 --think-ms 500 --slo-ms 300
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+
+from bench.run_bench import RESULTS_DIR, git_revision, summarize
+from bench.startup import import_app_modules
+from bench.stub_endpoint import StubEndpoint
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # peak rather than current RSS (kilobytes on Linux, bytes on macOS); close enough off Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _pin(cores):
+    if cores and hasattr(os, "sched_setaffinity"):
+        available = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, available[:cores])
+        return True
+    return False
+
+
+def _widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+# -------------------------
+# ONE SESSION (runs in its own process)
+# -------------------------
+def run_session(app_path, env, actions, think_ms, seed, cores, barrier, results):
+    """
+    Drive one AppTest session through `actions` PREDICT clicks; puts a result
+    dict on `results`.
+    """
+    pinned = _pin(cores)
+    os.environ.update(env)
+    sys.path.insert(0, os.path.dirname(app_path))
+    from streamlit.testing.v1 import AppTest
+
+    from scoring import LOCATIONS, TEAMS
+
+    import_app_modules(app_path)  # so a session's RSS excludes the modules every session shares
+    rng = random.Random(seed)
+    rss_before = _rss_bytes()
+    at = AppTest.from_file(app_path, default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    error = at.exception[0].message if at.exception else None
+
+    latencies, failures = [], 0
+    barrier.wait()
+    cpu_start, started = _cpu_seconds(), time.monotonic()
+    for _ in range(actions if error is None else 0):
+        _widget(at.selectbox, "Location").set_value(rng.choice(LOCATIONS))
+        _widget(at.selectbox, "Opponent").set_value(rng.choice(TEAMS))
+        _widget(at.text_input, "Suns' Streak").input(str(rng.randint(-5, 5)))
+        _widget(at.text_input, "Opponent Streak").input(str(rng.randint(-5, 5)))
+        _widget(at.number_input, "Suns’ Rest Days").set_value(rng.randint(1, 4))
+        _widget(at.number_input, "Opponent Rest Days").set_value(rng.randint(1, 4))
+        _widget(at.button, "PREDICT").click()
+        start = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - start)
+        if at.exception or not any("Win Probability" in m.value for m in at.markdown):
+            failures += 1
+        if think_ms:
+            time.sleep(rng.uniform(0.5, 1.5) * think_ms / 1000)
+    finished = time.monotonic()
+
+    results.put({
+        "latencies": latencies,
+        "failures": failures,
+        "error": error,
+        "cold_s": cold,
+        "cpu_s": _cpu_seconds() - cpu_start,
+        "rss_added": _rss_bytes() - rss_before,
+        "started": started,
+        "finished": finished,
+        "pinned": pinned,
+    })
+
+
+# -------------------------
+# LEVELS
+# -------------------------
+def run_level(app_path, env, n_sessions, actions, think_ms, cores, seed):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(n_sessions)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=run_session,
+                    args=(app_path, env, actions, think_ms, seed + i, cores, barrier, results))
+        for i in range(n_sessions)
+    ]
+    for p in procs:
+        p.start()
+    sessions = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    errors = [s["error"] for s in sessions if s["error"]]
+    if errors:
+        raise RuntimeError(f"app failed to start: {errors[0]}")
+    latencies = [x for s in sessions for x in s["latencies"]]
+    wall = max(s["finished"] for s in sessions) - min(s["started"] for s in sessions)
+    cpu = sum(s["cpu_s"] for s in sessions)
+    server_cores = cores if all(s["pinned"] for s in sessions) else os.cpu_count()
+    return {
+        "sessions": n_sessions,
+        "reruns": len(latencies),
+        "failures": sum(s["failures"] for s in sessions),
+        **summarize(latencies),
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "cpu_ms_per_session": cpu / n_sessions * 1000,
+        "cpu_ms_per_rerun": cpu / len(latencies) * 1000 if latencies else 0.0,
+        "rss_mb_per_session": sum(s["rss_added"] for s in sessions) / n_sessions / 2**20,
+        "utilization": cpu / (wall * server_cores) if wall else 0.0,
+        "cold_start_ms": max(s["cold_s"] for s in sessions) * 1000,
+    }
+
+
+def saturation(levels, slo_ms, min_gain):
+    """
+    (first saturated level, last level within limits) by session count; either
+    may be None.
+    """
+    previous = None
+    for level in levels:
+        over_slo = level["p95_ms"] is not None and level["p95_ms"] > slo_ms
+        flat = previous is not None and level["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain)
+        if over_slo or flat:
+            return level["sessions"], previous["sessions"] if previous else None
+        previous = level
+    return None, previous["sessions"] if previous else None
+
+
+def print_levels(levels):
+    cols = ("sessions", "p50_ms", "p95_ms", "p99_ms", "throughput_rps", "cpu_ms_per_session",
+            "cpu_ms_per_rerun", "rss_mb_per_session", "utilization", "failures")
+    print("".join(f"{c:>20}" for c in cols))
+    for level in levels:
+        print("".join(f"{level[c]:>20.2f}" if isinstance(level[c], float) else f"{str(level[c]):>20}"
+                      for c in cols))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,2,4,8", help="comma-separated session counts")
+    parser.add_argument("--actions", type=int, default=15, help="PREDICT clicks per session")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between clicks")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub endpoint latency")
+    parser.add_argument("--cores", type=int, default=1, help="CPU cores of the simulated server (0 = all)")
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="p95 rerun latency limit")
+    parser.add_argument("--min-gain", type=float, default=0.1,
+                        help="throughput gain per level below which the process counts as saturated")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=RESULTS_DIR, help="directory for the JSON report")
+    args = parser.parse_args(argv)
+
+    levels = []
+    with StubEndpoint(latency_ms=args.latency_ms) as stub:
+        env = {
+            "ENDPOINT_URL": stub.url,
+            "DATABRICKS_TOKEN": "bench",
+            "SCORER_BACKEND": "http",
+            "PREDICTION_STORE_PATH": "",
+            "AUDIT_LOG_DIR": "",
+        }
+        for n in (int(x) for x in args.sessions.split(",")):
+            levels.append(run_level(os.path.join(ROOT, "app.py"), env, n, args.actions, args.think_ms,
+                                    args.cores, args.seed))
+            print(f"{n} sessions: p95 {levels[-1]['p95_ms']:.1f} ms, {levels[-1]['throughput_rps']:.1f} reruns/s")
+
+    print_levels(levels)
+    saturated_at, capacity = saturation(levels, args.slo_ms, args.min_gain)
+    if saturated_at is None:
+        print(f"no saturation up to {levels[-1]['sessions']} sessions")
+    else:
+        print(f"saturates at {saturated_at} sessions; {capacity} sessions per process within limits")
+
+    commit, dirty = git_revision()
+    label = commit + ("-dirty" if dirty else "")
+    report = {
+        "meta": {"commit": label, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "params": vars(args)},
+        "levels": levels,
+        "saturated_at": saturated_at,
+        "capacity_sessions": capacity,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-load.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Replica routing against several local stub endpoints.
+
+Every stub gets a fixed capacity (--capacity requests at once, --latency-ms
+each), like one provisioned serving replica, and --concurrency client
+threads send one-row scoring calls through a ReplicaRouter for
+--duration-s per phase:
+
+  scale     1, 2, ... --replicas healthy replicas: throughput should grow
+            with the replica count while latency stays near --latency-ms
+  slowdown  all replicas, one of them --slow-ms slower from the start of
+            the phase: the router should route around it (and eject it)
+  outage    all replicas, one of them answering 503 to everything: users
+            should see no errors (failover) and the replica gets ejected
+
+    python -m bench.replicas --replicas 3 --capacity 4 --concurrency 12
+    python -m bench.replicas --phases slowdown,outage --slow-ms 400
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+import requests
+
+from bench.run_bench import RESULTS_DIR, git_revision, random_record, summarize
+from bench.stub_endpoint import StubEndpoint
+from endpoint_client import EndpointClient
+from replicas import ReplicaRouter
+from scorers import HttpScorer
+from scoring import ScoringError
+
+
+def drive(scorer, concurrency, duration_s, seed):
+    """
+    Closed-loop load: `concurrency` threads scoring one random row at a time.
+    """
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration_s
+
+    def worker(i):
+        nonlocal errors
+        rng = random.Random(seed + i)
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                scorer.score([random_record(rng)])
+            except (ScoringError, requests.RequestException):
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.monotonic() - started
+    return {"calls": len(latencies), "errors": errors, "throughput_rps": len(latencies) / wall,
+            **summarize(latencies)}
+
+
+def run_phase(args, n_replicas, setup=None):
+    with ExitStack() as stack:
+        stubs = [stack.enter_context(StubEndpoint(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 10,
+                                                  max_concurrency=args.capacity, seed=i))
+                 for i in range(n_replicas)]
+        router = ReplicaRouter(
+            [(EndpointClient(s.url, "bench", max_retries=0, pool_size=args.concurrency), 1.0) for s in stubs],
+            health_interval=args.health_interval_s, sleep=lambda s: None,
+        )
+        router.start()
+        if setup is not None:
+            setup(stubs)
+        result = drive(HttpScorer(router), args.concurrency, args.duration_s, args.seed)
+        router.close()
+        result["replicas"] = router.stats()["replicas"]
+        result["per_stub_requests"] = [s.requests for s in stubs]
+        return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--capacity", type=int, default=4, help="requests a stub works on at once")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--slow-ms", type=float, default=300.0, help="extra latency of the slow replica")
+    parser.add_argument("--concurrency", type=int, default=12, help="client threads")
+    parser.add_argument("--duration-s", type=float, default=5.0, help="per phase / level")
+    parser.add_argument("--health-interval-s", type=float, default=0.5)
+    parser.add_argument("--phases", default="scale,slowdown,outage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=RESULTS_DIR, help="directory for the JSON report")
+    args = parser.parse_args(argv)
+    phases = args.phases.split(",")
+
+    results = {}
+    if "scale" in phases:
+        for n in range(1, args.replicas + 1):
+            r = results[f"scale/{n}"] = run_phase(args, n)
+            print(f"{n} replica(s): {r['throughput_rps']:.0f} calls/s  p50 {r['p50_ms']:.1f} ms  "
+                  f"p95 {r['p95_ms']:.1f} ms  errors {r['errors']}")
+
+    def slow_first(stubs):
+        stubs[0].latency_ms += args.slow_ms
+
+    def fail_first(stubs):
+        stubs[0].error_rate = 1.0
+
+    for name, setup in (("slowdown", slow_first), ("outage", fail_first)):
+        if name not in phases:
+            continue
+        r = results[name] = run_phase(args, args.replicas, setup)
+        bad = r["replicas"][0]
+        print(f"{name:<9} {r['throughput_rps']:.0f} calls/s  p50 {r['p50_ms']:.1f} ms  p95 {r['p95_ms']:.1f} ms  "
+              f"p99 {r['p99_ms']:.1f} ms  errors {r['errors']}  requests per stub {r['per_stub_requests']}  "
+              f"replica 0: healthy={bad['healthy']} ejected_for={bad['ejected_for']}")
+
+    commit, dirty = git_revision()
+    label = commit + ("-dirty" if dirty else "")
+    report = {
+        "meta": {"commit": label, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "params": vars(args)},
+        "results": results,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-replicas.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {path}")
+
+
+if __name__ == "__main__":
+    main()
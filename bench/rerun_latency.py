@@ -0,0 +1,187 @@
+"""
+Measure server-side interaction latency of the Single Game page with AppTest.
+
+Two interactions are timed against the local stub endpoint:
+  edit     changing a game input (Suns' Streak). If the input is outside a
+           form, every edit costs a full script rerun; inside a form it costs
+           nothing until the form is submitted
+  predict  clicking PREDICT. With the single-game fragment only the fragment
+           reruns (its `single_game_fragment` span); without it, the whole
+           script does
+
+AppTest always executes the full script, so the full-rerun time is measured
+directly and the fragment-only cost is read from the metrics span recorded
+during the same run.
+
+    python -m bench.rerun_latency --runs 30
+    python -m bench.rerun_latency --before HEAD~1     # side by side with an older commit
+
+--before exports that commit into a temp dir (with this bench/ copied over so
+both sides use the same harness) and measures it in a subprocess.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from streamlit.testing.v1 import AppTest
+
+from bench.run_bench import RESULTS_DIR, git_revision, summarize
+from bench.stub_endpoint import StubEndpoint
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _stage_seconds(registry, stage):
+    if registry is None:
+        return None
+    s = registry.snapshot()["stages"].get(stage)
+    return s["p50"] if s else None
+
+
+def _text_input(at, label):
+    return next(w for w in at.text_input if w.label == label)
+
+
+def measure(app_path, runs, latency_ms):
+    """
+    Time `runs` edits and PREDICT clicks; returns a result dict.
+    """
+    try:
+        from metrics import metrics as registry  # resolved against the checkout being measured
+    except ImportError:
+        registry = None
+
+    with StubEndpoint(latency_ms=latency_ms) as stub:
+        # no store / audit files: every run measures the same stack and leaves nothing in the checkout
+        os.environ.update({"ENDPOINT_URL": stub.url, "DATABRICKS_TOKEN": "bench", "SCORER_BACKEND": "http",
+                           "PREDICTION_STORE_PATH": "", "AUDIT_LOG_DIR": ""})
+        at = AppTest.from_file(app_path, default_timeout=60)
+        start = time.perf_counter()
+        at.run()
+        cold = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+        in_form = bool(_text_input(at, "Suns' Streak").proto.form_id)
+
+        edits, predicts, fragments = [], [], []
+        for i in range(runs):
+            _text_input(at, "Suns' Streak").input(str(i % 9 - 4))
+            start = time.perf_counter()
+            at.run()
+            edits.append(time.perf_counter() - start)
+
+            # form values only stick on submit, so set both streaks alongside the click
+            _text_input(at, "Suns' Streak").input(str(i % 9 - 4))
+            _text_input(at, "Opponent Streak").input(str(i % 5 - 2))
+            next(b for b in at.button if b.label == "PREDICT").click()
+            if registry is not None:
+                registry.reset()
+            start = time.perf_counter()
+            at.run()
+            predicts.append(time.perf_counter() - start)
+            if at.exception or not any("Win Probability" in m.value for m in at.markdown):
+                raise RuntimeError("PREDICT did not render a prediction")
+            fragment = _stage_seconds(registry, "single_game_fragment")
+            if fragment is not None:
+                fragments.append(fragment)
+
+    full = summarize(edits + predicts)
+    predict = summarize(fragments) if fragments else summarize(predicts)
+    return {
+        "cold_start_ms": cold * 1000,
+        "full_rerun_p50_ms": full["p50_ms"],
+        "full_rerun_p95_ms": full["p95_ms"],
+        "inputs_in_form": in_form,
+        # server work per keystroke / selection: none while the inputs sit in an unsubmitted form
+        "edit_p50_ms": 0.0 if in_form else summarize(edits)["p50_ms"],
+        "predict_scope": "fragment" if fragments else "full script",
+        "predict_p50_ms": predict["p50_ms"],
+        "predict_p95_ms": predict["p95_ms"],
+    }
+
+
+@contextmanager
+def exported_revision(rev):
+    """
+    The tree as of `rev`, exported to a temp dir with this bench/ copied over
+    it so both sides of a comparison use the same harness.
+    """
+    tmp = tempfile.mkdtemp(prefix="bench-rev-")
+    try:
+        archive = subprocess.run(["git", "archive", rev], cwd=ROOT, capture_output=True, check=True).stdout
+        subprocess.run(["tar", "-x", "-C", tmp], input=archive, check=True)
+        shutil.rmtree(os.path.join(tmp, "bench"), ignore_errors=True)
+        shutil.copytree(os.path.join(ROOT, "bench"), os.path.join(tmp, "bench"),
+                        ignore=shutil.ignore_patterns("results", "__pycache__"))
+        yield tmp
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def measure_revision(rev, runs, latency_ms):
+    """
+    Run measure() on the app as of `rev`, in a subprocess against an exported tree.
+    """
+    with exported_revision(rev) as tmp:
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.rerun_latency", "--json", "--runs", str(runs),
+             "--latency-ms", str(latency_ms)],
+            cwd=tmp, capture_output=True, text=True, check=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def print_results(results):
+    labels = list(results)
+    print(f"{'':<22}" + "".join(f"{label:>20}" for label in labels))
+    for key in ("cold_start_ms", "full_rerun_p50_ms", "full_rerun_p95_ms", "edit_p50_ms",
+                "predict_p50_ms", "predict_p95_ms", "predict_scope"):
+        cells = []
+        for label in labels:
+            value = results[label][key]
+            cells.append(f"{value:>20.2f}" if isinstance(value, float) else f"{str(value):>20}")
+        print(f"{key:<22}" + "".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stub endpoint latency")
+    parser.add_argument("--before", help="git revision to measure alongside the working tree")
+    parser.add_argument("--json", action="store_true", help="print only the result JSON (used by --before)")
+    parser.add_argument("--out", default=RESULTS_DIR, help="directory for the JSON report")
+    args = parser.parse_args(argv)
+
+    after = measure(os.path.join(os.getcwd(), "app.py"), args.runs, args.latency_ms)
+    if args.json:
+        print(json.dumps(after))
+        return
+
+    commit, dirty = git_revision()
+    label = commit + ("-dirty" if dirty else "")
+    results = {}
+    if args.before:
+        results[args.before] = measure_revision(args.before, args.runs, args.latency_ms)
+    results[label] = after
+    print_results(results)
+
+    report = {
+        "meta": {"commit": label, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "params": vars(args)},
+        "results": results,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-rerun.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Benchmark the app's prediction path against the local stub endpoint.
+
+Three suites:
+  endpoint  single-game predictions (HttpScorer -> EndpointClient -> stub ->
+            extract) at each concurrency level and response shape;
+            reports throughput and latency percentiles. --clients fresh adds
+            a run that opens a new connection per request, for comparison
+            with the pooled keep-alive session
+  extract   response parsing alone on each response shape and batch size:
+            the heuristic search (extract_prob_from_resp / extract_probs_from_resp)
+            vs the learned ResponseExtractor fast path
+  payload   request encoding at each batch size: wire bytes per row and
+            client CPU per row to build + serialize (+ gzip) the body, for
+            the legacy records body (stdlib json via requests' json=) and
+            each format / gzip combination, plus
+            response decode time per row
+
+Every run writes a JSON report tagged with the git commit so runs can be
+compared across commits:
+
+    python -m bench.run_bench --requests 300 --concurrency 1,8 --latency-ms 20
+    python -m bench.run_bench --compare bench/results/<older>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench.stub_endpoint import SHAPES, StubEndpoint, shape_response, stub_probability
+import endpoint_client
+from endpoint_client import EndpointClient
+from metrics import percentile
+from scorers import HttpScorer
+from scoring import (
+    LOCATIONS,
+    TEAMS,
+    ResponseExtractor,
+    ScoringError,
+    build_payload,
+    extract_prob_from_resp,
+    extract_probs_from_resp,
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def random_record(rng):
+    return {
+        "opponent": rng.choice(TEAMS),
+        "location": rng.choice(LOCATIONS),
+        "suns_streak": rng.randint(-6, 6),
+        "opp_streak": rng.randint(-6, 6),
+        "suns_rest": rng.randint(1, 4),
+        "opp_rest": rng.randint(1, 4),
+    }
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {q: (percentile(ordered, p) * 1000 if ordered else None)
+            for q, p in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99))}
+
+
+# -------------------------
+# SUITES
+# -------------------------
+def bench_endpoint(shape, concurrency, n_requests, latency_ms, jitter_ms, error_rate, seed, client_mode="pooled"):
+    rng = random.Random(seed)
+    records = [random_record(rng) for _ in range(n_requests)]
+    with StubEndpoint(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate,
+                      shape=shape, seed=seed) as stub:
+        client = EndpointClient(stub.url, "bench", pool_size=max(concurrency, 1), sleep=lambda s: None)
+        scorer = HttpScorer(client)
+
+        def one(rec):
+            start = time.perf_counter()
+            try:
+                if client_mode == "fresh":
+                    fresh = EndpointClient(stub.url, "bench", sleep=lambda s: None)
+                    prob = HttpScorer(fresh).score([rec])[0]
+                    fresh.close()
+                else:
+                    prob = scorer.score([rec])[0]
+                ok = abs(prob - stub_probability(rec)) < 1e-9
+            except (requests.RequestException, ScoringError):
+                ok = False
+            return time.perf_counter() - start, ok
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(one, records))
+        wall = time.perf_counter() - wall_start
+        client.close()
+
+    latencies = [lat for lat, _ in outcomes]
+    return {
+        "suite": "endpoint",
+        "key": f"endpoint/{shape}/c{concurrency}" + ("/fresh" if client_mode == "fresh" else ""),
+        "shape": shape,
+        "client": client_mode,
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "throughput_rps": n_requests / wall if wall else None,
+        **summarize(latencies),
+    }
+
+
+def bench_extract(shape, rows, repeats, seed, mode="heuristic"):
+    rng = random.Random(seed)
+    probs = [stub_probability(random_record(rng)) for _ in range(rows)]
+    resp = json.loads(json.dumps(shape_response(probs, shape)))
+    if mode == "learned":
+        extractor = ResponseExtractor()
+        fn = lambda: extractor.extract_probs(resp, rows)
+    elif rows == 1:
+        fn = lambda: extract_prob_from_resp(resp)
+    else:
+        fn = lambda: extract_probs_from_resp(resp, rows)
+
+    found = fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "suite": "extract",
+        "key": f"extract/{shape}/rows{rows}/{mode}",
+        "shape": shape,
+        "mode": mode,
+        "rows": rows,
+        "found": found is not None,
+        "us_per_call": percentile(sorted(timings), 0.5) * 1e6,
+    }
+
+
+# (label, format, gzip); "legacy" is what requests' json= sent before
+ENCODINGS = [
+    ("legacy", "records", False),
+    ("records", "records", False),
+    ("split", "split", False),
+    ("inputs", "inputs", False),
+    ("split+gzip", "split", True),
+]
+
+
+def bench_payload(encoding, rows, repeats, seed):
+    label, fmt, gz = encoding
+    rng = random.Random(seed)
+    records = [random_record(rng) for _ in range(rows)]
+    client = EndpointClient("http://127.0.0.1:9/invocations", "bench", gzip_min_bytes=1 if gz else 0)
+
+    def encode():
+        payload = build_payload(records, fmt)
+        if label == "legacy":
+            return json.dumps(payload).encode()
+        return client.encode(payload)[0]
+
+    body = encode()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encode()
+        timings.append(time.perf_counter() - start)
+
+    resp = json.dumps(shape_response([0.5] * rows, "list")).encode()
+    decode = json.loads if label == "legacy" else endpoint_client.loads
+    parse = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        decode(resp)
+        parse.append(time.perf_counter() - start)
+    client.close()
+    return {
+        "suite": "payload",
+        "key": f"payload/{label}/rows{rows}",
+        "encoding": label,
+        "rows": rows,
+        "json": "stdlib" if label == "legacy" or endpoint_client.orjson is None else "orjson",
+        "bytes_per_row": len(body) / rows,
+        "encode_us_per_row": percentile(sorted(timings), 0.5) * 1e6 / rows,
+        "decode_us_per_row": percentile(sorted(parse), 0.5) * 1e6 / rows,
+    }
+
+
+# -------------------------
+# REPORTING
+# -------------------------
+def git_revision():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def print_results(results, baseline=None):
+    base = {r["key"]: r for r in (baseline or {}).get("results", [])}
+    for r in results:
+        if r["suite"] == "endpoint":
+            line = (f"{r['key']:<36} {r['throughput_rps']:>9.1f} rps  p50 {r['p50_ms']:>8.2f}  "
+                    f"p95 {r['p95_ms']:>8.2f}  p99 {r['p99_ms']:>8.2f} ms  errors {r['errors']}")
+            metric = "p50_ms"
+        elif r["suite"] == "payload":
+            line = (f"{r['key']:<36} {r['bytes_per_row']:>8.1f} B/row  encode {r['encode_us_per_row']:>7.2f} us/row  "
+                    f"decode {r['decode_us_per_row']:>6.3f} us/row  ({r['json']})")
+            metric = "encode_us_per_row"
+        else:
+            line = f"{r['key']:<36} {r['us_per_call']:>10.2f} us/call  found={r['found']}"
+            metric = "us_per_call"
+        old = base.get(r["key"])
+        if old and old.get(metric):
+            line += f"   ({(r[metric] - old[metric]) / old[metric]:+.1%} vs {baseline['meta']['commit']})"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", choices=["all", "endpoint", "extract", "payload"], default="all")
+    parser.add_argument("--shapes", default=",".join(SHAPES))
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--clients", default="pooled", help="pooled and/or fresh (new connection per request)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rows", default="1,100,1000", help="batch sizes for the extract / payload suites")
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=508)
+    parser.add_argument("--out", default=RESULTS_DIR, help="directory for the JSON report")
+    parser.add_argument("--compare", help="earlier JSON report to diff against")
+    args = parser.parse_args(argv)
+
+    shapes = [s for s in args.shapes.split(",") if s]
+    results = []
+    if args.suite in ("all", "endpoint"):
+        for shape in shapes:
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                for client_mode in args.clients.split(","):
+                    results.append(bench_endpoint(shape, concurrency, args.requests, args.latency_ms,
+                                                  args.jitter_ms, args.error_rate, args.seed, client_mode))
+    if args.suite in ("all", "extract"):
+        for shape in shapes:
+            for rows in (int(r) for r in args.rows.split(",")):
+                for mode in ("heuristic", "learned"):
+                    results.append(bench_extract(shape, rows, max(10, args.repeats // rows), args.seed, mode))
+    if args.suite in ("all", "payload"):
+        for rows in (int(r) for r in args.rows.split(",")):
+            for encoding in ENCODINGS:
+                results.append(bench_payload(encoding, rows, max(10, args.repeats // rows), args.seed))
+
+    commit, dirty = git_revision()
+    report = {
+        "meta": {
+            "commit": commit + ("-dirty" if dirty else ""),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": vars(args),
+        },
+        "results": results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {path}")
+
+
+if __name__ == "__main__":
+    main()
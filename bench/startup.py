@@ -0,0 +1,168 @@
+"""
+Startup-time profile of the app: what a fresh process pays before the first
+page is on screen, and what every rerun pays after that.
+
+Each sample is a fresh interpreter that times
+  streamlit_import  `import streamlit`
+  app_imports       the modules app.py imports (what a new process loads once)
+  first_render      the first full script run (AppTest), i.e. a session start
+  rerun             further script runs of the same session (p50)
+and records which heavy optional modules (pandas, numpy, altair, pyarrow)
+the Single Game page ended up loading. startup = imports + first render.
+
+    python -m bench.startup --samples 7
+    python -m bench.startup --before HEAD~1            # side by side with an older commit
+    python -m bench.startup --budget-ms 1500           # exit 1 if the startup median is over budget
+
+Samples don't call the endpoint (the first render never scores), so no stub
+is needed. Only stdlib is imported at module level so the timings start
+from a clean interpreter.
+"""
+import argparse
+import ast
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "numpy", "altair", "pyarrow")
+
+
+def import_app_modules(app_path):
+    """
+    Import every absolute module app.py imports at top level.
+    """
+    with open(app_path) as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def sample(app_path, reruns):
+    """
+    One fresh-process measurement (run in a subprocess by main()).
+    """
+    os.environ.update({
+        "DATABRICKS_TOKEN": os.environ.get("DATABRICKS_TOKEN", "bench"),
+        "ENDPOINT_URL": os.environ.get("ENDPOINT_URL", "http://127.0.0.1:9/invocations"),
+        "PREDICTION_STORE_PATH": "",
+        "AUDIT_LOG_DIR": "",
+    })
+    sys.path.insert(0, os.path.dirname(app_path))
+    start = time.perf_counter()
+    import streamlit  # noqa: F401
+    streamlit_import = time.perf_counter() - start
+    start = time.perf_counter()
+    import_app_modules(app_path)
+    app_imports = time.perf_counter() - start
+
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app_path, default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    first_render = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    heavy = [m for m in HEAVY_MODULES if m in sys.modules]
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    return {
+        "streamlit_import_ms": streamlit_import * 1000,
+        "app_imports_ms": app_imports * 1000,
+        "first_render_ms": first_render * 1000,
+        "startup_ms": (streamlit_import + app_imports + first_render) * 1000,
+        "rerun_p50_ms": statistics.median(times) * 1000 if times else None,
+        "heavy_modules": heavy,
+    }
+
+
+def measure(cwd, samples, reruns):
+    """
+    Median of `samples` fresh-process samples of the app in `cwd`.
+    """
+    runs = []
+    for _ in range(samples):
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.startup", "--sample", "--reruns", str(reruns)],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    keys = [k for k in runs[0] if k.endswith("_ms")]
+    result = {k: statistics.median(r[k] for r in runs) for k in keys}
+    result["heavy_modules"] = ",".join(runs[0]["heavy_modules"]) or "-"
+    return result
+
+
+def print_results(results):
+    labels = list(results)
+    print(f"{'':<22}" + "".join(f"{label:>20}" for label in labels))
+    for key in results[labels[0]]:
+        cells = []
+        for label in labels:
+            value = results[label][key]
+            cells.append(f"{value:>20.1f}" if isinstance(value, float) else f"{str(value):>20}")
+        print(f"{key:<22}" + "".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5, help="fresh processes per side")
+    parser.add_argument("--reruns", type=int, default=10, help="reruns timed per sample")
+    parser.add_argument("--before", help="git revision to measure alongside the working tree")
+    parser.add_argument("--budget-ms", type=float, help="fail if the median startup_ms exceeds this")
+    parser.add_argument("--sample", action="store_true", help="take one sample in this process (internal)")
+    parser.add_argument("--out", help="directory for the JSON report (default bench/results)")
+    args = parser.parse_args(argv)
+
+    if args.sample:
+        print(json.dumps(sample(os.path.join(os.getcwd(), "app.py"), args.reruns)))
+        return
+
+    # heavier bench helpers only in the parent, never in a sample process
+    from bench.rerun_latency import exported_revision
+    from bench.run_bench import RESULTS_DIR, git_revision
+
+    commit, dirty = git_revision()
+    label = commit + ("-dirty" if dirty else "")
+    results = {}
+    if args.before:
+        with exported_revision(args.before) as tmp:
+            results[args.before] = measure(tmp, args.samples, args.reruns)
+    results[label] = measure(ROOT, args.samples, args.reruns)
+    print_results(results)
+
+    report = {
+        "meta": {"commit": label, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "params": vars(args)},
+        "results": results,
+    }
+    out = args.out or RESULTS_DIR
+    os.makedirs(out, exist_ok=True)
+    path = os.path.join(out, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-startup.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {path}")
+
+    if args.budget_ms is not None and results[label]["startup_ms"] > args.budget_ms:
+        print(f"startup {results[label]['startup_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Local stand-in for the Databricks model serving /invocations endpoint.
+
+Accepts the same request bodies the app sends (dataframe_records,
+dataframe_split or inputs, optionally gzip-compressed), sleeps for a
+configurable latency (with an optional fraction of much slower "stalled replica" answers), fails a configurable
+fraction of requests, and answers in one of the response shapes
+extract_prob_from_resp understands. With --scale-to-zero-s it also behaves
+like a serverless endpoint: after that long without requests, the next one
+waits an extra --cold-start-ms while it "scales back up". --max-concurrency
+caps how many requests it works on at once (the rest queue), which gives a
+stub a fixed capacity, like one provisioned replica.
+
+    python -m bench.stub_endpoint --port 8000 --latency-ms 40 --shape nested
+    ENDPOINT_URL=http://127.0.0.1:8000/invocations DATABRICKS_TOKEN=x streamlit run app.py
+"""
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# response shapes -> how the per-row probabilities are wrapped
+SHAPES = ("list", "nested", "dict", "outputs", "scalar", "deep")
+
+
+def stub_probability(rec):
+    """
+    Deterministic, feature-dependent fake win probability.
+    """
+    z = (0.18 * rec["suns_streak"] - 0.15 * rec["opp_streak"]
+         + 0.05 * (rec["suns_rest"] - rec["opp_rest"])
+         + (0.25 if rec["location"] == "Home" else -0.25)
+         + (sum(map(ord, rec["opponent"])) % 7 - 3) * 0.05)
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def shape_response(probs, shape):
+    if shape == "nested":
+        return {"predictions": [[p] for p in probs]}
+    if shape == "dict":
+        return {"predictions": [{"probability": p, "label": int(p >= 0.5)} for p in probs]}
+    if shape == "outputs":
+        return {"outputs": probs}
+    if shape == "scalar":
+        return {"prediction": probs[0] if len(probs) == 1 else probs}
+    if shape == "deep":
+        # only reachable through the recursive fallback search
+        return {"model": {"name": "stub", "version": "7"},
+                "result": {"rows": [{"win": {"p": p}} for p in probs]}}
+    return {"predictions": probs}
+
+
+def parse_records(body):
+    if "dataframe_split" in body:
+        split = body["dataframe_split"]
+        records = [dict(zip(split["columns"], row)) for row in split["data"]]
+    elif "inputs" in body:
+        inputs = body["inputs"]
+        if isinstance(inputs, dict):  # one list per column
+            inputs = [dict(zip(inputs, row)) for row in zip(*inputs.values())]
+        records = inputs
+    else:
+        records = body["dataframe_records"]
+    return records
+
+
+class StubEndpoint:
+    """
+    Threaded stub server. Settings can be changed while it runs.
+    """
+
+    def __init__(self, port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 error_status=503, shape="list", seed=None, slow_rate=0.0, slow_ms=0.0,
+                 scale_to_zero_s=0.0, cold_start_ms=0.0, max_concurrency=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.shape = shape
+        self.scale_to_zero_s = scale_to_zero_s
+        self.cold_start_ms = cold_start_ms
+        self._last_request = None
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.cold_starts = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/invocations"
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            if self.slow_rate > 0 and self._rng.random() < self.slow_rate:
+                jitter += self.slow_ms
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def cold_start_delay(self):
+        """
+        Extra seconds this request waits because the endpoint had scaled to zero.
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = self._last_request is None or now - self._last_request >= self.scale_to_zero_s
+            self._last_request = now
+            if not (self.scale_to_zero_s and idle):
+                return 0.0
+            self.cold_starts += 1
+        return self.cold_start_ms / 1000.0
+
+    def should_fail(self):
+        with self._lock:
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def handle(self, body):
+        """
+        Returns (status, response_dict) for one request body.
+        """
+        records = parse_records(body)
+        with self._lock:
+            self.requests += 1
+            self.rows += len(records)
+        if self._slots is not None:
+            with self._slots:
+                time.sleep(self.cold_start_delay() + self.delay())
+        else:
+            time.sleep(self.cold_start_delay() + self.delay())
+        if self.should_fail():
+            with self._lock:
+                self.errors += 1
+            return self.error_status, {"error_code": "TEMPORARILY_UNAVAILABLE", "message": "stub failure"}
+        return 200, shape_response([stub_probability(r) for r in records], self.shape)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+            disable_nagle_algorithm = True  # avoid 40 ms Nagle/delayed-ACK stalls on small responses
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    raw = self.rfile.read(length)
+                    if self.headers.get("Content-Encoding") == "gzip":
+                        raw = gzip.decompress(raw)
+                    body = json.loads(raw or b"{}")
+                    status, resp = stub.handle(body)
+                except (ValueError, KeyError, TypeError, IndexError, OSError) as e:
+                    status, resp = 400, {"error_code": "BAD_REQUEST", "message": str(e)}
+                out = json.dumps(resp).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="stub-endpoint", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--shape", choices=SHAPES, default="list")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests that stall")
+    parser.add_argument("--slow-ms", type=float, default=2000.0, help="extra latency of a stalled request")
+    parser.add_argument("--scale-to-zero-s", type=float, default=0.0,
+                        help="idle seconds after which the next request is a cold start (0 = never)")
+    parser.add_argument("--cold-start-ms", type=float, default=20000.0, help="extra latency of a cold start")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="requests worked on at once (0 = no cap)")
+    args = parser.parse_args(argv)
+
+    stub = StubEndpoint(args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                        args.error_status, args.shape, slow_rate=args.slow_rate, slow_ms=args.slow_ms,
+                        scale_to_zero_s=args.scale_to_zero_s, cold_start_ms=args.cold_start_ms,
+                        max_concurrency=args.max_concurrency)
+    print(f"stub endpoint listening on {stub.url} (shape={args.shape}, latency={args.latency_ms}ms)")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
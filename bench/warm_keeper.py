@@ -0,0 +1,104 @@
+"""
+Warm-keeper against a stub endpoint that scales to zero.
+
+Runs the same sparse user traffic (one request every --gap-s on average,
+exponentially distributed) twice against a stub that cold-starts after
+--scale-to-zero-s idle seconds: once without a warm-keeper and once with one.
+Reports how many user requests hit a cold start, user latency percentiles,
+and how many pings the keeper spent to get there (the cost side). Time is
+compressed: use small idle / interval values so a run takes a minute, not a
+night.
+
+    python -m bench.warm_keeper --duration-s 60 --scale-to-zero-s 3 --cold-start-ms 1500
+    python -m bench.warm_keeper --interval-s 5 --max-interval-s 20 --gap-s 8
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from bench.run_bench import RESULTS_DIR, git_revision, summarize
+from bench.stub_endpoint import StubEndpoint
+from endpoint_client import EndpointClient
+from scorers import HttpScorer
+from scoring import LOCATIONS, TEAMS
+from warm_keeper import WarmKeeper, endpoint_ping
+
+
+def run(args, keep_warm):
+    rng = random.Random(args.seed)
+    with StubEndpoint(latency_ms=args.latency_ms, scale_to_zero_s=args.scale_to_zero_s,
+                      cold_start_ms=args.cold_start_ms) as stub:
+        client = EndpointClient(stub.url, "bench", read_timeout=60)
+        scorer = HttpScorer(client)
+        keeper = None
+        if keep_warm:
+            keeper = WarmKeeper(endpoint_ping(client), interval=args.interval_s, min_interval=args.min_interval_s,
+                                max_interval=args.max_interval_s, idle_after=args.duration_s,
+                                cold_threshold=args.cold_start_ms / 2000)
+            keeper.start()
+
+        latencies, cold_hits = [], 0
+        deadline = time.monotonic() + args.duration_s
+        while True:
+            time.sleep(rng.expovariate(1 / args.gap_s))
+            if time.monotonic() >= deadline:
+                break
+            if keeper is not None:
+                keeper.touch()
+            rec = {"opponent": rng.choice(TEAMS), "location": rng.choice(LOCATIONS),
+                   "suns_streak": 0, "opp_streak": 0, "suns_rest": 1, "opp_rest": 1}
+            before = stub.cold_starts
+            start = time.perf_counter()
+            scorer.score([rec])
+            latencies.append(time.perf_counter() - start)
+            cold_hits += stub.cold_starts > before
+
+        if keeper is not None:
+            keeper.stop()
+        return {
+            "user_requests": len(latencies),
+            "user_cold_starts": cold_hits,
+            **summarize(latencies),
+            "endpoint_requests": stub.requests,
+            "endpoint_cold_starts": stub.cold_starts,
+            "keeper": keeper.stats() if keeper is not None else None,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration-s", type=float, default=60.0)
+    parser.add_argument("--gap-s", type=float, default=6.0, help="mean seconds between user requests")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--scale-to-zero-s", type=float, default=4.0)
+    parser.add_argument("--cold-start-ms", type=float, default=1500.0)
+    parser.add_argument("--interval-s", type=float, default=3.0, help="keeper's starting interval")
+    parser.add_argument("--min-interval-s", type=float, default=0.5)
+    parser.add_argument("--max-interval-s", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=RESULTS_DIR, help="directory for the JSON report")
+    args = parser.parse_args(argv)
+
+    results = {"no keeper": run(args, False), "warm-keeper": run(args, True)}
+    for label, r in results.items():
+        print(f"{label:<12} user cold starts {r['user_cold_starts']}/{r['user_requests']}  "
+              f"p50 {r['p50_ms']:.1f} ms  p95 {r['p95_ms']:.1f} ms  endpoint requests {r['endpoint_requests']}")
+    print(f"keeper: {results['warm-keeper']['keeper']}")
+
+    commit, dirty = git_revision()
+    label = commit + ("-dirty" if dirty else "")
+    report = {
+        "meta": {"commit": label, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "params": vars(args)},
+        "results": results,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-warm.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {path}")
+
+
+if __name__ == "__main__":
+    main()
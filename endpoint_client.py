@@ -0,0 +1,153 @@
+import gzip
+import json
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import metrics
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encode / decode, stdlib json otherwise
+    orjson = None
+
+
+DEFAULT_ENDPOINT_URL = "https://dbc-b6951fe2-dfb1.cloud.databricks.com/serving-endpoints/tem-project_rana/invocations"
+
+# HTTP statuses worth retrying: throttling and transient server-side failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def dumps(obj):
+    """
+    Compact JSON bytes (orjson when installed).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def loads(data):
+    """
+    Parse JSON bytes / str (orjson when installed); raises ValueError on bad input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class EndpointClient:
+    """
+    Long-lived HTTP client for the model serving endpoint.
+
+    Wraps a single requests.Session so every prediction reuses pooled
+    keep-alive connections instead of paying TCP+TLS setup per call, and
+    retries throttled / 5xx / connection failures a bounded number of times
+    with full-jitter exponential backoff.
+
+    Bodies are serialized once per call (compact, orjson when installed) and,
+    with gzip_min_bytes, gzip-compressed when at least that large; only turn
+    that on for endpoints that accept Content-Encoding: gzip.
+    """
+
+    def __init__(self, url, token, connect_timeout=3.05, read_timeout=30.0,
+                 max_retries=3, backoff_base=0.25, backoff_cap=4.0, pool_size=10,
+                 gzip_min_bytes=0, sleep=time.sleep):
+        self.url = url
+        self.gzip_min_bytes = gzip_min_bytes
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._sleep = sleep
+
+        self.session = requests.Session()
+        # Retries are handled in post_json so they can use jitter and honour Retry-After
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        })
+
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.retries = 0
+        self.bytes_sent = 0
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """
+        Full-jitter backoff: uniform in [0, min(cap, base * 2**attempt)].
+        A server-provided Retry-After (seconds) is used as a floor.
+        """
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_cap))
+        return delay
+
+    def post_json(self, payload):
+        """
+        POST a JSON payload to the endpoint and return the final Response.
+
+        Retryable statuses are retried up to max_retries times; if they keep
+        failing the last response is returned so the caller can report it.
+        Connection errors / timeouts are retried the same way and re-raised
+        (as requests.RequestException) once the retries are used up.
+        """
+        with metrics.span("payload_encode"):
+            body, headers = self.encode(payload)
+        return self.post_body(body, headers)
+
+    def post_body(self, body, headers=None):
+        """
+        post_json for an already encoded body (see encode()).
+        """
+        attempt = 0
+        while True:
+            with self._lock:
+                self.requests_sent += 1
+                self.bytes_sent += len(body)
+            try:
+                with metrics.span("http_round_trip"):
+                    r = self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep(self.backoff_delay(attempt))
+            else:
+                if r.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return r
+                self._sleep(self.backoff_delay(attempt, _retry_after(r)))
+                r.close()
+            attempt += 1
+            metrics.incr("http_retries")
+            with self._lock:
+                self.retries += 1
+
+    def encode(self, payload):
+        """
+        (body bytes, extra headers) for a JSON payload.
+        """
+        body = dumps(payload)
+        if self.gzip_min_bytes and len(body) >= self.gzip_min_bytes:
+            return gzip.compress(body, compresslevel=5), {"Content-Encoding": "gzip"}
+        return body, None
+
+    def stats(self):
+        with self._lock:
+            return {"requests_sent": self.requests_sent, "retries": self.retries, "bytes_sent": self.bytes_sent}
+
+    def close(self):
+        self.session.close()
+
+
+def _retry_after(r):
+    try:
+        return float(r.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,165 @@
+"""
+Rule-table explanations for predictions.
+
+Each rule is a row of RULES: the factor group it belongs to, threshold
+conditions on the game features, the sentence it adds and whether that
+sentence argues for a Suns win (+1) or against it (-1). Within a group the
+first matching rule wins. A WIN prediction lists the +1 sentences, a LOSS
+prediction the -1 sentences.
+
+generate_explanation() walks the table for one game; explain_batch()
+evaluates it column-wise over a whole DataFrame of games (and is the only
+part that needs numpy / pandas, so they are imported there).
+"""
+import operator
+import string
+
+OPS = {">=": operator.ge, "<=": operator.le, "==": operator.eq, "!=": operator.ne,
+       ">": operator.gt, "<": operator.lt}
+
+# group, conditions [(column, op, threshold)] (all must hold), template, polarity.
+# Polarities match how the previous wording-based filter sorted each sentence
+# (it kept "slightly reducing", "more rest" and "reduce probability" lines on the
+# WIN side), so explanations are unchanged.
+RULES = [
+    ("opp_streak", [("opp_streak", ">=", 3)],
+     "Opponent on a strong winning streak (+{opp_streak}), historically lowering Suns chances.", -1),
+    ("opp_streak", [("opp_streak", "==", 2)],
+     "Opponent has a +2 streak, slightly reducing Suns probability.", +1),
+    ("opp_streak", [("opp_streak", "==", 1)],
+     "Opponent holds mild momentum (+1).", +1),
+    ("opp_streak", [("opp_streak", "<=", -2)],
+     "Opponent is struggling (streak {opp_streak}), increasing Suns probability.", +1),
+    ("opp_streak", [("opp_streak", "==", -1)],
+     "Opponent has a small losing streak.", +1),
+
+    ("suns_streak", [("suns_streak", ">=", 2)],
+     "Suns on a +{suns_streak} streak, boosting the prediction.", +1),
+    ("suns_streak", [("suns_streak", "==", 1)],
+     "Suns enter with mild momentum (+1).", +1),
+    ("suns_streak", [("suns_streak", "<=", -1)],
+     "Suns losing streak ({suns_streak}) lowers probability.", -1),
+
+    ("rest", [("suns_rest", ">=", 3)],
+     "{suns_rest} rest days — long rest historically correlates with lower win probability.", -1),
+    ("rest", [("rest_diff", ">", 0)],
+     "Suns have more rest ({suns_rest} vs {opp_rest}).", +1),
+    ("rest", [("rest_diff", "==", 0)],
+     "Both teams have equal rest.", +1),
+    ("rest", [("rest_diff", "<", 0)],
+     "Opponent has more rest ({opp_rest} vs {suns_rest}).", +1),
+
+    ("location", [("location", "==", "Home")],
+     "Home court provides a small advantage.", +1),
+    ("location", [("location", "!=", "Home")],
+     "Away games slightly reduce probability.", +1),
+]
+
+GROUPS = list(dict.fromkeys(group for group, _, _, _ in RULES))
+
+HEADLINES = {+1: "The model predicts a WIN primarily because:", -1: "The model predicts a LOSS because:"}
+FALLBACKS = {+1: "Several factors modestly support a Suns win.", -1: "Several factors tilt the model toward a loss."}
+
+# fields each template interpolates (empty for constant sentences)
+_TEMPLATE_FIELDS = [[name for _, name, _, _ in string.Formatter().parse(t) if name] for _, _, t, _ in RULES]
+_NUMERIC = ("suns_streak", "opp_streak", "suns_rest", "opp_rest")
+_BY_GROUP = [[(i, rule) for i, rule in enumerate(RULES) if rule[0] == group] for group in GROUPS]
+
+
+def _columns(features):
+    cols = dict(features)
+    cols["rest_diff"] = cols["suns_rest"] - cols["opp_rest"]
+    return cols
+
+
+def _holds(conditions, cols):
+    return all(OPS[op](cols[col], value) for col, op, value in conditions)
+
+
+def generate_explanation(features, prob):
+    """
+    Explanation lines (headline first) for one game's features and win probability.
+    """
+    cols = _columns(features)
+    side = +1 if prob >= 0.5 else -1
+    lines = [HEADLINES[side]]
+    for rules in _BY_GROUP:
+        for i, (_, conditions, template, polarity) in rules:
+            if _holds(conditions, cols):
+                if polarity == side:
+                    lines.append(template.format(**cols) if _TEMPLATE_FIELDS[i] else template)
+                break
+    if len(lines) == 1:
+        lines.append(FALLBACKS[side])
+    return lines
+
+
+def explain_batch(games, probs):
+    """
+    generate_explanation() for every row of `games` (a DataFrame or list of
+    records), evaluated column-wise. Returns a list of line lists.
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame(games) if not isinstance(games, pd.DataFrame) else games
+    n = len(df)
+    if n == 0:
+        return []
+    cols = {c: df[c].to_numpy(dtype=np.int64) for c in _NUMERIC}
+    cols["location"] = df["location"].to_numpy()
+    cols["rest_diff"] = cols["suns_rest"] - cols["opp_rest"]
+    side = np.where(np.asarray(probs, dtype=float) >= 0.5, 1, -1)
+
+    # per group: index of the first matching rule for each row (-1 = none)
+    chosen = []
+    for rules in _BY_GROUP:
+        picked = np.full(n, -1)
+        for i, (_, conditions, _, _) in rules:
+            mask = np.ones(n, dtype=bool)
+            for col, op, value in conditions:
+                mask &= OPS[op](cols[col], value)
+            picked = np.where((picked == -1) & mask, i, picked)
+        chosen.append(picked)
+
+    # per group: a sentence id for each row (0 = nothing to say); each distinct
+    # sentence is formatted once, however many rows share it
+    polarity = np.array([p for _, _, _, p in RULES] + [0])  # index -1 -> 0, never matches a side
+    sentences = [None]
+    codes = np.zeros((n, len(GROUPS)), dtype=np.int64)
+    for g, picked in enumerate(chosen):
+        keep = polarity[picked] == side
+        for i in np.unique(picked[keep]):
+            rows = np.flatnonzero(keep & (picked == i))
+            template, fields = RULES[i][2], _TEMPLATE_FIELDS[i]
+            if not fields:
+                codes[rows, g] = len(sentences)
+                sentences.append(template)
+                continue
+            first, inverse = np.unique(_pack([cols[f][rows] for f in fields]), return_index=True,
+                                       return_inverse=True)[1:]
+            codes[rows, g] = len(sentences) + inverse
+            sentences.extend(template.format(**{f: cols[f][rows[j]] for f in fields}) for j in first)
+
+    # rows with the same side and sentence ids get the same explanation: build each once
+    first, inverse = np.unique(_pack([side, *codes.T]), return_index=True, return_inverse=True)[1:]
+    built = []
+    for j in first:
+        s = int(side[j])
+        lines = [HEADLINES[s]] + [sentences[k] for k in codes[j] if k]
+        if len(lines) == 1:
+            lines.append(FALLBACKS[s])
+        built.append(lines)
+    return [list(built[k]) for k in inverse.tolist()]
+
+
+def _pack(arrays):
+    # mixed-radix combination of small non-negative-after-offset int columns into one
+    # int64 key per row, so uniqueness is a 1-D np.unique instead of a row-wise one
+    import numpy as np
+
+    key = np.zeros(len(arrays[0]), dtype=np.int64)
+    for a in arrays:
+        a = a - a.min()
+        key = key * (int(a.max()) + 1) + a
+    return key
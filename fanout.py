@@ -0,0 +1,58 @@
+"""
+Bounded-concurrency fan-out for multi-request scoring workloads.
+
+Requests run as asyncio tasks on one background event loop, limited by a
+semaphore, each with its own timeout; results come back in input order.
+The blocking HTTP work itself is handed to worker threads so it keeps using
+the pooled keep-alive session and retry policy of EndpointClient.
+"""
+import asyncio
+import threading
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop():
+    # one loop per process, started lazily; safe to submit to from any thread
+    # (Streamlit script threads included) since nothing ever runs on the caller's loop
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="fanout-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+class AsyncFanout:
+    """
+    Run fn(item) for every item with at most `concurrency` in flight.
+    """
+
+    def __init__(self, concurrency=4, timeout=None):
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+
+    async def _run_one(self, semaphore, fn, item):
+        async with semaphore:
+            return await asyncio.wait_for(asyncio.to_thread(fn, item), self.timeout)
+
+    async def gather(self, fn, items):
+        """
+        Await all calls; results are ordered like `items`. The first exception
+        (including TimeoutError for a request over `timeout`) is raised.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self._run_one(semaphore, fn, item) for item in items))
+
+    def map(self, fn, items):
+        """
+        Synchronous wrapper around gather() for non-async callers.
+        """
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        future = asyncio.run_coroutine_threadsafe(self.gather(fn, items), _background_loop())
+        return future.result()
@@ -0,0 +1,203 @@
+"""
+In-process copy of the win-probability model.
+
+The artifact is a small coefficient JSON for a logistic regression over the
+same six features the endpoint takes (numeric streak/rest columns plus one-hot
+location and opponent). It is scored with vectorized NumPy, so a prediction
+costs microseconds instead of an endpoint round trip.
+
+Export one by distilling the serving endpoint over a feature grid:
+
+    python local_model.py export --out model/local_model.json
+
+or from an already-scored file (e.g. the Batch Slate download):
+
+    python local_model.py export --from-csv slate_predictions.csv --out model/local_model.json
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from scoring import FEATURE_FIELDS, LOCATIONS, TEAMS
+
+
+NUMERIC_FIELDS = ["suns_streak", "opp_streak", "suns_rest", "opp_rest"]
+
+
+class LocalModel:
+    """
+    Logistic regression: p = sigmoid(intercept + X @ weights), where X is
+    [numeric fields | location=Home | opponent=<team> one-hots].
+    """
+
+    def __init__(self, intercept, weights, teams=TEAMS, version=None):
+        self.intercept = float(intercept)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.teams = list(teams)
+        self.version = version
+        self._team_index = {t: i for i, t in enumerate(self.teams)}
+        if len(self.weights) != len(self.feature_names()):
+            raise ValueError("weights don't match the feature layout")
+
+    def feature_names(self):
+        return NUMERIC_FIELDS + ["location=Home"] + [f"opponent={t}" for t in self.teams]
+
+    def design_matrix(self, records):
+        """
+        Build X for a list of feature records (or a DataFrame with the six columns).
+        """
+        if hasattr(records, "columns"):
+            numeric = records[NUMERIC_FIELDS].to_numpy(dtype=np.float64)
+            locations = records["location"].to_numpy()
+            opponents = records["opponent"].to_numpy()
+        else:
+            numeric = np.array([[rec[f] for f in NUMERIC_FIELDS] for rec in records], dtype=np.float64)
+            locations = [rec["location"] for rec in records]
+            opponents = [rec["opponent"] for rec in records]
+        n = len(numeric)
+        X = np.zeros((n, len(self.weights)))
+        X[:, :len(NUMERIC_FIELDS)] = numeric.reshape(n, len(NUMERIC_FIELDS))
+        X[:, len(NUMERIC_FIELDS)] = [loc == "Home" for loc in locations]
+        # unknown opponents get an all-zero one-hot block (the baseline team effect)
+        idx = np.array([self._team_index.get(opp, -1) for opp in opponents], dtype=np.int64)
+        known = idx >= 0
+        X[np.nonzero(known)[0], len(NUMERIC_FIELDS) + 1 + idx[known]] = 1.0
+        return X
+
+    def predict_proba(self, records):
+        if len(records) == 0:
+            return np.zeros(0)
+        z = self.intercept + self.design_matrix(records) @ self.weights
+        return 1.0 / (1.0 + np.exp(-z))
+
+    # -------------------------
+    # ARTIFACT I/O
+    # -------------------------
+    def to_dict(self):
+        return {
+            "model_type": "logistic_regression",
+            "version": self.version,
+            "features": self.feature_names(),
+            "intercept": self.intercept,
+            "weights": self.weights.tolist(),
+            "teams": self.teams,
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["intercept"], d["weights"], teams=d.get("teams", TEAMS), version=d.get("version"))
+
+    # -------------------------
+    # DISTILLATION
+    # -------------------------
+    @classmethod
+    def fit(cls, records, probs, l2=1e-3, iterations=25, version=None):
+        """
+        Fit the coefficients to (record, probability) pairs by Newton/IRLS on
+        soft labels, i.e. distil whatever model produced `probs`.
+        """
+        model = cls(0.0, np.zeros(len(NUMERIC_FIELDS) + 1 + len(TEAMS)), version=version)
+        X = np.hstack([np.ones((len(records), 1)), model.design_matrix(records)])
+        y = np.asarray(probs, dtype=np.float64)
+        w = np.zeros(X.shape[1])
+        reg = l2 * np.eye(X.shape[1])
+        reg[0, 0] = 0.0  # don't shrink the intercept
+        for _ in range(iterations):
+            p = 1.0 / (1.0 + np.exp(-(X @ w)))
+            grad = X.T @ (p - y) + reg @ w
+            hess = (X * (p * (1 - p))[:, None]).T @ X + reg
+            step = np.linalg.solve(hess, grad)
+            w -= step
+            if np.abs(step).max() < 1e-8:
+                break
+        return cls(w[0], w[1:], version=version)
+
+
+class PickledModel:
+    """
+    Wraps a pickled estimator exposing predict_proba (e.g. an sklearn pipeline
+    exported from the training notebook). Only load artifacts you produced.
+    """
+
+    def __init__(self, estimator, version=None):
+        self.estimator = estimator
+        self.version = version
+
+    def predict_proba(self, records):
+        import pandas as pd
+
+        frame = records if hasattr(records, "columns") else pd.DataFrame(records, columns=FEATURE_FIELDS)
+        return np.asarray(self.estimator.predict_proba(frame))[:, -1]
+
+
+def load_local_model(path):
+    """
+    Load a local model artifact: coefficient JSON (.json) or pickled estimator (.pkl/.pickle).
+    """
+    if path.endswith((".pkl", ".pickle")):
+        with open(path, "rb") as f:
+            return PickledModel(pickle.load(f), version=os.path.basename(path))
+    with open(path) as f:
+        return LocalModel.from_dict(json.load(f))
+
+
+# -------------------------
+# EXPORT CLI
+# -------------------------
+def _grid_sample(streak_max, rest_max):
+    streaks = range(-streak_max, streak_max + 1)
+    rests = range(1, rest_max + 1)
+    return [
+        {"opponent": t, "location": loc, "suns_streak": ss, "opp_streak": os_,
+         "suns_rest": sr, "opp_rest": orr}
+        for t in TEAMS for loc in LOCATIONS
+        for ss in streaks for os_ in streaks
+        for sr in rests for orr in rests
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="distil the endpoint (or a scored CSV) into a coefficient JSON")
+    export.add_argument("--out", default="model/local_model.json")
+    export.add_argument("--from-csv", help="scored rows with the six features + win_probability")
+    export.add_argument("--streak-max", type=int, default=4)
+    export.add_argument("--rest-max", type=int, default=3)
+    export.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.from_csv:
+        import pandas as pd
+
+        scored = pd.read_csv(args.from_csv)
+        records = scored[FEATURE_FIELDS].to_dict("records")
+        probs = scored["win_probability"].to_numpy()
+    else:
+        from endpoint_client import DEFAULT_ENDPOINT_URL, EndpointClient
+        from scorers import HttpScorer
+
+        client = EndpointClient(
+            os.environ.get("ENDPOINT_URL", DEFAULT_ENDPOINT_URL), os.environ.get("DATABRICKS_TOKEN"),
+        )
+        records = _grid_sample(args.streak_max, args.rest_max)
+        print(f"scoring {len(records)} grid rows via {client.url}")
+        probs = HttpScorer(client, batch_size=args.batch_size).score(records)
+
+    model = LocalModel.fit(records, probs, version=time.strftime("distilled-%Y%m%d-%H%M%S"))
+    err = np.abs(model.predict_proba(records) - np.asarray(probs)).max()
+    model.save(args.out)
+    print(f"wrote {args.out} ({len(records)} rows, max abs error {err:.4f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Per-stage latency instrumentation.
+
+Code paths wrap each stage in `with metrics.span("stage"):`; durations go
+into a rolling window per stage, summarized as p50/p95/p99. Snapshots can be
+rendered as Prometheus text or JSON lines, written to disk periodically for a
+local scraper (node_exporter textfile collector / log shipper), or served on
+a small /metrics HTTP endpoint.
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values, q):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values), max(1, math.ceil(q * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class RollingHistogram:
+    """
+    Keeps the last `window` samples plus lifetime count/sum.
+    """
+
+    def __init__(self, window=1024):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        out = {"count": self.count, "sum": self.total}
+        for q in QUANTILES:
+            out[f"p{int(q * 100)}"] = percentile(ordered, q)
+        return out
+
+
+class Metrics:
+    """
+    Thread-safe registry of per-stage histograms and plain counters.
+    """
+
+    def __init__(self, window=1024, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = RollingHistogram(self.window)
+            hist.add(seconds)
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def incr(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "ts": time.time(),
+                "stages": {name: hist.summary() for name, hist in sorted(self._stages.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    # -------------------------
+    # EXPORT FORMATS
+    # -------------------------
+    def to_prometheus(self, prefix="suns_predictor"):
+        snap = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_latency_seconds Rolling per-stage latency.",
+            f"# TYPE {prefix}_stage_latency_seconds summary",
+        ]
+        for stage, s in snap["stages"].items():
+            for q in QUANTILES:
+                value = s[f"p{int(q * 100)}"]
+                if value is not None:
+                    lines.append(f'{prefix}_stage_latency_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{prefix}_stage_latency_seconds_sum{{stage="{stage}"}} {s["sum"]:.6f}')
+            lines.append(f'{prefix}_stage_latency_seconds_count{{stage="{stage}"}} {s["count"]}')
+        for name, value in snap["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self):
+        return json.dumps(self.snapshot()) + "\n"
+
+
+# Process-wide registry shared by every session and module
+metrics = Metrics(window=int(os.environ.get("METRICS_WINDOW", "1024")))
+
+
+# -------------------------
+# EXPORTERS
+# -------------------------
+def _write_atomic(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class FileExporter(threading.Thread):
+    """
+    Every `interval` seconds, rewrite `prom_path` (Prometheus text) and/or
+    append one snapshot line to `jsonl_path`.
+    """
+
+    def __init__(self, registry, prom_path=None, jsonl_path=None, interval=15.0):
+        super().__init__(name="metrics-exporter", daemon=True)
+        self.registry = registry
+        self.prom_path = prom_path
+        self.jsonl_path = jsonl_path
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def export_once(self):
+        if self.prom_path:
+            _write_atomic(self.prom_path, self.registry.to_prometheus())
+        if self.jsonl_path:
+            with open(self.jsonl_path, "a") as f:
+                f.write(self.registry.to_jsonl())
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.export_once()
+            except OSError:
+                pass  # a full/readonly disk must never take the app down
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def serve_metrics(registry, port, host="127.0.0.1"):
+    """
+    Serve /metrics (Prometheus text) and /metrics.json on a background thread.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, ctype = registry.to_jsonl().encode(), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, ctype = registry.to_prometheus().encode(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
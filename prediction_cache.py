@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# -------------------------
+# FEATURE KEY
+# -------------------------
+def feature_key(record):
+    """
+    Normalize a feature record into a hashable cache key.
+    Team/location strings are stripped and upper/title-cased and the numeric
+    fields are coerced to int, so "  bos" / 2.0 hit the same entry as "BOS" / 2.
+    """
+    return (
+        str(record["opponent"]).strip().upper(),
+        str(record["location"]).strip().title(),
+        int(record["suns_streak"]),
+        int(record["opp_streak"]),
+        int(record["suns_rest"]),
+        int(record["opp_rest"]),
+    )
+
+
+# -------------------------
+# TTL + LRU CACHE
+# -------------------------
+class PredictionCache:
+    """
+    Thread-safe prediction cache with a TTL and an LRU size cap.
+    One instance is shared by every Streamlit session (see app.py), so all
+    reads and writes go through a lock.
+    """
+
+    def __init__(self, ttl_seconds=3600, max_entries=2048, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, prob)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, record):
+        """
+        Return the cached probability for this record, or None on a miss.
+        """
+        key = feature_key(record)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, prob = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return prob
+                # expired: drop it and count as a miss
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, record, prob):
+        key = feature_key(record)
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, float(prob))
+            self._entries.move_to_end(key)
+            while self.max_entries and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def preload(self, entries):
+        """
+        Insert (feature_key, prob) pairs, e.g. hot keys from the persistent store.
+        Doesn't touch the hit/miss counters.
+        """
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            for key, prob in entries:
+                self._entries[key] = (expires_at, float(prob))
+                self._entries.move_to_end(key)
+            while self.max_entries and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,266 @@
+"""
+Persistent prediction store (SQLite), shared across restarts and app replicas.
+
+Rows are keyed on (model version, feature key). The version tag is mapped to
+a small integer that leads the primary key, so switching to a new tag makes
+every old row invisible immediately (lookups only ever touch the current
+version's key range) and old versions are later dropped with a key-range
+delete rather than a table scan. The database runs in WAL mode so readers in
+other processes don't block on a writer.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from metrics import metrics
+from prediction_cache import feature_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    tag TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS predictions (
+    version_id INTEGER NOT NULL,
+    opponent TEXT NOT NULL,
+    location TEXT NOT NULL,
+    suns_streak INTEGER NOT NULL,
+    opp_streak INTEGER NOT NULL,
+    suns_rest INTEGER NOT NULL,
+    opp_rest INTEGER NOT NULL,
+    prob REAL NOT NULL,
+    expires_at REAL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (version_id, opponent, location, suns_streak, opp_streak, suns_rest, opp_rest)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS predictions_expiry ON predictions (expires_at);
+"""
+
+KEY_WHERE = ("version_id = ? AND opponent = ? AND location = ? AND suns_streak = ? "
+             "AND opp_streak = ? AND suns_rest = ? AND opp_rest = ?")
+
+
+class PredictionStore:
+    """
+    On-disk prediction store for one model version tag.
+
+    get_many / put_many work on lists of records (put_many is one bulk upsert
+    transaction); a locked or unwritable database counts as misses / dropped
+    writes rather than failing the prediction, and purge / hot_entries /
+    stats degrade the same way. Only opening the store raises (sqlite3.Error
+    or OSError); callers run without it then. Hit counts are buffered in
+    memory and written with the next upsert, or on their own once
+    hit_flush_size keys are pending or hit_flush_interval seconds have
+    passed, and at close / interpreter exit, so a process answered entirely
+    from the store still persists them. Most reads never take the write
+    lock; hot_entries() uses the counts to warm an in-memory cache at boot.
+    """
+
+    def __init__(self, path, version, ttl_seconds=86400, purge_every=500, hit_flush_size=256,
+                 hit_flush_interval=30.0, clock=time.time):
+        self.path = path
+        self.version = version
+        self.ttl_seconds = ttl_seconds
+        self.purge_every = purge_every
+        self.hit_flush_size = hit_flush_size
+        self.hit_flush_interval = hit_flush_interval
+        self._clock = clock
+        self._last_hit_flush = clock()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._pending_hits = Counter()
+        self._writes_since_purge = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            conn = self._conn()
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.executescript(SCHEMA)
+                conn.execute("INSERT OR IGNORE INTO versions (tag) VALUES (?)", (version,))
+            self.version_id = conn.execute("SELECT id FROM versions WHERE tag = ?", (version,)).fetchone()[0]
+        except sqlite3.Error:
+            self.close()
+            raise
+        atexit.register(self.flush_hits)
+
+    def _conn(self):
+        # sqlite3 connections are per thread; each script / worker thread gets its own
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get_many(self, records):
+        """
+        Stored probabilities aligned with `records` (None where missing or expired).
+        """
+        conn = self._conn()
+        now = self._clock()
+        out = []
+        found = []
+        try:
+            for rec in records:
+                key = feature_key(rec)
+                row = conn.execute(f"SELECT prob, expires_at FROM predictions WHERE {KEY_WHERE}",
+                                   (self.version_id, *key)).fetchone()
+                if row is not None and (row[1] is None or row[1] > now):
+                    out.append(row[0])
+                    found.append(key)
+                else:
+                    out.append(None)
+        except sqlite3.Error:
+            self._error()
+            return [None] * len(records)
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(records) - len(found)
+            self._pending_hits.update(found)
+            flush = self._pending_hits and (
+                len(self._pending_hits) >= self.hit_flush_size
+                or now - self._last_hit_flush >= self.hit_flush_interval
+            )
+        if flush:
+            self.flush_hits()
+        return out
+
+    def flush_hits(self):
+        """
+        Write the buffered hit counts now (put_many also writes them).
+        """
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, Counter()
+            self._last_hit_flush = self._clock()
+        if not pending:
+            return
+        try:
+            with self._conn() as conn:
+                self._add_hits(conn, pending)
+        except sqlite3.Error:
+            self._error()
+
+    def put_many(self, records, probs):
+        """
+        Upsert a batch of predictions in one transaction.
+        """
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds else None
+        rows = [(self.version_id, *feature_key(rec), float(p), expires_at) for rec, p in zip(records, probs)]
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, Counter()
+            self._last_hit_flush = self._clock()
+            self._writes_since_purge += len(rows)
+            purge = self.purge_every and self._writes_since_purge >= self.purge_every
+            if purge:
+                self._writes_since_purge = 0
+        conn = self._conn()
+        try:
+            self._upsert(conn, rows, pending, purge)
+        except sqlite3.Error:
+            self._error()
+            return
+        with self._lock:
+            self.writes += len(rows)
+
+    def _upsert(self, conn, rows, pending, purge):
+        with conn:
+            conn.executemany(
+                "INSERT INTO predictions (version_id, opponent, location, suns_streak, opp_streak, "
+                "suns_rest, opp_rest, prob, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET prob = excluded.prob, expires_at = excluded.expires_at",
+                rows,
+            )
+            if pending:
+                self._add_hits(conn, pending)
+            if purge:
+                self._purge_expired(conn)
+
+    def _add_hits(self, conn, pending):
+        conn.executemany(f"UPDATE predictions SET hits = hits + ? WHERE {KEY_WHERE}",
+                         [(n, self.version_id, *key) for key, n in pending.items()])
+
+    def _error(self):
+        with self._lock:
+            self.errors += 1
+        metrics.incr("store_errors")
+
+    def _purge_expired(self, conn):
+        # range scan on the expiry index, not the whole table
+        conn.execute("DELETE FROM predictions WHERE expires_at <= ?", (self._clock(),))
+
+    def purge(self):
+        """
+        Drop expired rows and every row of version tags registered before this
+        one (newer tags may belong to replicas already rolled forward). Each
+        old version is a key-range delete on the primary key.
+        """
+        conn = self._conn()
+        try:
+            with conn:
+                self._purge_expired(conn)
+                old = [row[0] for row in conn.execute("SELECT id FROM versions WHERE id < ?",
+                                                      (self.version_id,))]
+                for version_id in old:
+                    conn.execute("DELETE FROM predictions WHERE version_id = ?", (version_id,))
+                    conn.execute("DELETE FROM versions WHERE id = ?", (version_id,))
+        except sqlite3.Error:
+            # locked by another replica: its purge (or the next boot's) does the work
+            self._error()
+            return 0
+        return len(old)
+
+    def hot_entries(self, limit):
+        """
+        Up to `limit` unexpired (feature_key, prob) pairs of the current
+        version, most-hit first, for warming an in-memory cache ([] when the
+        database can't be read).
+        """
+        try:
+            rows = self._conn().execute(
+                "SELECT opponent, location, suns_streak, opp_streak, suns_rest, opp_rest, prob "
+                "FROM predictions WHERE version_id = ? AND (expires_at IS NULL OR expires_at > ?) "
+                "ORDER BY hits DESC LIMIT ?",
+                (self.version_id, self._clock(), limit),
+            ).fetchall()
+        except sqlite3.Error:
+            self._error()
+            return []
+        return [(tuple(row[:6]), row[6]) for row in rows]
+
+    def stats(self):
+        try:
+            size = self._conn().execute("SELECT COUNT(*) FROM predictions WHERE version_id = ?",
+                                        (self.version_id,)).fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "writes": self.writes,
+                "errors": self.errors,
+                "size": size,
+                "version": self.version,
+            }
+
+    def close(self):
+        self.flush_hits()
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,260 @@
+"""
+Route endpoint calls across several equivalent serving endpoints (replicas).
+
+ReplicaRouter stands in for an EndpointClient (post_json / encode / stats /
+close), so the scorers, hedger, breaker and warm-keeper work unchanged on
+top of it. Each call goes to the healthy replica with the lowest
+
+    EWMA latency x (calls in flight + 1) / weight
+
+i.e. the fastest replica until it is busy enough that a slower one answers
+sooner; replicas without a latency sample yet score 0, so each gets tried.
+A call that fails (connection error, timeout, 429 / 5xx) is sent on to the
+next replica straight away; only when every replica has failed does the
+router back off and go round again (max_retries rounds, like
+EndpointClient's own retries, which are off for replica clients).
+
+Ejection: eject_after consecutive failures take a replica out of rotation,
+and so does being slow_factor times slower (EWMA) than the fastest healthy
+replica. A background thread pings every replica each health_interval
+seconds (one-row scoring call, which also keeps the latency estimate of
+idle and ejected replicas current) and lets an ejected replica back in once
+a ping succeeds at a normal latency. If every replica is ejected, calls go
+to all of them anyway rather than failing outright.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from endpoint_client import RETRY_STATUSES
+from metrics import metrics
+from scoring import ScoringError
+from warm_keeper import endpoint_ping
+
+
+def parse_replicas(spec):
+    """
+    "https://a/invocations 2, https://b/invocations" -> [("https://a/invocations", 2.0),
+    ("https://b/invocations", 1.0)]: comma-separated URLs, each optionally
+    followed by a weight.
+    """
+    replicas = []
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        url, *weight = part.split()
+        replicas.append((url, float(weight[0]) if weight else 1.0))
+    return replicas
+
+
+class Replica:
+    """
+    One replica's client and routing state (guarded by the router's lock).
+    """
+
+    def __init__(self, client, weight=1.0):
+        self.client = client
+        self.url = client.url
+        self.weight = weight
+        self.ewma = None
+        self.in_flight = 0
+        self.healthy = True
+        self.ejected_for = None
+        self.consecutive_failures = 0
+        self.calls = 0
+        self.failures = 0
+        self.ejections = 0
+
+    def cost(self):
+        return (self.ewma or 0.0) * (self.in_flight + 1) / self.weight
+
+
+class ReplicaRouter(threading.Thread):
+    """
+    Latency-aware router over `replicas` ([(EndpointClient, weight)]; the
+    clients should have max_retries=0). It is also the health-check thread:
+    start() it from start_background(), like the warm-keeper.
+    """
+
+    def __init__(self, replicas, alpha=0.3, eject_after=3, slow_factor=5.0, min_slow_s=0.05,
+                 health_interval=10.0, max_retries=3, ping=endpoint_ping, sleep=time.sleep):
+        super().__init__(name="replica-health", daemon=True)
+        self.replicas = [Replica(client, weight) for client, weight in replicas]
+        self.url = self.replicas[0].url
+        self.alpha = alpha
+        self.eject_after = eject_after
+        self.slow_factor = slow_factor
+        self.min_slow_s = min_slow_s
+        self.health_interval = health_interval
+        self.max_retries = max_retries
+        self._pings = [ping(r.client) for r in self.replicas]
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.replicas), thread_name_prefix="replica-ping")
+        self.failovers = 0
+        self.health_checks = 0
+
+    # -------------------------
+    # ROUTING
+    # -------------------------
+    def pick(self, exclude=()):
+        """
+        The replica to send the next call to, or None when all are excluded.
+        Marks the call as in flight; the caller reports back with _record().
+        """
+        with self._lock:
+            candidates = [r for r in self.replicas if r not in exclude]
+            healthy = [r for r in candidates if r.healthy] or candidates  # all ejected: try them anyway
+            if not healthy:
+                return None
+            replica = min(healthy, key=lambda r: (r.cost(), random.random()))
+            replica.in_flight += 1
+            replica.calls += 1
+            return replica
+
+    def post_json(self, payload):
+        with metrics.span("payload_encode"):
+            body, headers = self.encode(payload)
+        return self.post_body(body, headers)
+
+    def post_body(self, body, headers=None):
+        """
+        Send to the best replica, failing over to the others; returns the
+        first non-retryable response. After every replica has failed
+        max_retries + 1 times round, returns the last retryable response or
+        re-raises the last network error.
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._sleep(self.replicas[0].client.backoff_delay(attempt - 1))
+                metrics.incr("http_retries")
+            tried = []
+            response, error = None, None
+            while (replica := self.pick(tried)) is not None:
+                tried.append(replica)
+                if len(tried) > 1:
+                    metrics.incr("replica_failovers")
+                    with self._lock:
+                        self.failovers += 1
+                start = time.perf_counter()
+                try:
+                    r = replica.client.post_body(body, headers)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    self._record(replica, time.perf_counter() - start, ok=False)
+                    if response is not None:
+                        response.close()
+                    response, error = None, e
+                    continue
+                except BaseException:
+                    # not worth another replica (bad encoding, redirects, a hook's error), but the call
+                    # is over: release it so the replica's cost doesn't stay inflated
+                    self._record(replica, time.perf_counter() - start, ok=False)
+                    if response is not None:
+                        response.close()
+                    raise
+                ok = r.status_code not in RETRY_STATUSES
+                self._record(replica, time.perf_counter() - start, ok=ok)
+                if ok:
+                    return r
+                if response is not None:
+                    response.close()
+                response, error = r, None
+            if response is not None:
+                if attempt == self.max_retries:
+                    return response
+                response.close()
+        raise error
+
+    def encode(self, payload):
+        return self.replicas[0].client.encode(payload)
+
+    def _record(self, replica, elapsed, ok, from_traffic=True):
+        with self._lock:
+            if from_traffic:
+                replica.in_flight -= 1
+            # a quick failure (connection refused) says nothing about how fast the replica answers
+            if ok or replica.ewma is None or elapsed > replica.ewma:
+                replica.ewma = elapsed if replica.ewma is None else (
+                    self.alpha * elapsed + (1 - self.alpha) * replica.ewma
+                )
+            if ok:
+                replica.consecutive_failures = 0
+                return
+            replica.failures += 1
+            replica.consecutive_failures += 1
+            if replica.healthy and replica.consecutive_failures >= self.eject_after:
+                self._eject(replica, "failures")
+
+    def _eject(self, replica, reason):
+        replica.healthy = False
+        replica.ejected_for = reason
+        replica.ejections += 1
+        metrics.incr("replica_ejections")
+
+    # -------------------------
+    # HEALTH CHECKS
+    # -------------------------
+    def check(self):
+        """
+        Ping every replica once (in parallel), then eject / readmit.
+        """
+        list(self._executor.map(self._check_one, self.replicas, self._pings))
+        with self._lock:
+            self.health_checks += 1
+            fastest = min((r.ewma for r in self.replicas if r.healthy and r.ewma is not None), default=None)
+            slow_limit = None if fastest is None else max(self.min_slow_s, fastest * self.slow_factor)
+            for r in self.replicas:
+                slow = slow_limit is not None and r.ewma is not None and r.ewma > slow_limit
+                if r.healthy and slow:
+                    self._eject(r, "latency")
+                elif not r.healthy and r.consecutive_failures == 0 and not slow:
+                    r.healthy = True
+                    r.ejected_for = None
+                    metrics.incr("replica_readmissions")
+
+    def _check_one(self, replica, ping):
+        start = time.perf_counter()
+        try:
+            ping()
+        except (ScoringError, requests.RequestException):
+            self._record(replica, time.perf_counter() - start, ok=False, from_traffic=False)
+        else:
+            self._record(replica, time.perf_counter() - start, ok=True, from_traffic=False)
+
+    def run(self):
+        while not self._stop_event.wait(self.health_interval):
+            self.check()
+
+    def stop(self):
+        self._stop_event.set()
+
+    # -------------------------
+    # REPORTING
+    # -------------------------
+    def stats(self):
+        totals = {"requests_sent": 0, "retries": 0, "bytes_sent": 0}
+        for r in self.replicas:
+            for k, v in r.client.stats().items():
+                totals[k] += v
+        with self._lock:
+            return {
+                **totals,
+                "replicas_healthy": sum(r.healthy for r in self.replicas),
+                "replicas_total": len(self.replicas),
+                "replica_failovers": self.failovers,
+                "replicas": [
+                    {"url": r.url, "weight": r.weight, "healthy": r.healthy, "ejected_for": r.ejected_for,
+                     "ewma_ms": round(r.ewma * 1000, 1) if r.ewma is not None else None,
+                     "in_flight": r.in_flight, "calls": r.calls, "failures": r.failures,
+                     "ejections": r.ejections}
+                    for r in self.replicas
+                ],
+            }
+
+    def close(self):
+        self.stop()
+        self._executor.shutdown(wait=False)
+        for r in self.replicas:
+            r.client.close()
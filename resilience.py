@@ -0,0 +1,218 @@
+"""
+Tail-latency protection for the serving endpoint.
+
+Hedger: run a call, and if it hasn't answered by a deadline derived from the
+recent p95 latency, send one duplicate and take whichever answers first.
+CircuitBreaker: after enough consecutive failures / timeouts, stop calling the
+endpoint for a cool-down period so callers fail fast (or fail over) instead of
+queueing behind a stalled replica; one probe call then decides whether to close.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from endpoint_client import RETRY_STATUSES
+from metrics import metrics, percentile
+from scoring import ScoringError
+
+
+class CircuitOpenError(ScoringError):
+    """
+    Raised instead of calling the endpoint while the breaker is open.
+    """
+
+
+def is_endpoint_failure(exc):
+    """
+    True for errors that say something about endpoint health (network errors,
+    timeouts, throttling / 5xx), not for e.g. an unparseable 200 response.
+    """
+    if isinstance(exc, requests.RequestException):
+        return True
+    if isinstance(exc, ScoringError):
+        return exc.status_code in RETRY_STATUSES or (exc.status_code or 0) >= 500
+    return False
+
+
+# -------------------------
+# HEDGED REQUESTS
+# -------------------------
+class Hedger:
+    """
+    Runs fn(*args) on a worker thread; if it is still running after the hedge
+    delay (the `quantile` of recent successful call latencies, clamped to
+    [min_delay, max_delay]), starts a second identical call. The first success
+    wins; the loser finishes in the background.
+
+    At most `max_ratio` of calls are hedged so a slow endpoint doesn't get twice
+    the load. With `timeout`, a call that has no answer after that many seconds
+    raises requests.Timeout, which bounds how long a caller can be blocked.
+    """
+
+    def __init__(self, quantile=0.95, min_delay=0.05, max_delay=2.0, initial_delay=1.0,
+                 min_samples=20, window=256, max_ratio=0.1, timeout=None, max_workers=16):
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+
+    def delay(self):
+        """
+        Current hedge deadline in seconds.
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            p = percentile(sorted(self._latencies), self.quantile)
+        return min(self.max_delay, max(self.min_delay, p))
+
+    def _timed(self, fn, args):
+        start = time.perf_counter()
+        result = fn(*args)
+        with self._lock:
+            self._latencies.append(time.perf_counter() - start)
+        return result
+
+    def _may_hedge(self):
+        with self._lock:
+            if self.hedged + 1 > self.max_ratio * self.calls:
+                return False
+            self.hedged += 1
+        metrics.incr("hedges_sent")
+        return True
+
+    def call(self, fn, *args):
+        start = time.monotonic()
+        with self._lock:
+            self.calls += 1
+        first = self._executor.submit(self._timed, fn, args)
+        futures = [first]
+        done, _ = wait(futures, timeout=self.delay())
+        if not done and self._may_hedge():
+            futures.append(self._executor.submit(self._timed, fn, args))
+
+        pending, error = set(futures), None
+        while pending:
+            remaining = None if self.timeout is None else max(0.0, self.timeout - (time.monotonic() - start))
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                with self._lock:
+                    self.timeouts += 1
+                metrics.incr("hedge_timeouts")
+                raise requests.Timeout(f"No answer from the model endpoint within {self.timeout}s")
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        with self._lock:
+                            self.hedge_wins += 1
+                        metrics.incr("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self):
+        with self._lock:
+            calls, hedged, wins, timeouts = self.calls, self.hedged, self.hedge_wins, self.timeouts
+        return {
+            "calls": calls,
+            "sent": hedged,
+            "rate": hedged / calls if calls else 0.0,
+            "wins": wins,
+            "timeouts": timeouts,
+            "delay_ms": round(self.delay() * 1000, 1),
+        }
+
+
+# -------------------------
+# CIRCUIT BREAKER
+# -------------------------
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures;
+    open -> half_open once `reset_timeout` seconds have passed, letting one probe
+    call through; the probe's outcome closes the breaker or re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """
+        Whether a call may go out now. In half-open state only one probe is let through.
+        """
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+        metrics.incr("breaker_rejected")
+        return False
+
+    def retry_in(self):
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened += 1
+                    metrics.incr("breaker_opened")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self.consecutive_failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
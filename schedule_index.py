@@ -0,0 +1,260 @@
+"""
+Schedule / results index: the streak and rest-day features looked up from a
+results file instead of typed in.
+
+The file is a CSV with (at least) the columns
+
+    date,home,away,home_score,away_score
+
+one row per game, dates as YYYY-MM-DD and teams as the codes in TEAMS (the
+Suns are PHO). Rows without both scores are games not played yet: they
+don't move streaks, but they count for rest days and make up
+remaining_schedule() until a row with the result is appended.
+
+For every team the index keeps a day-by-day table of (streak, last game
+day) as of the end of each day, from the team's first game to its latest,
+so features() is a couple of list indexings whatever the date or the size
+of the file. New results are expected to be appended to the file:
+refresh() reads only the bytes added since the last read and extends the
+affected teams' tables, replaying from the earliest changed day only when
+a result arrives out of order. A file that was replaced or rewritten
+rather than appended to is reloaded from scratch.
+"""
+import bisect
+import csv
+import datetime
+import io
+import os
+import threading
+
+SUNS = "PHO"
+RESULT_FIELDS = ["date", "home", "away", "home_score", "away_score"]
+
+# rest days are capped here; a team's first game in the file counts as fully rested
+MAX_REST = 10
+# a longer break between games is an off-season: streaks start over
+SEASON_BREAK_DAYS = 60
+# bytes re-checked on refresh to tell an append from a rewrite
+TAIL_BYTES = 256
+
+
+def _next_streak(streak, won):
+    if won:
+        return streak + 1 if streak > 0 else 1
+    return streak - 1 if streak < 0 else -1
+
+
+class TeamTimeline:
+    """
+    One team's results as a dense per-day table. after[i] is (streak, day of
+    the last game) at the end of day `origin + i` (days are date ordinals).
+    """
+
+    def __init__(self):
+        self.games = []  # (day, won), sorted by day
+        self.origin = None
+        self.after = []
+
+    def add(self, day, won):
+        if self.origin is not None and day > self.origin + len(self.after) - 1:
+            # the usual case: a result newer than everything indexed so far
+            self.games.append((day, won))
+            self._extend(day, won)
+            return
+        # out of order (or the first game): replay from the earliest changed day
+        self.games.append((day, won))
+        self.games.sort(key=lambda g: g[0])
+        if self.origin is None or day < self.origin:
+            self.origin, self.after = self.games[0][0], []
+        else:
+            del self.after[day - self.origin:]
+        replay_from = self.origin + len(self.after)
+        for d, w in self.games:
+            if d >= replay_from:
+                self._extend(d, w)
+
+    def _extend(self, day, won):
+        streak, last = self.after[-1] if self.after else (0, None)
+        end = self.origin + len(self.after)
+        # days without a game carry the previous state forward
+        self.after.extend([(streak, last)] * (day - end))
+        if day < end:
+            # a second game on an already indexed day (a data error, but don't lose it)
+            self.after.pop()
+        if last is not None and day - last > SEASON_BREAK_DAYS:
+            streak = 0
+        self.after.append((_next_streak(streak, won), day))
+
+    def state_before(self, day):
+        """
+        (streak, last game day) going into a game on `day`.
+        """
+        i = day - 1 - self.origin if self.origin is not None else -1
+        if i < 0:
+            return 0, None
+        return self.after[min(i, len(self.after) - 1)]
+
+    def features(self, day):
+        streak, last = self.state_before(day)
+        if last is None or day - last > SEASON_BREAK_DAYS:
+            return 0, MAX_REST
+        return streak, min(day - last, MAX_REST)
+
+
+class ScheduleIndex:
+    """
+    Per-team streak / rest index over a results CSV. Safe to share between
+    sessions: refresh() and features() hold a lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self.teams = {}
+        self.scheduled = {}  # (day, home, away) of games without a result yet, used as an ordered set
+        self.games = 0
+        self.skipped = 0
+        self._fields = None
+        self._offset = 0
+        self._inode = None
+        self._tail = b""
+
+    def refresh(self):
+        """
+        Index results appended to the file since the last call; returns how
+        many new games were indexed. Costs one stat() when nothing changed.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return 0
+        with self._lock:
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                self._reset()
+            if st.st_size == self._offset:
+                return 0
+            with open(self.path, "rb") as f:
+                if self._offset:
+                    f.seek(self._offset - len(self._tail))
+                    if f.read(len(self._tail)) != self._tail:
+                        # rewritten in place rather than appended to
+                        self._reset()
+                        f.seek(0)
+                data = f.read()
+            self._inode = st.st_ino
+            # only whole lines; a half-written last line is picked up next time
+            data = data[:data.rfind(b"\n") + 1]
+            if not data:
+                return 0
+            before = self.games
+            self._index_lines(data.decode("utf-8"))
+            self._offset += len(data)
+            self._tail = (self._tail + data)[-TAIL_BYTES:]
+            return self.games - before
+
+    def _index_lines(self, text):
+        reader = csv.reader(io.StringIO(text))
+        if self._fields is None:
+            header = next(reader, None)
+            if header is None:
+                return
+            self._fields = [h.strip().lower() for h in header]
+            missing = [f for f in RESULT_FIELDS if f not in self._fields]
+            if missing:
+                raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+        col = {f: self._fields.index(f) for f in RESULT_FIELDS}
+        for row in reader:
+            if not row:
+                continue
+            try:
+                day = datetime.date.fromisoformat(row[col["date"]].strip()).toordinal()
+                home, away = row[col["home"]].strip().upper(), row[col["away"]].strip().upper()
+                home_score, away_score = row[col["home_score"]].strip(), row[col["away_score"]].strip()
+                if not (home_score and away_score):
+                    self.scheduled[(day, home, away)] = None
+                    continue
+                home_won = float(home_score) > float(away_score)
+            except (IndexError, ValueError):
+                self.skipped += 1
+                continue
+            self.scheduled.pop((day, home, away), None)
+            self.teams.setdefault(home, TeamTimeline()).add(day, home_won)
+            self.teams.setdefault(away, TeamTimeline()).add(day, not home_won)
+            self.games += 1
+
+    def features(self, opponent, game_date):
+        """
+        suns_streak / opp_streak / suns_rest / opp_rest going into a game
+        against `opponent` on `game_date` (a date).
+        """
+        day = game_date.toordinal()
+        empty = TeamTimeline()
+        with self._lock:
+            suns_streak, suns_rest = self.teams.get(SUNS, empty).features(day)
+            opp_streak, opp_rest = self.teams.get(opponent, empty).features(day)
+        return {
+            "suns_streak": suns_streak,
+            "opp_streak": opp_streak,
+            "suns_rest": suns_rest,
+            "opp_rest": opp_rest,
+        }
+
+    def remaining_schedule(self, team=SUNS):
+        """
+        `team`'s current season from here on: record and streak so far, and
+        its unplayed games in date order with everything but its own streak
+        filled in (opponent, location, both rest days, and the opponent's
+        streak as of its latest result; the opponents' other games aren't
+        played out). Game dicts use the model's feature names.
+        """
+        with self._lock:
+            scheduled = sorted(self.scheduled)
+            days = {t: [d for d, _ in tl.games] for t, tl in self.teams.items()}
+            for day, home, away in scheduled:
+                days.setdefault(home, []).append(day)
+                days.setdefault(away, []).append(day)
+            for team_days in days.values():
+                team_days.sort()
+
+            def rest(t, day):
+                i = bisect.bisect_left(days[t], day)
+                if not i or day - days[t][i - 1] > SEASON_BREAK_DAYS:
+                    return MAX_REST
+                return min(day - days[t][i - 1], MAX_REST)
+
+            games = []
+            for day, home, away in scheduled:
+                if team not in (home, away):
+                    continue
+                opponent = away if home == team else home
+                games.append({
+                    "date": datetime.date.fromordinal(day).isoformat(),
+                    "opponent": opponent,
+                    "location": "Home" if home == team else "Away",
+                    "opp_streak": self.teams[opponent].features(day)[0] if opponent in self.teams else 0,
+                    "suns_rest": rest(team, day),
+                    "opp_rest": rest(opponent, day),
+                })
+
+            # the season so far: results since the last off-season break before the next game
+            timeline = self.teams.get(team, TeamTimeline())
+            next_day = datetime.date.fromisoformat(games[0]["date"]).toordinal() if games else None
+            if next_day is None and timeline.games:
+                next_day = timeline.games[-1][0] + 1
+            season = []
+            for day, won in reversed(timeline.games):
+                if (season[-1][0] if season else next_day) - day > SEASON_BREAK_DAYS:
+                    break
+                season.append((day, won))
+            streak = timeline.features(next_day)[0] if next_day is not None else 0
+            wins = sum(won for _, won in season)
+        return {"wins": wins, "losses": len(season) - wins, "streak": streak, "games": games}
+
+    def stats(self):
+        with self._lock:
+            return {"games": self.games, "teams": len(self.teams), "skipped": self.skipped,
+                    "scheduled": len(self.scheduled)}
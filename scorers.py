@@ -0,0 +1,334 @@
+"""
+Pluggable scoring backends.
+
+Every scorer exposes score(records, batch_size=None) -> list of win
+probabilities aligned with `records`, and raises ScoringError (or a
+requests.RequestException from the HTTP client) when it can't.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import requests
+
+from endpoint_client import loads
+from metrics import metrics
+from prediction_cache import feature_key
+from resilience import CircuitOpenError, is_endpoint_failure
+from scoring import ResponseExtractor, ScoringError, build_payload, iter_chunks
+
+
+class HttpScorer:
+    """
+    The Databricks serving endpoint, called through a pooled EndpointClient
+    in chunks of at most batch_size rows per request. Multi-row chunks use
+    the `fmt` request format (see build_payload; single rows always go as
+    records, where the columnar formats save nothing). With a fanout
+    (see fanout.py) multi-chunk workloads send their requests concurrently;
+    with a hedger / breaker (see resilience.py) slow requests are hedged and
+    calls are refused while the endpoint keeps failing. A
+    warm-keeper (see warm_keeper.py) is touched by every request actually
+    sent, so rows answered from a cache don't count as endpoint traffic.
+    """
+
+    name = "http"
+
+    def __init__(self, client, batch_size=100, fmt="records", fanout=None, hedger=None, breaker=None,
+                 warm_keeper=None):
+        self.client = client
+        self.warm_keeper = warm_keeper
+        self.batch_size = batch_size
+        self.fmt = fmt
+        self.fanout = fanout
+        self.hedger = hedger
+        self.breaker = breaker
+        # remembers where this endpoint puts the probabilities
+        self.extractor = ResponseExtractor()
+
+    def _score_chunk(self, chunk):
+        with metrics.span("payload_build"):
+            if len(chunk) > 1:
+                payload = build_payload(chunk, self.fmt)
+            else:
+                payload = build_payload(chunk)
+        if self.warm_keeper is not None:
+            self.warm_keeper.touch()
+        r = self.client.post_json(payload)
+        if r.status_code >= 400:
+            raise ScoringError(f"Model endpoint returned HTTP {r.status_code}.",
+                               status_code=r.status_code, body=r.text, headers=dict(r.headers))
+        try:
+            with metrics.span("json_parse"):
+                resp = loads(r.content)
+        except ValueError:
+            raise ScoringError("Response from model is not valid JSON.",
+                               status_code=r.status_code, body=r.text)
+        with metrics.span("prob_extract"):
+            chunk_probs = self.extractor.extract_probs(resp, len(chunk))
+        if chunk_probs is None:
+            raise ScoringError("Couldn't find a numeric probability in the model response.",
+                               status_code=r.status_code, body=r.text)
+        return chunk_probs
+
+    def _send_chunk(self, chunk):
+        if self.hedger is None:
+            return self._score_chunk(chunk)
+        return self.hedger.call(self._score_chunk, chunk)
+
+    def _score_all(self, chunks):
+        if self.fanout is not None and len(chunks) > 1:
+            try:
+                results = self.fanout.map(self._send_chunk, chunks)
+            except TimeoutError as e:
+                raise requests.Timeout(f"Scoring request exceeded {self.fanout.timeout}s") from e
+        else:
+            results = [self._send_chunk(chunk) for chunk in chunks]
+        return [p for chunk_probs in results for p in chunk_probs]
+
+    def score(self, records, batch_size=None):
+        chunks = list(iter_chunks(records, batch_size or self.batch_size))
+        if self.breaker is None:
+            return self._score_all(chunks)
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                f"Model endpoint is failing; not calling it for another {self.breaker.retry_in():.0f}s.")
+        try:
+            probs = self._score_all(chunks)
+        except Exception as e:
+            if is_endpoint_failure(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return probs
+
+
+class LocalScorer:
+    """
+    In-process model loaded from an exported artifact (see local_model.py).
+    """
+
+    name = "local"
+
+    def __init__(self, model):
+        self.model = model
+
+    def score(self, records, batch_size=None):
+        with metrics.span("local_score"):
+            return [float(p) for p in self.model.predict_proba(records)]
+
+
+class CachedScorer:
+    """
+    Answers rows from a PredictionCache and only sends the misses to `inner`.
+    With a PredictionStore, memory misses are looked up on disk first and
+    freshly scored rows are written back in one bulk upsert. Answers `inner`
+    marks as stand-ins (last_cacheable false, e.g. a FailoverScorer's
+    fallback) are returned but never cached or stored.
+    """
+
+    def __init__(self, inner, cache, store=None):
+        self.inner = inner
+        self.cache = cache
+        self.store = store
+        self.name = inner.name
+        self._local = threading.local()
+
+    @property
+    def last_backend(self):
+        """
+        Backend that answered this thread's most recent call: "cache" when no
+        row had to be scored, else the inner scorer's.
+        """
+        return getattr(self._local, "backend", None)
+
+    def remember(self, records, probs):
+        """
+        Cache (and store) scored rows.
+        """
+        for rec, prob in zip(records, probs):
+            self.cache.put(rec, prob)
+        if self.store is not None:
+            with metrics.span("store_write"):
+                self.store.put_many(records, probs)
+
+    def score(self, records, batch_size=None):
+        probs = [self.cache.get(rec) for rec in records]
+        pending = [i for i, p in enumerate(probs) if p is None]
+        if pending and self.store is not None:
+            with metrics.span("store_lookup"):
+                stored = self.store.get_many([records[i] for i in pending])
+            for i, prob in zip(pending, stored):
+                if prob is not None:
+                    probs[i] = prob
+                    self.cache.put(records[i], prob)
+            pending = [i for i, p in zip(pending, stored) if p is None]
+        if not pending:
+            self._local.backend = "cache"
+            return probs
+        missed = [records[i] for i in pending]
+        fresh = self.inner.score(missed, batch_size=batch_size)
+        self._local.backend = getattr(self.inner, "last_backend", None) or self.inner.name
+        for i, prob in zip(pending, fresh):
+            probs[i] = prob
+        if getattr(self.inner, "last_cacheable", True):
+            self.remember(missed, fresh)
+        return probs
+
+
+class CoalescingScorer:
+    """
+    Single-flight in front of `inner`: while a row is being scored, concurrent
+    calls asking for the same (normalized) row wait for that result instead of
+    sending their own request. Only rows nobody else is scoring go to `inner`.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+        self._lock = threading.Lock()
+        self._in_flight = {}  # feature_key -> Future
+        self.issued = 0
+        self.coalesced = 0
+
+    def score(self, records, batch_size=None):
+        keys = [feature_key(rec) for rec in records]
+        futures, mine = {}, []
+        with self._lock:
+            for key, rec in zip(keys, records):
+                if key in futures:
+                    continue
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = self._in_flight[key] = Future()
+                    mine.append((key, rec, future))
+                futures[key] = future
+            issued = len(mine)
+            self.issued += issued
+            self.coalesced += len(records) - issued
+        if issued:
+            metrics.incr("singleflight_issued", issued)
+        if len(records) > issued:
+            metrics.incr("singleflight_coalesced", len(records) - issued)
+
+        if mine:
+            try:
+                probs = self.inner.score([rec for _, rec, _ in mine], batch_size=batch_size)
+            except BaseException as e:
+                for _, _, future in mine:
+                    future.set_exception(e)
+                self._finish(mine)
+                raise
+            for (_, _, future), prob in zip(mine, probs):
+                future.set_result(prob)
+            self._finish(mine)
+        return [futures[key].result() for key in keys]
+
+    def _finish(self, mine):
+        # resolved first, so a caller arriving in between gets the finished future;
+        # after this, callers go through the cache or start a fresh request
+        with self._lock:
+            for key, _, _ in mine:
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.issued + self.coalesced
+            return {
+                "issued": self.issued,
+                "coalesced": self.coalesced,
+                "coalesced_rate": self.coalesced / total if total else 0.0,
+                "in_flight": len(self._in_flight),
+            }
+
+
+class FailoverScorer:
+    """
+    Try `primary`; if it errors (circuit breaker open included) or hasn't
+    answered in time, answer from `fallback` instead. The slow primary call is left to finish in
+    the background; its late answer goes to on_late_result(records, probs)
+    if set (the service points it at CachedScorer.remember).
+
+    Put it under the CachedScorer, so only cache / store misses fail over;
+    last_cacheable tells the cache not to keep the fallback's answers.
+
+    "In time" is `timeout` seconds per round of requests the call needs: a
+    batch goes out as ceil(rows / batch_size) requests, `concurrency` at a
+    time, so a 1000-row slate on a healthy endpoint isn't handed to the
+    fallback just for being big.
+    """
+
+    def __init__(self, primary, fallback, timeout=5.0, max_workers=8, batch_size=100, concurrency=1,
+                 on_late_result=None):
+        self.primary = primary
+        self.fallback = fallback
+        self.on_late_result = on_late_result
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.concurrency = max(1, concurrency)
+        self.name = f"{primary.name}+{fallback.name}"
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scorer")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.counts = {"primary": 0, "fallback": 0, "primary_errors": 0, "primary_timeouts": 0,
+                       "primary_rejected": 0}
+
+    @property
+    def last_backend(self):
+        """
+        Name of the backend that answered this thread's most recent call.
+        """
+        return getattr(self._local, "backend", None)
+
+    @property
+    def last_cacheable(self):
+        """
+        Whether this thread's most recent answer came from the primary.
+        """
+        return getattr(self._local, "cacheable", True)
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def timeout_for(self, n_rows, batch_size=None):
+        requests_needed = -(-n_rows // (batch_size or self.batch_size))
+        return self.timeout * max(1, -(-requests_needed // self.concurrency))
+
+    def score(self, records, batch_size=None):
+        future = self._executor.submit(self.primary.score, records, batch_size)
+        try:
+            probs = future.result(timeout=self.timeout_for(len(records), batch_size))
+        except FutureTimeout:
+            self._count("primary_timeouts")
+            metrics.incr("failover_timeouts")
+            if self.on_late_result is not None:
+                future.add_done_callback(lambda f: self._late_result(records, f))
+        except CircuitOpenError:
+            # breaker open: go straight to the fallback
+            self._count("primary_rejected")
+            metrics.incr("failover_rejected")
+        except (ScoringError, requests.RequestException):
+            self._count("primary_errors")
+            metrics.incr("failover_errors")
+        else:
+            self._count("primary")
+            self._local.backend = self.primary.name
+            self._local.cacheable = True
+            return probs
+
+        probs = self.fallback.score(records, batch_size)
+        self._count("fallback")
+        self._local.backend = self.fallback.name
+        self._local.cacheable = False
+        return probs
+
+    def _late_result(self, records, future):
+        if future.exception() is None:
+            self.on_late_result(records, future.result())
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
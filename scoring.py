@@ -0,0 +1,400 @@
+import math
+from operator import itemgetter
+
+
+# -------------------------
+# FEATURES
+# -------------------------
+FEATURE_FIELDS = ["opponent", "location", "suns_streak", "opp_streak", "suns_rest", "opp_rest"]
+
+TEAMS = [
+    "ATL","BOS","BRK","CHI","CHO","CLE","DAL","DEN","DET","GSW",
+    "HOU","IND","LAC","LAL","MEM","MIA","MIL","MIN","NOP","NYK",
+    "OKC","ORL","PHI","POR","SAC","SAS","TOR","UTA","WAS"
+]
+
+LOCATIONS = ["Home", "Away"]
+
+
+class ScoringError(Exception):
+    """
+    Raised when the endpoint fails or its response can't be turned into probabilities.
+    Carries the HTTP status / headers / raw body when there is one, for debugging output.
+    """
+
+    def __init__(self, message, status_code=None, body=None, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers
+
+
+# -------------------------
+# PAYLOAD CONSTRUCTION
+# -------------------------
+_row = itemgetter(*FEATURE_FIELDS)
+
+
+def build_payload(records, fmt="records"):
+    """
+    Pack feature records into a serving-endpoint request body.
+    fmt="records" -> {"dataframe_records": [...]}   (row-oriented, what the app always sent)
+    fmt="split"   -> {"dataframe_split": {"columns": [...], "data": [[...], ...]}}
+    fmt="inputs"  -> {"inputs": {"opponent": [...], "location": [...], ...}}   (one list per column)
+
+    The columnar formats name each field once per request instead of once per
+    row.
+    """
+    if fmt not in ("split", "inputs"):
+        return {"dataframe_records": [{c: rec[c] for c in FEATURE_FIELDS} for rec in records]}
+    rows = list(map(_row, records))
+    if fmt == "split":
+        payload = {"dataframe_split": {"columns": list(FEATURE_FIELDS), "data": rows}}
+    else:
+        columns = zip(*rows) if rows else [[] for _ in FEATURE_FIELDS]
+        payload = {"inputs": {c: list(col) for c, col in zip(FEATURE_FIELDS, columns)}}
+    return payload
+
+
+def iter_chunks(items, size):
+    """
+    Yield consecutive slices of at most `size` items.
+    """
+    size = max(1, int(size))
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# -------------------------
+# BULK VALIDATION
+# -------------------------
+# pandas is imported inside these functions: single-game scoring never needs it,
+# and importing it costs more than the rest of the app's startup put together
+def read_games(file, name=None):
+    """
+    Read a CSV or Parquet file (path or file-like object) of game rows.
+    """
+    import pandas as pd
+
+    name = (name or getattr(file, "name", None) or str(file)).lower()
+    if name.endswith((".parquet", ".pq")):
+        return pd.read_parquet(file)
+    return pd.read_csv(file)
+
+
+def validate_games(df):
+    """
+    Validate a DataFrame of game rows in bulk.
+    Returns (valid_df, invalid_df): valid rows are normalized to the types the
+    endpoint expects, invalid rows keep their original values plus an "error" column.
+    """
+    import pandas as pd
+
+    missing = [c for c in FEATURE_FIELDS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    df = df.reset_index(drop=True)
+    clean = pd.DataFrame(index=df.index)
+    errors = pd.Series("", index=df.index)
+
+    clean["opponent"] = df["opponent"].astype(str).str.strip().str.upper()
+    errors[~clean["opponent"].isin(TEAMS)] += "unknown opponent; "
+
+    clean["location"] = df["location"].astype(str).str.strip().str.title()
+    errors[~clean["location"].isin(LOCATIONS)] += "location must be Home or Away; "
+
+    for col, min_value in (("suns_streak", None), ("opp_streak", None), ("suns_rest", 1), ("opp_rest", 1)):
+        num = pd.to_numeric(df[col], errors="coerce")
+        bad = num.isna() | (num != num.round())
+        if min_value is not None:
+            bad |= num < min_value
+            errors[bad] += f"{col} must be an integer >= {min_value}; "
+        else:
+            errors[bad] += f"{col} must be an integer; "
+        clean[col] = num.where(~bad, 0).astype(int)
+
+    ok = errors == ""
+    invalid = df[~ok].copy()
+    invalid["error"] = errors[~ok].str.rstrip("; ")
+    return clean[ok].reset_index(drop=True), invalid
+
+
+def normalize_record(record):
+    """
+    Single-row counterpart of validate_games() (same rules and messages) without
+    the DataFrame overhead. Returns the normalized record or raises ValueError.
+    """
+    missing = [c for c in FEATURE_FIELDS if c not in record]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+
+    clean, errors = {}, []
+    clean["opponent"] = str(record["opponent"]).strip().upper()
+    if clean["opponent"] not in TEAMS:
+        errors.append("unknown opponent")
+    clean["location"] = str(record["location"]).strip().title()
+    if clean["location"] not in LOCATIONS:
+        errors.append("location must be Home or Away")
+
+    for col, min_value in (("suns_streak", None), ("opp_streak", None), ("suns_rest", 1), ("opp_rest", 1)):
+        value = record[col]
+        try:
+            num = float(value) if not isinstance(value, bool) else float("nan")
+        except (TypeError, ValueError):
+            num = float("nan")
+        bad = not math.isfinite(num) or not num.is_integer() or (min_value is not None and num < min_value)
+        if bad:
+            errors.append(f"{col} must be an integer" + (f" >= {min_value}" if min_value is not None else ""))
+        else:
+            clean[col] = int(num)
+
+    if errors:
+        raise ValueError("; ".join(errors))
+    return clean
+
+
+# -------------------------
+# HELPER: EXTRACT PROBABILITY FROM RESPONSE
+# -------------------------
+CANDIDATE_KEYS = ["predictions", "results", "outputs", "data", "prediction"]
+SCORE_SUBKEYS = ("score", "probability", "prob", "score_value", "value")
+
+
+def find_prob_path(resp):
+    """
+    The search behind extract_prob_from_resp, also reporting where the value was.
+    Returns (prob, path, from_fallback): `path` is the tuple of keys / list
+    indexes leading to the value (None if nothing was found) and
+    `from_fallback` tells whether it came from the whole-JSON search.
+    """
+    # Common candidate keys
+    for k in CANDIDATE_KEYS:
+        if k in resp:
+            val = resp[k]
+            path = [k]
+            # handle nested lists e.g. [[0.7]] or [0.7]
+            if isinstance(val, list):
+                if len(val) > 0:
+                    first = val[0]
+                    path.append(0)
+                    if isinstance(first, list) and len(first) > 0:
+                        cand = first[0]
+                        path.append(0)
+                    else:
+                        cand = first
+                else:
+                    continue
+            else:
+                cand = val
+            # if dict with score key
+            if isinstance(cand, dict):
+                for subk in SCORE_SUBKEYS:
+                    if subk in cand:
+                        try:
+                            return float(cand[subk]), tuple(path + [subk]), False
+                        except Exception:
+                            pass
+            # if directly numeric-ish
+            try:
+                return float(cand), tuple(path), False
+            except Exception:
+                pass
+
+    # Fallback: search the whole JSON for first float between 0 and 1
+    def find_float(obj, path):
+        if isinstance(obj, dict):
+            items = obj.items()
+        elif isinstance(obj, list):
+            items = enumerate(obj)
+        else:
+            try:
+                f = float(obj)
+                if 0.0 <= f <= 1.0:
+                    return f, path
+            except Exception:
+                pass
+            return None
+        for key, v in items:
+            res = find_float(v, path + (key,))
+            if res is not None:
+                return res
+        return None
+
+    found = find_float(resp, ())
+    if found is None:
+        return None, None, True
+    return found[0], found[1], True
+
+
+def extract_prob_from_resp(resp):
+    """
+    Try several heuristics to find a probability value in the response JSON.
+    Returns float(prob) or None if not found.
+    """
+    return find_prob_path(resp)[0]
+
+
+def _coerce_prob(item):
+    # same per-row rules as extract_prob_from_resp: [[p]] / [p] / {"score": p} / p
+    if isinstance(item, list):
+        if not item:
+            return None
+        item = item[0]
+    if isinstance(item, dict):
+        for subk in SCORE_SUBKEYS:
+            if subk in item:
+                try:
+                    return float(item[subk])
+                except Exception:
+                    pass
+        return None
+    try:
+        return float(item)
+    except Exception:
+        return None
+
+
+def extract_probs_from_resp(resp, n):
+    """
+    Batch variant of extract_prob_from_resp: return a list of n probabilities
+    (one per request row, in order) or None if the response doesn't hold them.
+    """
+    if isinstance(resp, dict):
+        for k in CANDIDATE_KEYS:
+            val = resp.get(k)
+            if not isinstance(val, list) or len(val) != n:
+                continue
+            probs = [_coerce_prob(item) for item in val]
+            if None not in probs:
+                return probs
+    # a single-row request can still use the full heuristic search
+    if n == 1:
+        prob = extract_prob_from_resp(resp)
+        return None if prob is None else [prob]
+    return None
+
+
+def _follow(obj, path):
+    for step in path:
+        obj = obj[step]
+    return obj
+
+
+class ResponseExtractor:
+    """
+    Per-endpoint probability extractor that learns where the probabilities live.
+
+    The first response goes through the heuristic search; the path that
+    succeeded is then kept as a direct accessor (e.g. resp["predictions"][i][0])
+    and reused for every later response. Only when the accessor fails (a
+    missing key, wrong length, non-numeric value) does it fall back to the
+    heuristics and relearn. Assumes one endpoint keeps one response shape.
+    """
+
+    _ACCESS_ERRORS = (KeyError, IndexError, TypeError, ValueError)
+
+    def __init__(self):
+        self._single = None  # (path, range_checked)
+        self._rows = None    # (prefix, suffix, range_checked): rows = resp[prefix], prob = row[suffix]
+        self.hits = 0
+        self.misses = 0
+
+    def extract_prob(self, resp):
+        learned = self._single
+        if learned is not None:
+            path, range_checked = learned
+            try:
+                prob = float(_follow(resp, path))
+                if not range_checked or 0.0 <= prob <= 1.0:
+                    self.hits += 1
+                    return prob
+            except self._ACCESS_ERRORS:
+                pass
+        self.misses += 1
+        prob, path, from_fallback = find_prob_path(resp)
+        if path is not None:
+            self._single = (path, from_fallback)
+        return prob
+
+    def _rows_from(self, resp, n, learned):
+        prefix, suffix, range_checked = learned
+        rows = _follow(resp, prefix)
+        if not isinstance(rows, list) or len(rows) != n:
+            return None
+        if not suffix:
+            probs = list(map(float, rows))
+        elif len(suffix) == 1:
+            step = suffix[0]
+            probs = [float(row[step]) for row in rows]
+        else:
+            probs = [float(_follow(row, suffix)) for row in rows]
+        if range_checked and not all(0.0 <= p <= 1.0 for p in probs):
+            return None
+        return probs
+
+    def _learn_rows(self, resp, n):
+        # split the first value's path at the list index that enumerates the n rows
+        _, path, from_fallback = find_prob_path(resp)
+        if path is None:
+            return None
+        container = resp
+        for i, step in enumerate(path):
+            if step == 0 and isinstance(container, list) and len(container) == n:
+                return path[:i], path[i + 1:], from_fallback
+            container = container[step]
+        return None
+
+    def extract_probs(self, resp, n):
+        """
+        All n probabilities of a batch response in one pass, or None.
+        """
+        if n == 1 and self._rows is None and self._single is not None:
+            # scalar-style responses ({"prediction": 0.7}) only have a single-value path
+            prob = self.extract_prob(resp)
+            return None if prob is None else [prob]
+
+        learned = self._rows
+        if learned is not None:
+            try:
+                probs = self._rows_from(resp, n, learned)
+            except self._ACCESS_ERRORS:
+                probs = None
+            if probs is not None:
+                self.hits += 1
+                return probs
+
+        self.misses += 1
+        probs = extract_probs_from_resp(resp, n)
+        candidate = self._learn_rows(resp, n)
+        if candidate is not None:
+            try:
+                compiled = self._rows_from(resp, n, candidate)
+            except self._ACCESS_ERRORS:
+                compiled = None
+            # keep the accessor only if it reproduces the heuristic answer
+            # (or recovers one the heuristics can't, e.g. deeply nested rows)
+            if compiled is not None and (probs is None or compiled == probs):
+                self._rows = candidate
+                probs = compiled
+        elif n == 1 and probs is not None:
+            _, path, from_fallback = find_prob_path(resp)
+            self._single = (path, from_fallback)
+        return probs
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "single_path": self._single and self._single[0],
+                "row_path": self._rows and self._rows[:2]}
+
+
+# -------------------------
+# SENSITIVITY GRIDS
+# -------------------------
+def grid_records(base, row_field, row_values, col_field, col_values):
+    """
+    Feature records for every (row, col) cell of a what-if grid, in row-major
+    order. All other features are taken from `base`.
+    """
+    return [dict(base, **{row_field: r, col_field: c}) for r in row_values for c in col_values]
+
@@ -0,0 +1,147 @@
+"""
+Monte Carlo season simulator: the rest of the Suns' schedule played out
+many times with the model's win probabilities.
+
+Of the features, only the Suns' streak depends on how the simulated games
+go; opponent, location and both rest days come from the schedule, and each
+opponent's streak stays at its latest real value (their other games aren't
+simulated). So a game's probability is a function of (game, Suns' streak),
+and the streaks a path can be on before game g are few (at most 2g + 1
+values). probability_table() scores every reachable (game, streak) tuple up
+front: tuples are deduplicated and looked up in a memo dict, and only unseen
+ones go to the scorer, in one batched call (through the service's cache and
+coalescing like any other request). After that no endpoint is involved.
+
+The paths themselves are NumPy arrays: each game is one vectorized draw
+across all paths of a shard, with the streak update done by np.where.
+Shards run on a process pool with independent seed streams.
+
+    python service.py simulate schedule.csv --paths 50000 --workers 4
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from prediction_cache import feature_key
+from scoring import FEATURE_FIELDS
+
+# paths per worker process when `workers` isn't given: smaller shards don't pay back a process spawn
+# (500k paths x 32 games is about a second on one core)
+SHARD_PATHS = 500_000
+
+# a typical West cutoff for a top-6 seed; play-in and seeding tiebreaks aren't modeled
+DEFAULT_PLAYOFF_WINS = 45
+
+
+def reachable_streaks(start, n_games):
+    """
+    For each game, the Suns' streaks a path can be on going into it.
+    """
+    steps, current = [], {start}
+    for _ in range(n_games):
+        steps.append(current)
+        current = {s + 1 if s > 0 else 1 for s in current} | {s - 1 if s < 0 else -1 for s in current}
+    return steps
+
+
+def probability_table(score, games, start_streak, memo=None, batch_size=None):
+    """
+    (table, lo, n_scored): table[g, s - lo] is the win probability of game g
+    on a Suns' streak of s, for every reachable s (0 elsewhere). `score` is
+    service.score; `memo` (feature key -> probability) is read and extended,
+    so a caller keeping it skips the scorer entirely on later runs.
+    """
+    memo = {} if memo is None else memo
+    steps = reachable_streaks(start_streak, len(games))
+    lo = min(min(s) for s in steps) if steps else start_streak
+    hi = max(max(s) for s in steps) if steps else start_streak
+    cells, unseen = [], {}
+    for g, (game, streaks) in enumerate(zip(games, steps)):
+        for s in streaks:
+            record = {f: game[f] for f in FEATURE_FIELDS if f != "suns_streak"}
+            record["suns_streak"] = s
+            key = feature_key(record)
+            cells.append((g, s - lo, key))
+            if key not in memo:
+                unseen.setdefault(key, record)
+    if unseen:
+        probs = score(list(unseen.values()), batch_size=batch_size)
+        memo.update(zip(unseen, probs))
+    table = np.zeros((len(games), hi - lo + 1))
+    for g, i, key in cells:
+        table[g, i] = memo[key]
+    return table, lo, len(unseen)
+
+
+def simulate_paths(table, lo, start_streak, n_paths, seed):
+    """
+    Play `n_paths` paths through the table. Returns (count of paths per
+    number of games won, length n_games + 1; paths winning each game).
+    """
+    rng = np.random.default_rng(seed)
+    n_games = table.shape[0]
+    streak = np.full(n_paths, start_streak, dtype=np.int64)
+    wins = np.zeros(n_paths, dtype=np.int64)
+    game_wins = np.zeros(n_games, dtype=np.int64)
+    for g in range(n_games):
+        won = rng.random(n_paths) < table[g, streak - lo]
+        wins += won
+        game_wins[g] = won.sum()
+        streak = np.where(won, np.where(streak > 0, streak + 1, 1), np.where(streak < 0, streak - 1, -1))
+    return np.bincount(wins, minlength=n_games + 1), game_wins
+
+
+def simulate_season(service, season, paths=20000, workers=None, seed=None, playoff_wins=DEFAULT_PLAYOFF_WINS,
+                    memo=None, batch_size=None):
+    """
+    Win-total distribution and playoff odds for `season`
+    (ScheduleIndex.remaining_schedule()). workers=1 simulates in this
+    process; otherwise the paths are split over a process pool (default:
+    one worker per SHARD_PATHS paths, at most one per CPU).
+    """
+    games = season["games"]
+    table, lo, n_scored = probability_table(service.score, games, season["streak"], memo=memo,
+                                            batch_size=batch_size)
+    # None when every tuple came from the memo
+    backend = getattr(service, "last_backend", None) if n_scored else None
+    if workers is None:
+        workers = min(os.cpu_count() or 1, -(-paths // SHARD_PATHS))
+    workers = max(1, min(workers, paths))
+    shard_sizes = [paths // workers + (i < paths % workers) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    if workers == 1:
+        shards = [simulate_paths(table, lo, season["streak"], paths, seeds[0])]
+    else:
+        # spawn, not fork: the caller may be a threaded server (warm-keeper, exporters)
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            shards = list(pool.map(simulate_paths, [table] * workers, [lo] * workers,
+                                   [season["streak"]] * workers, shard_sizes, seeds))
+    counts = sum(c for c, _ in shards)
+    game_wins = sum(w for _, w in shards)
+
+    # final win totals: wins so far + simulated wins
+    totals = season["wins"] + np.arange(len(counts))
+    dist = counts / paths
+    cdf = np.cumsum(dist)
+    return {
+        "record": f"{season['wins']}-{season['losses']}",
+        "games_remaining": len(games),
+        "paths": paths,
+        "tuples_scored": n_scored,
+        "backend": backend,
+        "mean_wins": float((totals * dist).sum()),
+        "p5_wins": int(totals[np.searchsorted(cdf, 0.05)]),
+        "p50_wins": int(totals[np.searchsorted(cdf, 0.5)]),
+        "p95_wins": int(totals[np.searchsorted(cdf, 0.95)]),
+        "playoff_wins": playoff_wins,
+        "playoff_odds": float(dist[totals >= playoff_wins].sum()),
+        "win_totals": {int(t): float(p) for t, p in zip(totals, dist) if p},
+        # each game's win rate across paths, i.e. averaged over the streaks the Suns arrive on
+        "games": [
+            {"date": game["date"], "opponent": game["opponent"], "location": game["location"],
+             "win_rate": float(w / paths)}
+            for game, w in zip(games, game_wins)
+        ],
+    }
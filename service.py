@@ -0,0 +1,575 @@
+"""
+Headless scoring service: the scorer stack the app uses (prediction cache,
+persistent store, pooled endpoint client with hedging / circuit breaker,
+local-model failover) plus payload -> probability -> explanation helpers,
+without Streamlit. Configured from the same environment variables as app.py.
+
+    python service.py serve --port 8080
+        POST /v1/predict         one game object      -> prediction
+        POST /v1/predict/batch   {"games": [...]}     -> {"results": [...], "errors": [...]}
+        GET  /healthz, GET /metrics
+    python service.py score < games.ndjson > predictions.ndjson
+        one game per input line, one JSON result per output line, in input order
+    python service.py backtest games.csv
+        replay a game log with results (see backtest.py); running metrics on
+        stderr per chunk, final metrics JSON on stdout
+    python service.py simulate schedule.csv --paths 50000
+        play out the Suns' remaining schedule (see season_sim.py); win-total
+        distribution and playoff odds as JSON
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+import requests
+
+from audit_log import AuditLog
+from endpoint_client import DEFAULT_ENDPOINT_URL, EndpointClient
+from explanations import explain_batch, generate_explanation
+from fanout import AsyncFanout
+from metrics import metrics
+from prediction_cache import PredictionCache
+from prediction_store import PredictionStore
+from replicas import ReplicaRouter, parse_replicas
+from resilience import CircuitBreaker, CircuitOpenError, Hedger
+from scorers import CachedScorer, CoalescingScorer, FailoverScorer, HttpScorer, LocalScorer
+from scoring import FEATURE_FIELDS, ScoringError, normalize_record, validate_games
+from warm_keeper import WarmKeeper, endpoint_ping, parse_windows
+
+# -------------------------
+# CONFIG
+# -------------------------
+ENDPOINT_URL = os.environ.get("ENDPOINT_URL", DEFAULT_ENDPOINT_URL)
+DATABRICKS_TOKEN = os.environ.get("DATABRICKS_TOKEN")
+
+# Several equivalent endpoints instead of ENDPOINT_URL: "URL [weight], URL [weight], ..." (see replicas.py).
+# Calls go to the healthy replica with the lowest EWMA latency x load / weight; a replica is ejected after
+# REPLICA_EJECT_AFTER consecutive failures or when REPLICA_SLOW_FACTOR times slower than the fastest, and
+# pinged every REPLICA_HEALTH_INTERVAL s to decide when it comes back
+ENDPOINT_REPLICAS = parse_replicas(os.environ.get("ENDPOINT_REPLICAS", ""))
+REPLICA_HEALTH_INTERVAL = float(os.environ.get("REPLICA_HEALTH_INTERVAL", "10"))
+REPLICA_EJECT_AFTER = int(os.environ.get("REPLICA_EJECT_AFTER", "3"))
+REPLICA_SLOW_FACTOR = float(os.environ.get("REPLICA_SLOW_FACTOR", "5"))
+
+# HTTP client: connect/read timeouts (seconds), retries on 429/5xx, pooled connections
+ENDPOINT_CONNECT_TIMEOUT = float(os.environ.get("ENDPOINT_CONNECT_TIMEOUT", "3.05"))
+ENDPOINT_READ_TIMEOUT = float(os.environ.get("ENDPOINT_READ_TIMEOUT", "30"))
+ENDPOINT_MAX_RETRIES = int(os.environ.get("ENDPOINT_MAX_RETRIES", "3"))
+ENDPOINT_POOL_SIZE = int(os.environ.get("ENDPOINT_POOL_SIZE", "10"))
+
+# Multi-request workloads: max requests in flight (keep <= ENDPOINT_POOL_SIZE) and per-request timeout
+FANOUT_CONCURRENCY = int(os.environ.get("FANOUT_CONCURRENCY", "4"))
+FANOUT_TIMEOUT = float(os.environ.get("FANOUT_TIMEOUT", "60"))
+
+# Tail latency: duplicate a request still unanswered at the HEDGE_QUANTILE latency (clamped to
+# HEDGE_MIN_DELAY..HEDGE_MAX_DELAY s, at most HEDGE_MAX_RATIO of calls), give up after ENDPOINT_CALL_TIMEOUT s,
+# and stop calling the endpoint for BREAKER_RESET s after BREAKER_FAILURES consecutive failures
+HEDGE_ENABLED = os.environ.get("HEDGE_ENABLED", "1") == "1"
+HEDGE_QUANTILE = float(os.environ.get("HEDGE_QUANTILE", "0.95"))
+HEDGE_MIN_DELAY = float(os.environ.get("HEDGE_MIN_DELAY", "0.05"))
+HEDGE_MAX_DELAY = float(os.environ.get("HEDGE_MAX_DELAY", "2"))
+HEDGE_MAX_RATIO = float(os.environ.get("HEDGE_MAX_RATIO", "0.1"))
+ENDPOINT_CALL_TIMEOUT = float(os.environ.get("ENDPOINT_CALL_TIMEOUT", "10"))
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.environ.get("BREAKER_RESET", "30"))
+
+# Scoring backend: "http" (serving endpoint), "local" (exported model artifact),
+# or "auto" (endpoint, failing over to the local model when it errors or is slower than FAILOVER_TIMEOUT
+# seconds per round of FANOUT_CONCURRENCY requests of BATCH_SIZE rows the call needs)
+SCORER_BACKEND = os.environ.get("SCORER_BACKEND", "auto")
+LOCAL_MODEL_PATH = os.environ.get("LOCAL_MODEL_PATH", "model/local_model.json")
+FAILOVER_TIMEOUT = float(os.environ.get("FAILOVER_TIMEOUT", "5"))
+
+# Batch scoring: rows per endpoint call and request format of multi-row requests ("split", "inputs"
+# or "records"); request bodies of ENDPOINT_GZIP_MIN_BYTES or more are gzipped (0 = never; only for
+# endpoints that accept Content-Encoding: gzip)
+BATCH_SIZE = int(os.environ.get("BATCH_SIZE", "100"))
+BATCH_PAYLOAD_FORMAT = os.environ.get("BATCH_PAYLOAD_FORMAT", "split")
+ENDPOINT_GZIP_MIN_BYTES = int(os.environ.get("ENDPOINT_GZIP_MIN_BYTES", "0"))
+
+# Prediction cache (shared across sessions): entry lifetime in seconds and max entries
+PREDICTION_CACHE_TTL = int(os.environ.get("PREDICTION_CACHE_TTL", "3600"))
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "2048"))
+
+# Persistent prediction store (SQLite, shared by restarts / replicas on the same disk; "" disables it).
+# Entries are tagged with the endpoint + MODEL_VERSION, so bumping MODEL_VERSION invalidates them;
+# PREDICTION_STORE_WARM hot entries are preloaded into the in-memory cache at boot
+PREDICTION_STORE_PATH = os.environ.get("PREDICTION_STORE_PATH", ".cache/predictions.sqlite3")
+PREDICTION_STORE_TTL = int(os.environ.get("PREDICTION_STORE_TTL", "86400"))
+PREDICTION_STORE_WARM = int(os.environ.get("PREDICTION_STORE_WARM", "512"))
+MODEL_VERSION = os.environ.get("MODEL_VERSION", "1")
+
+# Warm-keeper for scale-to-zero endpoints (WARM_INTERVAL=0 disables it): ping every WARM_INTERVAL s
+# (adapted between WARM_MIN_INTERVAL and WARM_MAX_INTERVAL) while there was traffic in the last
+# WARM_IDLE_AFTER s or inside WARM_WINDOWS ("HH:MM-HH:MM,..." local time); a ping slower than
+# WARM_COLD_THRESHOLD s counts as a cold start
+WARM_INTERVAL = float(os.environ.get("WARM_INTERVAL", "240"))
+WARM_MIN_INTERVAL = float(os.environ.get("WARM_MIN_INTERVAL", "30"))
+WARM_MAX_INTERVAL = float(os.environ.get("WARM_MAX_INTERVAL", "900"))
+WARM_IDLE_AFTER = float(os.environ.get("WARM_IDLE_AFTER", "1800"))
+WARM_WINDOWS = os.environ.get("WARM_WINDOWS", "")
+WARM_COLD_THRESHOLD = float(os.environ.get("WARM_COLD_THRESHOLD", "2"))
+
+# Audit log of every scoring call (rows, probabilities, latency, answering backend) as rotating gzipped
+# JSONL in AUDIT_LOG_DIR (off by default: it holds every request's rows, so deployments opt in), written
+# by a background thread; at most AUDIT_QUEUE_SIZE records wait for the writer (more are dropped and
+# counted, never waited for); a file is rotated at AUDIT_MAX_BYTES or AUDIT_ROTATE_S seconds and the
+# newest AUDIT_KEEP files are kept
+AUDIT_LOG_DIR = os.environ.get("AUDIT_LOG_DIR", "")
+AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_MAX_BYTES = int(os.environ.get("AUDIT_MAX_BYTES", str(50 * 1024 * 1024)))
+AUDIT_ROTATE_S = float(os.environ.get("AUDIT_ROTATE_S", "86400"))
+AUDIT_KEEP = int(os.environ.get("AUDIT_KEEP", "20"))
+
+# HTTP API: largest accepted request body
+API_MAX_BODY = int(os.environ.get("API_MAX_BODY", str(10 * 1024 * 1024)))
+
+
+# -------------------------
+# SCORING SERVICE
+# -------------------------
+def _endpoint_client(url, max_retries=ENDPOINT_MAX_RETRIES):
+    return EndpointClient(
+        url,
+        DATABRICKS_TOKEN,
+        connect_timeout=ENDPOINT_CONNECT_TIMEOUT,
+        read_timeout=ENDPOINT_READ_TIMEOUT,
+        max_retries=max_retries,
+        pool_size=ENDPOINT_POOL_SIZE,
+        gzip_min_bytes=ENDPOINT_GZIP_MIN_BYTES,
+    )
+
+
+def _local_scorer():
+    from local_model import load_local_model  # pulls in numpy: only import it when a local model is used
+
+    return LocalScorer(load_local_model(LOCAL_MODEL_PATH))
+
+
+class ScoringService:
+    """
+    One scorer stack plus the parts of it worth reporting on. Build it once
+    per process (from_env) and share it; every component is thread-safe.
+    """
+
+    def __init__(self, scorer, cache=None, store=None, client=None, hedger=None, breaker=None,
+                 singleflight=None, warm_keeper=None, router=None, audit=None, failover=None):
+        self.scorer = scorer
+        self.failover = failover
+        self.router = router
+        self.audit = audit
+        self.singleflight = singleflight
+        self.warm_keeper = warm_keeper
+        self.cache = cache
+        self.store = store
+        self.client = client
+        self.hedger = hedger
+        self.breaker = breaker
+
+    @classmethod
+    def from_env(cls):
+        audit = None
+        if AUDIT_LOG_DIR:
+            audit = AuditLog(AUDIT_LOG_DIR, queue_size=AUDIT_QUEUE_SIZE, max_bytes=AUDIT_MAX_BYTES,
+                             rotate_s=AUDIT_ROTATE_S, keep=AUDIT_KEEP)
+        if SCORER_BACKEND == "local":
+            return cls(_local_scorer(), audit=audit)
+        if not DATABRICKS_TOKEN:
+            raise RuntimeError("DATABRICKS_TOKEN environment variable not set.")
+
+        # replicas serve the same model, so they share store entries
+        endpoint_id = ",".join(sorted(url for url, _ in ENDPOINT_REPLICAS)) or ENDPOINT_URL
+        store = None
+        if PREDICTION_STORE_PATH:
+            try:
+                store = PredictionStore(PREDICTION_STORE_PATH, f"{endpoint_id}@{MODEL_VERSION}",
+                                        ttl_seconds=PREDICTION_STORE_TTL)
+            except (sqlite3.Error, OSError) as e:
+                # a locked / unreadable store costs the disk cache, not the service
+                print(f"warning: prediction store {PREDICTION_STORE_PATH} unavailable ({e}); running without it",
+                      file=sys.stderr)
+            else:
+                store.purge()
+        cache = PredictionCache(ttl_seconds=PREDICTION_CACHE_TTL, max_entries=PREDICTION_CACHE_SIZE)
+        if store is not None and PREDICTION_STORE_WARM:
+            cache.preload(store.hot_entries(min(PREDICTION_STORE_WARM, PREDICTION_CACHE_SIZE)))
+        router = None
+        if ENDPOINT_REPLICAS:
+            # one pooled session per replica; retries happen in the router, on the next replica
+            client = router = ReplicaRouter(
+                [(_endpoint_client(url, max_retries=0), weight) for url, weight in ENDPOINT_REPLICAS],
+                eject_after=REPLICA_EJECT_AFTER,
+                slow_factor=REPLICA_SLOW_FACTOR,
+                health_interval=REPLICA_HEALTH_INTERVAL,
+                max_retries=ENDPOINT_MAX_RETRIES,
+            )
+        else:
+            # one pooled keep-alive session for the whole process
+            client = _endpoint_client(ENDPOINT_URL)
+        hedger = None
+        if HEDGE_ENABLED:
+            hedger = Hedger(quantile=HEDGE_QUANTILE, min_delay=HEDGE_MIN_DELAY, max_delay=HEDGE_MAX_DELAY,
+                            max_ratio=HEDGE_MAX_RATIO, timeout=ENDPOINT_CALL_TIMEOUT)
+        breaker = CircuitBreaker(failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET)
+
+        warm_keeper = None
+        if WARM_INTERVAL:
+            # not started here: long-running processes (app, `serve`) call start_background()
+            warm_keeper = WarmKeeper(
+                endpoint_ping(client),
+                interval=WARM_INTERVAL,
+                min_interval=WARM_MIN_INTERVAL,
+                max_interval=WARM_MAX_INTERVAL,
+                idle_after=WARM_IDLE_AFTER,
+                windows=parse_windows(WARM_WINDOWS),
+                cold_threshold=WARM_COLD_THRESHOLD,
+            )
+
+        # cache misses for a row another session is already scoring wait on that request
+        singleflight = CoalescingScorer(
+            HttpScorer(
+                client,
+                batch_size=BATCH_SIZE,
+                fmt=BATCH_PAYLOAD_FORMAT,
+                fanout=AsyncFanout(concurrency=FANOUT_CONCURRENCY, timeout=FANOUT_TIMEOUT),
+                hedger=hedger,
+                breaker=breaker,
+                warm_keeper=warm_keeper,
+            )
+        )
+        failover = None
+        if SCORER_BACKEND == "auto" and os.path.exists(LOCAL_MODEL_PATH):
+            # under the cache: only misses fail over, and local answers are never cached as the endpoint's
+            failover = FailoverScorer(singleflight, _local_scorer(), timeout=FAILOVER_TIMEOUT,
+                                      batch_size=BATCH_SIZE, concurrency=FANOUT_CONCURRENCY)
+        scorer = CachedScorer(failover or singleflight, cache, store=store)
+        if failover is not None:
+            failover.on_late_result = scorer.remember
+        return cls(scorer, cache=cache, store=store, client=client, hedger=hedger, breaker=breaker,
+                   singleflight=singleflight, warm_keeper=warm_keeper, router=router, audit=audit,
+                   failover=failover)
+
+    def start_background(self):
+        """
+        Start the warm-keeper and replica health-check threads, if any. Call
+        once per process.
+        """
+        if self.warm_keeper is not None and not self.warm_keeper.is_alive():
+            self.warm_keeper.start()
+        if self.router is not None and not self.router.is_alive():
+            self.router.start()
+        return self
+
+    @property
+    def last_backend(self):
+        """
+        Backend that answered this thread's most recent score() call ("local"
+        when the endpoint failed over, "cache" when no row had to be scored).
+        """
+        return getattr(self.scorer, "last_backend", None) or self.scorer.name
+
+    def score(self, records, batch_size=None):
+        if self.audit is None:
+            return self.scorer.score(records, batch_size=batch_size)
+        start = time.perf_counter()
+        try:
+            probs = self.scorer.score(records, batch_size=batch_size)
+        except Exception as e:
+            self.audit.record(records, None, time.perf_counter() - start, error=str(e))
+            raise
+        self.audit.record(records, probs, time.perf_counter() - start, backend=self.last_backend)
+        return probs
+
+    def predict(self, record):
+        """
+        Validate and score one game. Returns win_probability, prediction,
+        explanation (list of lines) and the backend that answered.
+        Raises ValueError for a bad record, ScoringError / requests.RequestException
+        when it can't be scored.
+        """
+        record = normalize_record(record)
+        with metrics.span("predict_total"):
+            prob = self.score([record])[0]
+        with metrics.span("explanation"):
+            explanation = generate_explanation(record, prob)
+        return {
+            "win_probability": prob,
+            "prediction": "WIN" if prob >= 0.5 else "LOSS",
+            "explanation": explanation,
+            "backend": self.last_backend,
+        }
+
+    def score_frame(self, games, batch_size=None, explain=True):
+        """
+        Score a validated DataFrame (see validate_games). Returns a copy with
+        win_probability, prediction and (optionally) explanation columns.
+        """
+        probs = self.score(games.to_dict("records"), batch_size=batch_size)
+        results = games.copy()
+        results["win_probability"] = probs
+        results["prediction"] = ["WIN" if p >= 0.5 else "LOSS" for p in probs]
+        if explain:
+            with metrics.span("explanation_batch"):
+                results["explanation"] = explain_batch(games, probs)
+        return results
+
+    def predict_batch(self, games, batch_size=None, explain=True):
+        """
+        Validate and score a list of game objects. Returns (results, errors):
+        one result dict per valid game (with the backend that scored it) and
+        {"index", "error"} per invalid one, indices referring to positions in
+        `games`.
+        """
+        import pandas as pd
+
+        if not games:
+            return [], []
+        frame = pd.DataFrame([g if isinstance(g, dict) else {} for g in games])
+        for col in FEATURE_FIELDS:
+            if col not in frame.columns:
+                frame[col] = None
+        valid, invalid = validate_games(frame)
+        errors = [{"index": int(i), "error": msg} for i, msg in invalid["error"].items()]
+        if valid.empty:
+            return [], errors
+        bad = set(invalid.index)
+        positions = [i for i in range(len(games)) if i not in bad]
+        results = self.score_frame(valid, batch_size=batch_size, explain=explain)
+        results.insert(0, "index", positions)
+        results["backend"] = self.last_backend
+        return results.to_dict("records"), errors
+
+    def stats(self):
+        out = {}
+        if self.cache is not None:
+            out.update({f"cache_{k}": v for k, v in self.cache.stats().items()})
+        if self.client is not None:
+            out.update(self.client.stats())
+        if self.store is not None:
+            out.update({f"store_{k}": v for k, v in self.store.stats().items()})
+        if self.singleflight is not None:
+            out.update({f"singleflight_{k}": v for k, v in self.singleflight.stats().items()})
+        if self.breaker is not None:
+            out.update({f"breaker_{k}": v for k, v in self.breaker.stats().items()})
+        if self.hedger is not None:
+            out.update({f"hedge_{k}": v for k, v in self.hedger.stats().items()})
+        if self.warm_keeper is not None:
+            out.update({f"warm_{k}": v for k, v in self.warm_keeper.stats().items()})
+        if self.audit is not None:
+            out.update({f"audit_{k}": v for k, v in self.audit.stats().items()})
+        if self.failover is not None:
+            out.update({f"failover_{k}": v for k, v in self.failover.stats().items()})
+        return out
+
+
+# what scoring can raise besides ValueError for a bad record
+SCORING_ERRORS = (ScoringError, requests.RequestException)
+
+
+def error_status(e):
+    """
+    HTTP status for an error raised while scoring.
+    """
+    if isinstance(e, ValueError):
+        return 400
+    if isinstance(e, CircuitOpenError):
+        return 503
+    if isinstance(e, requests.Timeout):
+        return 504
+    return 502
+
+
+# -------------------------
+# HTTP JSON API
+# -------------------------
+def make_server(service, host="127.0.0.1", port=8080):
+    """
+    ThreadingHTTPServer exposing `service`; call serve_forever() on it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _send(self, status, body, ctype="application/json"):
+            out = body if isinstance(body, bytes) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length", 0))
+            if length > API_MAX_BODY:
+                self.close_connection = True
+                raise ValueError(f"request body over {API_MAX_BODY} bytes")
+            return json.loads(self.rfile.read(length) or b"null")
+
+        def do_GET(self):
+            if self.path == "/healthz":
+                self._send(200, {"status": "ok", "backend": service.scorer.name})
+            elif self.path == "/metrics":
+                self._send(200, metrics.to_prometheus().encode(), "text/plain; version=0.0.4")
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            try:
+                body = self._read_json()
+                if self.path == "/v1/predict":
+                    if not isinstance(body, dict):
+                        raise ValueError("expected a JSON object with the game features")
+                    self._send(200, service.predict(body))
+                elif self.path == "/v1/predict/batch":
+                    games = body.get("games") if isinstance(body, dict) else body
+                    if not isinstance(games, list):
+                        raise ValueError('expected {"games": [...]} or a JSON array')
+                    explain = not (isinstance(body, dict) and body.get("explain") is False)
+                    results, errors = service.predict_batch(games, explain=explain)
+                    self._send(200, {"results": results, "errors": errors})
+                else:
+                    self._send(404, {"error": "not found"})
+            except (ValueError, ScoringError, requests.RequestException) as e:
+                self._send(error_status(e), {"error": str(e)})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+# -------------------------
+# NDJSON CLI
+# -------------------------
+def score_stream(service, lines, chunk_size=500, explain=True):
+    """
+    Yield one result dict per non-blank input line (game JSON), in order,
+    scoring `chunk_size` lines per batch so the input is never held in memory
+    at once. "line" is the 1-based input line number.
+    """
+    lines = iter(lines)
+    line_no = 0
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        parsed, out = [], [None] * len(chunk)
+        for i, line in enumerate(chunk):
+            if not line.strip():
+                continue
+            try:
+                game = json.loads(line)
+                if not isinstance(game, dict):
+                    raise ValueError("expected a JSON object")
+                parsed.append((i, game))
+            except ValueError as e:
+                out[i] = {"line": line_no + i + 1, "error": f"invalid JSON: {e}"}
+        if parsed:
+            try:
+                results, errors = service.predict_batch([g for _, g in parsed], explain=explain)
+            except (ScoringError, requests.RequestException) as e:
+                results, errors = [], [{"index": j, "error": str(e)} for j in range(len(parsed))]
+            for r in results:
+                i = parsed[r.pop("index")][0]
+                out[i] = {"line": line_no + i + 1, **r}
+            for err in errors:
+                i = parsed[err["index"]][0]
+                out[i] = {"line": line_no + i + 1, "error": err["error"]}
+        for item in out:
+            if item is not None:
+                yield item
+        line_no += len(chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run the HTTP JSON API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    score = sub.add_parser("score", help="score newline-delimited JSON games")
+    score.add_argument("--input", help="NDJSON file (default: stdin)")
+    score.add_argument("--output", help="NDJSON file (default: stdout)")
+    score.add_argument("--chunk-size", type=int, default=500)
+    score.add_argument("--no-explanations", action="store_true")
+    backtest = sub.add_parser("backtest", help="grade the model on a CSV / JSONL game log with results")
+    backtest.add_argument("path")
+    backtest.add_argument("--chunk-size", type=int, default=1000, help="rows read and scored at a time")
+    backtest.add_argument("--bins", type=int, default=10, help="calibration bins")
+    simulate = sub.add_parser("simulate", help="Monte Carlo the rest of the season from a schedule / results CSV")
+    simulate.add_argument("path")
+    simulate.add_argument("--paths", type=int, default=20000, help="simulated seasons")
+    simulate.add_argument("--workers", type=int, help="processes (default: one per 500k paths, up to one per CPU)")
+    simulate.add_argument("--playoff-wins", type=int, default=45, help="win total counted as making the playoffs")
+    simulate.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        service = ScoringService.from_env()
+    except RuntimeError as e:
+        parser.exit(1, f"{e}\n")
+
+    if args.command == "serve":
+        service.start_background()
+        server = make_server(service, args.host, args.port)
+        print(f"scoring API on http://{args.host}:{server.server_address[1]} (backend={service.scorer.name})",
+              file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.command == "backtest":
+        from backtest import iter_game_log, run_backtest  # pandas / numpy, only for this command
+
+        snapshot = None
+        try:
+            for snapshot in run_backtest(service, iter_game_log(args.path, args.chunk_size), bins=args.bins):
+                print(f"{snapshot['games']} games  accuracy {snapshot['accuracy'] or 0:.3f}  "
+                      f"log-loss {snapshot['log_loss'] or 0:.4f}  brier {snapshot['brier'] or 0:.4f}  "
+                      f"skipped {snapshot['skipped']}  backends {snapshot['backends']}", file=sys.stderr)
+        except (OSError, ValueError, ScoringError, requests.RequestException) as e:
+            parser.exit(1, f"backtest failed: {e}\n")
+        print(json.dumps(snapshot, indent=2))
+        return
+
+    if args.command == "simulate":
+        from schedule_index import ScheduleIndex
+        from season_sim import simulate_season  # numpy, only for this command
+
+        try:
+            season = ScheduleIndex(args.path).remaining_schedule()
+            result = simulate_season(service, season, paths=args.paths, workers=args.workers, seed=args.seed,
+                                     playoff_wins=args.playoff_wins)
+        except (OSError, ValueError, ScoringError, requests.RequestException) as e:
+            parser.exit(1, f"simulation failed: {e}\n")
+        print(json.dumps(result, indent=2))
+        return
+
+    src = open(args.input) if args.input else sys.stdin
+    dst = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for n, item in enumerate(score_stream(service, src, args.chunk_size,
+                                              explain=not args.no_explanations), start=1):
+            dst.write(json.dumps(item) + "\n")
+            if n % args.chunk_size == 0:
+                dst.flush()
+        dst.flush()
+    finally:
+        if args.input:
+            src.close()
+        if args.output:
+            dst.close()
+
+
+if __name__ == "__main__":
+    main()
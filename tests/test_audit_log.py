@@ -0,0 +1,59 @@
+import glob
+import gzip
+import json
+
+import pytest
+import requests
+
+from audit_log import AuditLog
+from prediction_cache import PredictionCache
+from scorers import CachedScorer
+from service import ScoringService
+
+RECORD = {"opponent": "LAL", "location": "Home", "suns_streak": 2, "opp_streak": 0, "suns_rest": 1, "opp_rest": 1}
+
+
+def read_lines(directory):
+    lines = []
+    for path in sorted(glob.glob(str(directory / "audit-*.jsonl.gz"))):
+        with gzip.open(path) as f:
+            lines.extend(json.loads(line) for line in f)
+    return lines
+
+
+def test_unserializable_record_is_dropped_and_the_writer_keeps_going(tmp_path):
+    log = AuditLog(str(tmp_path), flush_interval=0.01)
+    log.record([{"a": 1}], [0.4], 0.01)
+    log.record([{"bad": object()}], [0.5], 0.01)
+    log.record([{"a": 2}], [0.6], 0.01)
+    log.close()
+    assert [line["records"] for line in read_lines(tmp_path)] == [[{"a": 1}], [{"a": 2}]]
+    stats = log.stats()
+    assert (stats["written"], stats["dropped"], stats["write_errors"]) == (2, 1, 0)
+
+
+class FakeScorer:
+    name = "http"
+
+    def __init__(self, error=None):
+        self.error = error
+
+    def score(self, records, batch_size=None):
+        if self.error is not None:
+            raise self.error
+        return [0.7] * len(records)
+
+
+def test_service_logs_cache_hits_and_failures_with_the_backend(tmp_path):
+    log = AuditLog(str(tmp_path), flush_interval=0.01)
+    service = ScoringService(CachedScorer(FakeScorer(), PredictionCache()), audit=log)
+    service.score([RECORD])
+    service.score([RECORD])
+    failing = ScoringService(FakeScorer(requests.ConnectionError("down")), audit=log)
+    with pytest.raises(requests.ConnectionError):
+        failing.score([RECORD])
+    log.close()
+    lines = read_lines(tmp_path)
+    assert [(line["backend"], line["probs"], line["rows"]) for line in lines] == [
+        ("http", [0.7], 1), ("cache", [0.7], 1), (None, None, 1)]
+    assert lines[2]["error"] == "down"
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from backtest import run_backtest
+
+
+class HomeWinsScorer:
+    """
+    A perfect model for the log below: 0.9 at home, 0.1 away.
+    """
+
+    def score(self, records, batch_size=None):
+        return [0.9 if r["location"] == "Home" else 0.1 for r in records]
+
+
+def game(opponent, location, suns_win):
+    return {"opponent": opponent, "location": location, "suns_streak": "1", "opp_streak": "-1",
+            "suns_rest": "2", "opp_rest": "1", "suns_win": suns_win}
+
+
+def test_invalid_row_mid_chunk_keeps_outcomes_aligned():
+    chunk = pd.DataFrame([
+        game("LAL", "Away", "0"),
+        game("XXX", "Home", "0"),  # unknown opponent: skipped
+        game("LAL", "Home", "1"),
+        game("DEN", "Away", "?"),  # unreadable outcome: skipped
+        game("DEN", "Away", "0"),
+        game("BOS", "Home", "W"),
+    ], index=range(100, 106))  # a later chunk of a CSV keeps the file's row numbers
+
+    result = list(run_backtest(HomeWinsScorer(), [chunk]))[-1]
+
+    assert result["games"] == 4
+    assert result["skipped"] == 2
+    assert result["accuracy"] == 1.0
+    assert result["base_rate"] == 0.5
+    assert result["brier"] == pytest.approx(0.01)
+    assert [b["win_rate"] for b in result["calibration"]] == [0.0, 1.0]
@@ -0,0 +1,85 @@
+import sqlite3
+
+import service
+from prediction_store import PredictionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(streak):
+    return {"opponent": "LAL", "location": "Home", "suns_streak": streak, "opp_streak": 0,
+            "suns_rest": 1, "opp_rest": 1}
+
+
+def test_entries_expire_after_the_ttl(tmp_path):
+    clock = FakeClock()
+    store = PredictionStore(str(tmp_path / "s.db"), "ep@1", ttl_seconds=60, clock=clock)
+    store.put_many([record(1)], [0.4])
+    clock.now += 59
+    assert store.get_many([record(1), record(2)]) == [0.4, None]
+    clock.now += 1
+    assert store.get_many([record(1)]) == [None]
+    assert store.hot_entries(10) == []
+    store.close()
+
+
+def test_new_version_hides_and_purges_old_rows(tmp_path):
+    path = str(tmp_path / "s.db")
+    old = PredictionStore(path, "ep@1")
+    old.put_many([record(1), record(2)], [0.1, 0.2])
+    old.close()
+
+    new = PredictionStore(path, "ep@2")
+    assert new.get_many([record(1)]) == [None]
+    assert new.purge() == 1
+    new.close()
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] == 0
+    assert conn.execute("SELECT tag FROM versions").fetchall() == [("ep@2",)]
+
+
+def test_purge_keeps_newer_versions(tmp_path):
+    path = str(tmp_path / "s.db")
+    older = PredictionStore(path, "ep@1")
+    newer = PredictionStore(path, "ep@2")
+    newer.put_many([record(1)], [0.5])
+    assert older.purge() == 0
+    assert newer.get_many([record(1)]) == [0.5]
+    older.close()
+    newer.close()
+
+
+def test_hot_entries_rank_by_persisted_hits(tmp_path):
+    path = str(tmp_path / "s.db")
+    store = PredictionStore(path, "ep@1")
+    store.put_many([record(1), record(2)], [0.1, 0.2])
+    store.get_many([record(2)])
+    store.close()  # flushes the buffered hit
+    reopened = PredictionStore(path, "ep@1")
+    assert [key[2] for key, _ in reopened.hot_entries(2)] == [2, 1]
+    reopened.close()
+
+
+def test_unreadable_database_degrades_instead_of_raising(tmp_path):
+    store = PredictionStore(str(tmp_path / "s.db"), "ep@1")
+    store._conn().close()  # every later query on this thread raises sqlite3.ProgrammingError
+    assert store.purge() == 0
+    assert store.hot_entries(10) == []
+    assert store.get_many([record(1)]) == [None]
+    stats = store.stats()
+    assert (stats["size"], stats["errors"]) == (None, 3)
+
+
+def test_service_boots_without_a_store_it_cannot_open(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "DATABRICKS_TOKEN", "token")
+    monkeypatch.setattr(service, "SCORER_BACKEND", "http")
+    monkeypatch.setattr(service, "PREDICTION_STORE_PATH", str(tmp_path))  # a directory: sqlite can't open it
+    svc = service.ScoringService.from_env()
+    assert svc.store is None
+    assert svc.scorer.store is None
@@ -0,0 +1,71 @@
+import pytest
+import requests
+
+from replicas import ReplicaRouter
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def close(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self, url, outcome):
+        self.url = url
+        self.outcome = outcome
+        self.calls = 0
+
+    def post_body(self, body, headers=None):
+        self.calls += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return FakeResponse(self.outcome)
+
+    def backoff_delay(self, attempt):
+        return 0.0
+
+    def stats(self):
+        return {"requests_sent": self.calls, "retries": 0, "bytes_sent": 0}
+
+    def close(self):
+        pass
+
+
+def router(*clients, **kwargs):
+    return ReplicaRouter([(c, 1.0) for c in clients], ping=lambda client: None, sleep=lambda s: None, **kwargs)
+
+
+def in_flight(r):
+    return [replica["in_flight"] for replica in r.stats()["replicas"]]
+
+
+def test_fails_over_to_the_next_replica():
+    bad, good = FakeClient("a", requests.ConnectionError()), FakeClient("b", 200)
+    r = router(bad, good)
+    r.replicas[1].ewma = 1.0  # the failing replica looks faster, so it is tried first
+    assert r.post_body(b"{}").status_code == 200
+    assert (bad.calls, good.calls) == (1, 1)
+    assert in_flight(r) == [0, 0]
+
+
+@pytest.mark.parametrize("error", [requests.exceptions.ChunkedEncodingError(),
+                                   requests.exceptions.TooManyRedirects(), ValueError("hook")])
+def test_other_errors_release_the_in_flight_slot(error):
+    r = router(FakeClient("a", error))
+    with pytest.raises(type(error)):
+        r.post_body(b"{}")
+    assert in_flight(r) == [0]
+    assert r.stats()["replicas"][0]["failures"] == 1
+
+
+def test_ejects_after_consecutive_failures_and_still_answers_from_the_rest():
+    bad, good = FakeClient("a", 503), FakeClient("b", 200)
+    r = router(bad, good, eject_after=2)
+    for _ in range(3):
+        r.replicas[1].ewma = 1.0
+        assert r.post_body(b"{}").status_code == 200
+    assert r.stats()["replicas"][0]["ejected_for"] == "failures"
+    assert bad.calls == 2
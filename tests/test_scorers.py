@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+import requests
+
+from prediction_cache import PredictionCache
+from scorers import CachedScorer, CoalescingScorer, FailoverScorer
+
+
+def record(streak, opponent="LAL"):
+    return {"opponent": opponent, "location": "Home", "suns_streak": streak, "opp_streak": 0,
+            "suns_rest": 1, "opp_rest": 1}
+
+
+class RecordingScorer:
+    name = "fake"
+
+    def __init__(self, gate=None, scale=10):
+        self.calls = []
+        self.gate = gate
+        self.scale = scale
+
+    def score(self, records, batch_size=None):
+        self.calls.append(records)
+        if self.gate is not None:
+            self.gate.wait(5)
+        return [r["suns_streak"] / self.scale for r in records]
+
+
+class Unreachable:
+    name = "http"
+
+    def score(self, records, batch_size=None):
+        raise requests.ConnectionError("down")
+
+
+def test_duplicate_keys_in_one_call_are_scored_once():
+    inner = RecordingScorer()
+    scorer = CoalescingScorer(inner)
+    # " lal" normalizes to the same key as "LAL"
+    probs = scorer.score([record(3), record(3, " lal"), record(5), record(3)])
+    assert probs == [0.3, 0.3, 0.5, 0.3]
+    assert [len(c) for c in inner.calls] == [2]
+    assert scorer.stats()["in_flight"] == 0
+
+
+def test_concurrent_callers_wait_for_the_request_in_flight():
+    gate = threading.Event()
+    inner = RecordingScorer(gate)
+    scorer = CoalescingScorer(inner)
+    results = []
+    first = threading.Thread(target=lambda: results.append(scorer.score([record(4)])))
+    first.start()
+    while not inner.calls:
+        time.sleep(0.001)
+    second = threading.Thread(target=lambda: results.append(scorer.score([record(4), record(6)])))
+    second.start()
+    while scorer.stats()["coalesced"] < 1:
+        time.sleep(0.001)
+    gate.set()
+    first.join(5)
+    second.join(5)
+    assert sorted(results) == [[0.4], [0.4, 0.6]]
+    # the second caller only sent the row nobody else was scoring
+    assert [[r["suns_streak"] for r in c] for c in inner.calls] == [[4], [6]]
+
+
+def test_errors_reach_every_waiter_and_clear_the_in_flight_entry():
+    class Failing:
+        name = "failing"
+
+        def score(self, records, batch_size=None):
+            raise RuntimeError("boom")
+
+    scorer = CoalescingScorer(Failing())
+    with pytest.raises(RuntimeError):
+        scorer.score([record(1), record(1)])
+    assert scorer.stats()["in_flight"] == 0
+
+
+def test_failover_only_rescores_cache_misses_and_does_not_cache_them():
+    fallback = RecordingScorer(scale=100)
+    failover = FailoverScorer(Unreachable(), fallback)
+    cache = PredictionCache()
+    cache.put(record(3), 0.3)  # answered by the endpoint earlier
+    scorer = CachedScorer(failover, cache)
+
+    assert scorer.score([record(3), record(5)]) == [0.3, 0.05]
+    assert [[r["suns_streak"] for r in c] for c in fallback.calls] == [[5]]
+    assert scorer.last_backend == "fake"
+    assert cache.get(record(5)) is None
+    assert failover.stats()["primary_errors"] == 1
+
+    assert scorer.score([record(3)]) == [0.3]
+    assert scorer.last_backend == "cache"
+    assert len(fallback.calls) == 1
+
+
+def test_late_primary_answer_still_reaches_the_cache():
+    gate = threading.Event()
+    cache = PredictionCache()
+    failover = FailoverScorer(RecordingScorer(gate), RecordingScorer(scale=100), timeout=0.01)
+    scorer = CachedScorer(failover, cache)
+    failover.on_late_result = scorer.remember
+
+    assert scorer.score([record(4)]) == [0.04]
+    assert cache.get(record(4)) is None
+    gate.set()
+    deadline = time.monotonic() + 5
+    while cache.get(record(4)) is None and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert cache.get(record(4)) == 0.4
@@ -0,0 +1,28 @@
+from scoring import ResponseExtractor
+
+
+def test_learns_the_row_path_and_reuses_it():
+    extractor = ResponseExtractor()
+    assert extractor.extract_probs({"predictions": [[0.2], [0.7]]}, 2) == [0.2, 0.7]
+    assert extractor.misses == 1
+    assert extractor.extract_probs({"predictions": [[0.4], [0.9]]}, 2) == [0.4, 0.9]
+    assert extractor.hits == 1
+
+
+def test_relearns_after_the_response_shape_changes():
+    extractor = ResponseExtractor()
+    extractor.extract_probs({"predictions": [0.2, 0.7]}, 2)
+    # e.g. a new model version wraps each row
+    probs = extractor.extract_probs({"outputs": [{"prob": 0.3}, {"prob": 0.6}]}, 2)
+    assert probs == [0.3, 0.6]
+    assert extractor.misses == 2
+    assert extractor.extract_probs({"outputs": [{"prob": 0.1}, {"prob": 0.8}]}, 2) == [0.1, 0.8]
+    assert extractor.hits == 1
+
+
+def test_single_value_path_relearns_too():
+    extractor = ResponseExtractor()
+    assert extractor.extract_prob({"prediction": 0.7}) == 0.7
+    assert extractor.extract_prob({"result": {"probability": 0.25}}) == 0.25
+    assert extractor.extract_prob({"result": {"probability": 0.5}}) == 0.5
+    assert (extractor.hits, extractor.misses) == (1, 2)
@@ -0,0 +1,70 @@
+import json
+
+from prediction_cache import PredictionCache
+from scorers import CachedScorer, HttpScorer
+from warm_keeper import WarmKeeper
+
+RECORD = {"opponent": "LAL", "location": "Home", "suns_streak": 2, "opp_streak": 0, "suns_rest": 1, "opp_rest": 1}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    status_code = 200
+    url = "http://endpoint/invocations"
+    headers = {}
+
+    def __init__(self, n):
+        self.content = json.dumps({"predictions": [0.6] * n}).encode()
+        self.text = self.content.decode()
+
+
+class FakeClient:
+    def __init__(self):
+        self.posts = 0
+
+    def post_json(self, payload):
+        self.posts += 1
+        return FakeResponse(len(payload["dataframe_records"]))
+
+
+def test_cache_hit_does_not_delay_the_next_ping():
+    clock = FakeClock()
+    pings = []
+    keeper = WarmKeeper(lambda: pings.append(clock()), interval=240.0, idle_after=1800.0, clock=clock)
+    client = FakeClient()
+    scorer = CachedScorer(HttpScorer(client, warm_keeper=keeper), PredictionCache())
+
+    scorer.score([RECORD])  # miss: a real request at t=1000
+    keeper.tick()  # first tick after boot pings right away
+    assert len(pings) == 1
+
+    clock.now += 200
+    assert scorer.score([RECORD]) == [0.6]  # answered by the cache
+    assert client.posts == 1
+
+    clock.now += 40  # 240 s after the last real traffic and the last ping
+    keeper.tick()
+    assert len(pings) == 2
+    assert keeper.stats()["skipped_active"] == 0
+
+
+def test_endpoint_request_counts_as_traffic():
+    clock = FakeClock()
+    pings = []
+    keeper = WarmKeeper(lambda: pings.append(clock()), interval=240.0, clock=clock)
+    keeper.tick()
+    scorer = HttpScorer(FakeClient(), warm_keeper=keeper)
+
+    clock.now += 200
+    scorer.score([RECORD])
+    clock.now += 40
+    assert keeper.tick() == 200.0  # next ping due 240 s after the request
+    assert len(pings) == 1
+    assert keeper.stats()["skipped_active"] == 1
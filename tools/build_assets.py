@@ -0,0 +1,187 @@
+"""
+Pre-generate the app's self-hosted static assets into static/.
+
+    python tools/build_assets.py                      # images (+ fonts if sources are cached)
+    python tools/build_assets.py --download-fonts     # also fetch the OFL font sources first
+
+Images: valley.jpg is cropped to the header / button aspect ratios and
+written as responsive AVIF + WebP variants (Pillow).
+Fonts: Anton and Bebas Neue are subset to the Latin glyphs the app uses and
+written as WOFF2 (needs `pip install fonttools brotli`).
+
+Every output name carries a content hash, so browsers/proxies can cache them
+forever; static/assets.json maps logical names to the current files and is
+what app.py reads. Files the new manifest no longer references are removed
+only after it is written, and a font that can't be rebuilt (no fonttools or
+source) keeps its previous file. Streamlit serves the folder at app/static/ once
+server.enableStaticServing is on (see .streamlit/config.toml).
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import urllib.request
+
+from PIL import Image, features
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT, "static")
+FONT_SRC_DIR = os.path.join(ROOT, "tools", "font-src")
+
+# header <img> is 100% x 380px of the centered layout (~704px wide): crop to that ratio
+HEADER_WIDTHS = (480, 960, 1600)
+HEADER_RATIO = 704 / 380
+# button is 300x60 with background-position "center 38%": render it at 1x and 2x
+BUTTON_SIZES = ((300, 60), (600, 120))
+BUTTON_FOCUS_Y = 0.38
+
+FONTS = {
+    "anton": ("Anton-Regular.ttf", "https://github.com/google/fonts/raw/main/ofl/anton/Anton-Regular.ttf"),
+    "bebas-neue": ("BebasNeue-Regular.ttf",
+                   "https://github.com/google/fonts/raw/main/ofl/bebasneue/BebasNeue-Regular.ttf"),
+}
+# printable ASCII plus the typographic characters used in labels/footer (’ – … ×)
+FONT_UNICODES = list(range(0x20, 0x7F)) + [0x2019, 0x2013, 0x2026, 0x00D7]
+
+
+def _hashed_write(data, subdir, stem, ext):
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    name = f"{subdir}/{stem}.{digest}.{ext}"
+    path = os.path.join(STATIC_DIR, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return name
+
+
+def _crop_to_ratio(img, ratio, focus_y=0.5):
+    w, h = img.size
+    if w / h > ratio:
+        new_w = int(h * ratio)
+        left = (w - new_w) // 2
+        return img.crop((left, 0, left + new_w, h))
+    new_h = int(w / ratio)
+    top = int((h - new_h) * focus_y)
+    return img.crop((0, top, w, top + new_h))
+
+
+def _encode(img, fmt):
+    buf = io.BytesIO()
+    if fmt == "avif":
+        img.save(buf, "AVIF", quality=55, speed=4)
+    else:
+        img.save(buf, "WEBP", quality=72, method=6)
+    return buf.getvalue()
+
+
+def build_images(source):
+    formats = ["avif", "webp"] if features.check("avif") else ["webp"]
+    src = Image.open(source).convert("RGB")
+    out = {"header": {f: [] for f in formats}, "button": {f: [] for f in formats}}
+
+    header = _crop_to_ratio(src, HEADER_RATIO)
+    for width in HEADER_WIDTHS:
+        resized = header.resize((width, round(width / HEADER_RATIO)), Image.LANCZOS)
+        for fmt in formats:
+            name = _hashed_write(_encode(resized, fmt), "img", f"valley-{width}", fmt)
+            out["header"][fmt].append({"file": name, "width": width})
+
+    button = _crop_to_ratio(src, BUTTON_SIZES[0][0] / BUTTON_SIZES[0][1], BUTTON_FOCUS_Y)
+    for scale, size in enumerate(BUTTON_SIZES, start=1):
+        resized = button.resize(size, Image.LANCZOS)
+        for fmt in formats:
+            name = _hashed_write(_encode(resized, fmt), "img", f"valley-button-{scale}x", fmt)
+            out["button"][fmt].append({"file": name, "scale": scale})
+    return out
+
+
+def download_fonts():
+    os.makedirs(FONT_SRC_DIR, exist_ok=True)
+    for filename, url in FONTS.values():
+        path = os.path.join(FONT_SRC_DIR, filename)
+        if not os.path.exists(path):
+            print(f"downloading {url}")
+            urllib.request.urlretrieve(url, path)
+
+
+def build_fonts():
+    try:
+        from fontTools import subset
+    except ImportError:
+        print("fonttools not installed; skipping fonts (pip install fonttools brotli)")
+        return {}
+
+    out = {}
+    for family, (filename, _) in FONTS.items():
+        path = os.path.join(FONT_SRC_DIR, filename)
+        if not os.path.exists(path):
+            print(f"missing {path}; skipping {family} (run with --download-fonts)")
+            continue
+        options = subset.Options()
+        options.flavor = "woff2"
+        options.layout_features = ["kern", "liga"]
+        # keep the copyright / OFL license records, which the license asks to travel with the font
+        options.name_IDs = ["*"]
+        font = subset.load_font(path, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=FONT_UNICODES)
+        subsetter.subset(font)
+        buf = io.BytesIO()
+        subset.save_font(font, buf, options)
+        out[family] = _hashed_write(buf.getvalue(), "fonts", f"{family}-latin", "woff2")
+    return out
+
+
+def _load_manifest():
+    try:
+        with open(os.path.join(STATIC_DIR, "assets.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _remove_stale(manifest):
+    # only once the new manifest is written: drop hashed files it no longer points at
+    current = set(manifest["fonts"].values())
+    for variants in manifest["images"].values():
+        for entries in variants.values():
+            current.update(entry["file"] for entry in entries)
+    for sub in ("img", "fonts"):
+        folder = os.path.join(STATIC_DIR, sub)
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if f"{sub}/{name}" not in current:
+                    os.remove(os.path.join(folder, name))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=os.path.join(ROOT, "valley.jpg"))
+    parser.add_argument("--download-fonts", action="store_true")
+    args = parser.parse_args(argv)
+
+    previous = _load_manifest()
+    if args.download_fonts:
+        download_fonts()
+    manifest = {"images": build_images(args.source), "fonts": build_fonts()}
+    # a font that couldn't be rebuilt (no fonttools / source) keeps the last build's file
+    for family, name in previous.get("fonts", {}).items():
+        if family in FONTS and family not in manifest["fonts"] and os.path.exists(os.path.join(STATIC_DIR, name)):
+            print(f"keeping {name} from the last build")
+            manifest["fonts"][family] = name
+    with open(os.path.join(STATIC_DIR, "assets.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    _remove_stale(manifest)
+
+    total = 0
+    for dirpath, _, files in os.walk(STATIC_DIR):
+        for name in files:
+            size = os.path.getsize(os.path.join(dirpath, name))
+            total += size
+            print(f"{os.path.relpath(os.path.join(dirpath, name), ROOT):<48} {size / 1024:8.1f} KB")
+    print(f"total {total / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
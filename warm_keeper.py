@@ -0,0 +1,185 @@
+"""
+Keep a scale-to-zero serving endpoint warm.
+
+Databricks serving endpoints scale to zero after a stretch without traffic,
+and the first request afterwards waits for the endpoint to come back up. The
+WarmKeeper thread sends a one-row scoring request ("ping") whenever the
+endpoint would otherwise go quiet for longer than its interval, but only
+while pinging is worth paying for: within WARM_IDLE_AFTER of real traffic,
+or inside a configured usage window (e.g. game nights).
+
+The interval adapts: a ping that comes back cold (slower than
+cold_threshold) means the endpoint scaled down before the ping arrived, so
+the interval is halved; each run of warm pings stretches it by 25%, up to
+max_interval. Cold and warm ping latencies are kept so the interval / cost
+trade-off can be tuned from the admin panel or /metrics.
+"""
+import threading
+import time
+from collections import deque
+
+from metrics import metrics, percentile
+from scoring import ScoringError, build_payload
+
+# the row every ping scores; any valid record works
+PING_RECORD = {
+    "opponent": "LAL",
+    "location": "Home",
+    "suns_streak": 0,
+    "opp_streak": 0,
+    "suns_rest": 1,
+    "opp_rest": 1,
+}
+
+
+def endpoint_ping(client):
+    """
+    A ping callable for `client` (an EndpointClient). It posts PING_RECORD
+    straight to the endpoint, past cache, hedging and breaker, and raises
+    ScoringError on a non-200 answer.
+    """
+
+    def ping():
+        r = client.post_json(build_payload([PING_RECORD]))
+        if r.status_code != 200:
+            raise ScoringError(f"Warm-up ping failed with HTTP {r.status_code}", status_code=r.status_code)
+
+    return ping
+
+
+def parse_windows(spec):
+    """
+    "17:00-23:30,12:00-14:00" -> [(1020, 1410), (720, 840)] in minutes after
+    midnight (local time). A window may wrap past midnight ("22:00-02:00").
+    """
+    windows = []
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        start, end = part.split("-")
+        windows.append(tuple(int(h) * 60 + int(m) for h, m in (t.split(":") for t in (start, end))))
+    return windows
+
+
+def in_windows(windows, t):
+    """
+    Whether epoch time `t` falls inside one of `windows` (local time).
+    """
+    lt = time.localtime(t)
+    minute = lt.tm_hour * 60 + lt.tm_min
+    return any(start <= minute < end if start <= end else minute >= start or minute < end
+               for start, end in windows)
+
+
+class WarmKeeper(threading.Thread):
+    """
+    Background pinger. Call touch() on every request actually sent to the
+    endpoint (not on cache hits) so the keeper doesn't ping an endpoint that
+    traffic is already keeping warm.
+
+    tick() makes one decision (ping / skip) and returns the seconds to wait
+    before the next one; run() just loops over it, so tick() can be driven
+    directly with a fake clock.
+    """
+
+    def __init__(self, ping, interval=240.0, min_interval=30.0, max_interval=900.0,
+                 idle_after=1800.0, windows=(), cold_threshold=2.0, window=128, clock=time.time):
+        super().__init__(name="warm-keeper", daemon=True)
+        self.ping = ping
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.idle_after = idle_after
+        self.windows = list(windows)
+        self.cold_threshold = cold_threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._cold = deque(maxlen=window)
+        self._warm = deque(maxlen=window)
+        self.last_activity = clock()  # a fresh process counts as activity: warm up after boot
+        self.last_ping = None
+        self.pings = 0
+        self.cold_pings = 0
+        self.errors = 0
+        self.skipped_active = 0
+        self.skipped_idle = 0
+        self._warm_streak = 0
+
+    def touch(self):
+        """
+        Record real traffic to the endpoint.
+        """
+        with self._lock:
+            self.last_activity = self._clock()
+
+    def tick(self):
+        now = self._clock()
+        with self._lock:
+            since_activity = now - self.last_activity
+            since_ping = now - self.last_ping if self.last_ping is not None else None
+            interval = self.interval
+        if since_ping is not None and min(since_activity, since_ping) < interval:
+            if since_activity < since_ping:
+                # real traffic within the interval already kept it warm
+                with self._lock:
+                    self.skipped_active += 1
+            return interval - min(since_activity, since_ping)
+        if since_activity >= self.idle_after and not in_windows(self.windows, now):
+            # nobody around and outside usage windows: let it scale to zero
+            with self._lock:
+                self.skipped_idle += 1
+            return interval
+        return self.ping_once()
+
+    def ping_once(self):
+        start = time.perf_counter()
+        try:
+            self.ping()
+        except (ScoringError, OSError):  # requests.RequestException is an OSError
+            with self._lock:
+                self.errors += 1
+                self.last_ping = self._clock()
+            metrics.incr("warm_ping_errors")
+            return self.interval
+        elapsed = time.perf_counter() - start
+        cold = elapsed >= self.cold_threshold
+        with self._lock:
+            self.pings += 1
+            self.last_ping = self._clock()
+            if cold:
+                self.cold_pings += 1
+                self._cold.append(elapsed)
+                self._warm_streak = 0
+                self.interval = max(self.min_interval, self.interval / 2)
+            else:
+                self._warm.append(elapsed)
+                self._warm_streak += 1
+                if self._warm_streak >= 3:
+                    self._warm_streak = 0
+                    self.interval = min(self.max_interval, self.interval * 1.25)
+            interval = self.interval
+        metrics.observe("warm_ping_cold" if cold else "warm_ping", elapsed)
+        if cold:
+            metrics.incr("warm_cold_starts")
+        return interval
+
+    def run(self):
+        delay = 0.0
+        while not self._stop_event.wait(delay):
+            delay = self.tick()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def stats(self):
+        with self._lock:
+            cold, warm = sorted(self._cold), sorted(self._warm)
+            return {
+                "interval_s": round(self.interval, 1),
+                "pings": self.pings,
+                "cold_pings": self.cold_pings,
+                "cold_p50_ms": round(percentile(cold, 0.5) * 1000, 1) if cold else None,
+                "warm_p50_ms": round(percentile(warm, 0.5) * 1000, 1) if warm else None,
+                "errors": self.errors,
+                "skipped_active": self.skipped_active,
+                "skipped_idle": self.skipped_idle,
+            }